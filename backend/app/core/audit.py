@@ -0,0 +1,8 @@
+def current_user() -> str:
+    """Return the current user identifier for audit fields.
+
+    TODO: replace this stub with real user context once auth is available.
+    The future implementation should derive the user from the request context
+    (or equivalent service layer) and avoid hardcoded defaults.
+    """
+    return "dev"
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+
+from app.core.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+from app.core.validation import field_errors
+
+JSON_MEDIA_TYPE = "application/json"
+BULK_CHUNK_SIZE = 1000
+
+BULK_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON_MEDIA_TYPE: {"schema": {"type": "array", "items": {"type": "object"}}},
+            NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+            CSV_MEDIA_TYPE: {"schema": {"type": "string"}},
+        },
+    }
+}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class UnsupportedMediaTypeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class InvalidRecord:
+    detail: str
+
+
+class BulkRowError(BaseModel):
+    row: int
+    detail: list[dict[str, Any]]
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in request.stream():
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValueError("Request body must be UTF-8") from None
+    if pending:
+        yield pending
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[Any]:
+    try:
+        records = json.loads(await request.body())
+    except (UnicodeDecodeError, ValueError):
+        raise ValueError("Request body must be a JSON array") from None
+    if not isinstance(records, list):
+        raise ValueError("Request body must be a JSON array")
+    for record in records:
+        yield record
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    async for line in _iter_lines(request):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield InvalidRecord("Invalid JSON")
+
+
+async def _iter_csv(request: Request) -> AsyncIterator[Any]:
+    header: list[str] | None = None
+    buffered: list[str] = []
+    quotes = 0
+    async for line in _iter_lines(request):
+        # A record may span lines inside a quoted field; escaped quotes are
+        # doubled, so the record is complete once the quote count is even.
+        buffered.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(buffered)
+        buffered = []
+        quotes = 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+        except csv.Error as exc:
+            yield InvalidRecord(f"Invalid CSV: {exc}")
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield InvalidRecord(f"Expected {len(header)} fields, got {len(values)}")
+            continue
+        yield {name: value for name, value in zip(header, values) if value != ""}
+    if buffered:
+        yield InvalidRecord("Unterminated quoted field")
+
+
+def request_records(request: Request) -> AsyncIterator[Any]:
+    """Parse a bulk request body into records according to its content type.
+
+    JSON arrays are read whole; NDJSON and CSV are parsed line by line as the
+    body arrives. Empty CSV cells are treated as missing fields.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type == JSON_MEDIA_TYPE:
+        return _iter_json_array(request)
+    if media_type == NDJSON_MEDIA_TYPE:
+        return _iter_ndjson(request)
+    if media_type == CSV_MEDIA_TYPE:
+        return _iter_csv(request)
+    raise UnsupportedMediaTypeError(f"Unsupported content type: {media_type or 'none'}")
+
+
+async def chunked(
+    records: AsyncIterator[Any], size: int = BULK_CHUNK_SIZE
+) -> AsyncIterator[tuple[int, list[Any]]]:
+    """Yield ``(first_row_number, records)`` chunks; rows are numbered from 1.
+
+    Earlier chunks are committed by the time the body fails to parse, so a
+    failure after the first record ends the last chunk with an
+    ``InvalidRecord`` at the row where reading stopped, and the caller's
+    result still reports what was imported. A failure before any record
+    raises ``ValueError``.
+    """
+    chunk: list[Any] = []
+    start = 1
+    try:
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield start, chunk
+                start += len(chunk)
+                chunk = []
+    except ValueError as exc:
+        if start == 1 and not chunk:
+            raise
+        chunk.append(InvalidRecord(f"{exc}; the rest of the body was not imported"))
+    if chunk:
+        yield start, chunk
+
+
+def validate_records(
+    model: type[ModelT], start: int, records: list[Any]
+) -> tuple[list[tuple[int, ModelT]], list[BulkRowError]]:
+    """Validate records numbered from ``start``; valid ones come back with their row."""
+    valid: list[tuple[int, ModelT]] = []
+    errors: list[BulkRowError] = []
+    for row, record in enumerate(records, start=start):
+        if isinstance(record, InvalidRecord):
+            errors.append(BulkRowError(row=row, detail=[{"msg": record.detail}]))
+            continue
+        try:
+            valid.append((row, model.model_validate(record)))
+        except ValidationError as exc:
+            errors.append(
+                BulkRowError(
+                    row=row,
+                    detail=field_errors(
+                        exc.errors(include_url=False, include_input=False), include_context=False
+                    ),
+                )
+            )
+    return valid, errors
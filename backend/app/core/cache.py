@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+def _estimate_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+    return size
+
+
+class Cache:
+    """Thread-safe in-process LRU cache with optional capacity and TTL.
+
+    Writers call ``set`` or ``invalidate`` after committing. A load that raced
+    with such a write is not stored, so a stale row never replaces a fresh one.
+
+    Writes from other processes are caught by ``version``: readers pass the
+    current version of the data (e.g. a table's change counter) and an entry
+    stored under any other version is reloaded. Passed as a callable, the
+    version is only read on a miss and once an entry has gone ``revalidate``
+    seconds unchecked, so hits in between cost no read at all; other
+    processes' writes are then seen within ``revalidate`` seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int | None = None,
+        ttl: float | None = None,
+        revalidate: float = 0.0,
+    ) -> None:
+        self.name = name
+        # key -> (value, expires_at, version, checked_until)
+        self._entries: OrderedDict[Hashable, tuple[Any, float | None, Hashable, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._ttl = ttl
+        self._revalidate = revalidate
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale = 0
+
+    def configure(
+        self, capacity: int | None, ttl: float | None, revalidate: float | None = None
+    ) -> None:
+        if capacity is not None and capacity < 0:
+            raise ValueError("Cache capacity must not be negative")
+        with self._lock:
+            self._capacity = capacity
+            self._ttl = ttl
+            if revalidate is not None:
+                self._revalidate = revalidate
+            self._evict()
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        version: Hashable | Callable[[], Hashable] = None,
+    ) -> Any:
+        """Return the cached value if it is live and stored under ``version``,
+        else load and store it.
+
+        The version is read before loading: a write landing in between then
+        leaves the entry under the older version, to be reloaded later.
+        """
+        read_version = version if callable(version) else None
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is not None:
+                if read_version is not None and entry[3] > time.monotonic():
+                    return self._hit(key, entry[0])
+                if read_version is None:
+                    if entry[2] == version:
+                        return self._hit(key, entry[0])
+                    del self._entries[key]
+                    self._stale += 1
+
+        if read_version is not None:
+            version = read_version()
+            with self._lock:
+                entry = self._live_entry(key)
+                if entry is not None:
+                    if entry[2] == version:
+                        self._entries[key] = (*entry[:3], time.monotonic() + self._revalidate)
+                        return self._hit(key, entry[0])
+                    del self._entries[key]
+                    self._stale += 1
+
+        with self._lock:
+            self._misses += 1
+            generation = self._generation
+        value = loader()
+        with self._lock:
+            if self._generation == generation:
+                self._store(key, value, version)
+        return value
+
+    def _live_entry(self, key: Hashable) -> tuple[Any, float | None, Hashable, float] | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._entries[key]
+            self._expirations += 1
+            return None
+        return entry
+
+    def _hit(self, key: Hashable, value: Any) -> Any:
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, version: Hashable = None) -> None:
+        with self._lock:
+            self._generation += 1
+            self._store(key, value, version)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _store(self, key: Hashable, value: Any, version: Hashable) -> None:
+        now = time.monotonic()
+        expires_at = now + self._ttl if self._ttl else None
+        self._entries[key] = (value, expires_at, version, now + self._revalidate)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        if self._capacity is None:
+            return
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "capacity": self._capacity,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "stale": self._stale,
+                "estimated_bytes": sum(
+                    _estimate_size(key) + _estimate_size(value)
+                    for key, (value, *_) in self._entries.items()
+                ),
+            }
+
+
+_caches: dict[str, Cache] = {}
+
+
+def register_cache(cache: Cache) -> Cache:
+    _caches[cache.name] = cache
+    return cache
+
+
+def cache_stats() -> dict[str, dict]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app.core.database import connection
+
+CACHE_CONTROL = "no-cache"
+
+
+def ensure_change_counter(conn: sqlite3.Connection, table: str) -> None:
+    """Keep a version counter for ``table`` that every insert, update and delete bumps.
+
+    Triggers maintain it, so bulk writes and other workers sharing the file are
+    covered without the repositories having to remember it.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_counters (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            changed_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO change_counters (table_name, version, changed_at)
+        VALUES (?, 0, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+        """,
+        (table,),
+    )
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_change_counter
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE change_counters
+                SET version = version + 1, changed_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+                WHERE table_name = '{table}';
+            END
+            """
+        )
+
+
+def get_change_counter(database_url: str, table: str) -> tuple[int, str]:
+    with connection(database_url) as conn:
+        row = conn.execute(
+            "SELECT version, changed_at FROM change_counters WHERE table_name = ?",
+            (table,),
+        ).fetchone()
+
+    if not row:
+        raise RuntimeError(f"No change counter for table {table}")
+
+    return row["version"], row["changed_at"]
+
+
+def change_version(conn: sqlite3.Connection, table: str) -> int:
+    """Read ``table``'s counter on ``conn``; inside a write transaction this is
+    the version the transaction's own changes produce."""
+    row = conn.execute(
+        "SELECT version FROM change_counters WHERE table_name = ?", (table,)
+    ).fetchone()
+    if not row:
+        raise RuntimeError(f"No change counter for table {table}")
+    return row["version"]
+
+
+def get_change_version(database_url: str, table: str) -> int:
+    with connection(database_url) as conn:
+        return change_version(conn, table)
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+def _http_date(timestamp: str) -> str:
+    return format_datetime(_parse_timestamp(timestamp).astimezone(timezone.utc), usegmt=True)
+
+
+def _second_has_passed(timestamp: str) -> bool:
+    # Last-Modified has one-second resolution, so a second in which the
+    # resource changed may still see another change with the same date. Until
+    # it is over the date is not a validator: the ETag alone decides.
+    return _parse_timestamp(timestamp) < _utc_now().replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: str | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    if not _second_has_passed(last_modified):
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return _parse_timestamp(last_modified) <= since
+
+
+def set_validators(response: Response, etag: str, last_modified: str | None = None) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified and _second_has_passed(last_modified):
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified_response(etag: str, last_modified: str | None = None) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag, last_modified)
+    return response
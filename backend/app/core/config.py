@@ -1,7 +1,34 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+JournalMode = Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+SynchronousMode = Literal["OFF", "NORMAL", "FULL", "EXTRA"]
+TempStore = Literal["DEFAULT", "FILE", "MEMORY"]
+
+# Both presets use WAL so readers never block on the single writer. "durable"
+# fsyncs on every commit; "fast" only at checkpoints and leans on mmap and a
+# larger page cache. cache_size is negative, i.e. KiB rather than pages.
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    "durable": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -16384,
+        "temp_store": "DEFAULT",
+    },
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+}
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="", case_sensitive=False)
@@ -9,10 +36,44 @@ class Settings(BaseSettings):
     app_env: str = "dev"
     database_url: str = "sqlite:///./.data/local.db"
     cors_origins: str = "http://localhost:5173,http://127.0.0.1:5173"
+    db_pool_size: int = 5
+    db_pool_timeout: float = 30.0
+    db_executor_workers: int | None = None
+    entity_cache_capacity: int = 1024
+    entity_cache_ttl: float | None = None
+    entity_cache_revalidate: float = 1.0
+    fast_responses: bool = False
+    invoice_number_format: str = "{year}-{sequence:06d}"
+    metrics_enabled: bool = True
+    pdf_cache_dir: str = "./.data/pdf-cache"
+    pdf_render_workers: int = 2
+    sql_trace_enabled: bool = False
+    sql_slow_query_ms: float = 100.0
+    sql_slow_query_buffer: int = 50
+    sqlite_profile: Literal["durable", "fast"] = "durable"
+    sqlite_busy_timeout: int | None = None
+    sqlite_journal_mode: JournalMode | None = None
+    sqlite_synchronous: SynchronousMode | None = None
+    sqlite_mmap_size: int | None = None
+    sqlite_cache_size: int | None = None
+    sqlite_temp_store: TempStore | None = None
 
     def cors_origin_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
+    def sqlite_pragmas(self) -> dict[str, str | int]:
+        pragmas = dict(SQLITE_PROFILES[self.sqlite_profile])
+        overrides = {
+            "busy_timeout": self.sqlite_busy_timeout,
+            "journal_mode": self.sqlite_journal_mode,
+            "synchronous": self.sqlite_synchronous,
+            "mmap_size": self.sqlite_mmap_size,
+            "cache_size": self.sqlite_cache_size,
+            "temp_store": self.sqlite_temp_store,
+        }
+        pragmas.update({name: value for name, value in overrides.items() if value is not None})
+        return pragmas
+
 
 @lru_cache
 def get_settings() -> Settings:
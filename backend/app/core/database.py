@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import ParamSpec, TypeVar
+
+from app.core.config import get_settings
+from app.core.sql_trace import SqlTracer, TracedConnection, get_sql_tracer
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+def resolve_sqlite_path(database_url: str) -> Path:
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError("Only sqlite database URLs are supported for now")
+
+    path_str = database_url.removeprefix("sqlite:///")
+    path = Path(path_str)
+    if not path.is_absolute():
+        path = Path.cwd() / path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _connect(
+    path: Path, pragmas: dict[str, str | int], tracer: SqlTracer | None = None
+) -> sqlite3.Connection:
+    # Untraced connections keep the C cursor; tracing costs a Python call per
+    # execute and fetch, so it is only installed when enabled.
+    factory = TracedConnection if tracer is not None else sqlite3.Connection
+    conn = sqlite3.connect(path, check_same_thread=False, factory=factory)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    # Values come from validated Settings fields; PRAGMA cannot take parameters.
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    if isinstance(conn, TracedConnection):
+        conn.finish_statement()  # Setup pragmas are not reported.
+        conn.tracer = tracer
+    return conn
+
+
+class ConnectionPool:
+    """Thread-safe pool of configured SQLite connections for one database file.
+
+    Connections are opened lazily up to ``size`` and set up once; callers that
+    find the pool exhausted wait up to ``timeout`` seconds for a release.
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        size: int,
+        timeout: float,
+        pragmas: dict[str, str | int] | None = None,
+        tracer: SqlTracer | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.database_url = database_url
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = dict(pragmas or {})
+        self.tracer = tracer
+        self._path = resolve_sqlite_path(database_url)
+        self._idle: list[sqlite3.Connection] = []
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        conn: sqlite3.Connection | None = None
+        blocked = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                blocked = True
+                self._cond.wait(remaining)
+
+            waited = time.perf_counter() - started
+            self._checkouts += 1
+            self._in_use += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+            if blocked:
+                self._waits += 1
+
+        if conn is None:
+            try:
+                conn = _connect(self._path, self.pragmas, self.tracer)
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        reusable = True
+        if isinstance(conn, TracedConnection):
+            conn.finish_statement()
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            reusable = False
+
+        with self._cond:
+            self._in_use -= 1
+            if reusable and not self._closed:
+                self._idle.append(conn)
+            else:
+                self._created -= 1
+                conn.close()
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "pragmas": self.pragmas,
+                "open": self._created,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_avg_ms": (
+                    round(self._wait_total * 1000 / checkouts, 3) if checkouts else 0.0
+                ),
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database_url: str) -> ConnectionPool:
+    pool = _pools.get(database_url)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(database_url)
+        if pool is None:
+            settings = get_settings()
+            pool = ConnectionPool(
+                database_url,
+                size=settings.db_pool_size,
+                timeout=settings.db_pool_timeout,
+                pragmas=settings.sqlite_pragmas(),
+                tracer=get_sql_tracer(),
+            )
+            _pools[database_url] = pool
+        return pool
+
+
+@contextmanager
+def connection(database_url: str) -> Iterator[sqlite3.Connection]:
+    with get_pool(database_url).connection() as conn:
+        yield conn
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            settings = get_settings()
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.db_executor_workers or settings.db_pool_size,
+                thread_name_prefix="db",
+            )
+        return _executor
+
+
+async def run_db(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run a blocking repository call on the app's bounded database executor.
+
+    Async routes await this instead of occupying Starlette's shared threadpool,
+    so request concurrency is capped by the database workers alone.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
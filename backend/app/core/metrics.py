@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import wraps
+from typing import Any, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Shard:
+    """Series recorded by one thread. Only the owner writes; the lock is only
+    contended while a scrape copies it."""
+
+    __slots__ = ("lock", "series")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.series: dict[tuple[str, tuple[str, ...]], list[float]] = {}
+
+
+class _ThreadExit:
+    """Held only by a thread's locals, so it is freed when the thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+_local = threading.local()
+# Totals of threads that have exited. Short-lived threads (anyio workers,
+# per-request threads) fold into it, so the shard list stays as long as the
+# number of live threads and counters never go backwards.
+_retired = _Shard()
+_shards: list[_Shard] = [_retired]
+_shards_lock = threading.Lock()
+
+
+def _shard() -> _Shard:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        _local.exit = _ThreadExit()
+        weakref.finalize(_local.exit, _retire, shard).atexit = False
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def _retire(shard: _Shard) -> None:
+    # Under the shards lock, so a scrape sees the series either in the
+    # thread's shard or in the retired one, never in both or neither.
+    with _shards_lock:
+        _shards.remove(shard)
+        with _retired.lock, shard.lock:
+            for key, values in shard.series.items():
+                _add(_retired.series, key, values)
+
+
+def _add(series: dict, key: Any, values: list[float]) -> None:
+    target = series.get(key)
+    if target is None:
+        series[key] = list(values)
+    else:
+        series[key] = [left + right for left, right in zip(target, values)]
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1.0) -> None:
+        shard = _shard()
+        key = (self.name, labels)
+        with shard.lock:
+            values = shard.series.get(key)
+            if values is None:
+                shard.series[key] = [amount]
+            else:
+                values[0] += amount
+
+    def _render(self, series: dict[tuple[str, ...], list[float]]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, (value,) in sorted(series.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Latency histogram; each series is ``[count, sum, *bucket_counts]``."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        shard = _shard()
+        key = (self.name, labels)
+        index = bisect_left(self.buckets, value)
+        with shard.lock:
+            values = shard.series.get(key)
+            if values is None:
+                values = shard.series[key] = [0.0] * (len(self.buckets) + 3)
+            values[0] += 1
+            values[1] += value
+            values[2 + index] += 1
+
+    def _render(self, series: dict[tuple[str, ...], list[float]]) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [*(_number(bound) for bound in self.buckets), "+Inf"]
+        for labels, values in sorted(series.items()):
+            cumulative = 0.0
+            for bound, observed in zip(bounds, values[2:]):
+                cumulative += observed
+                label_text = _labels((*self.labelnames, "le"), (*labels, bound))
+                lines.append(f"{self.name}_bucket{label_text} {_number(cumulative)}")
+            label_text = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(values[1])}")
+            lines.append(f"{self.name}_count{label_text} {_number(values[0])}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, until the last body chunk is sent.",
+    ("method", "route"),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Repository query latency by statement name, including pool checkout.",
+    ("query",),
+)
+PDF_RENDER_DURATION = Histogram(
+    "invoice_pdf_render_seconds",
+    "Invoice PDF render time in the worker process, excluding queueing and the file write.",
+    (),
+)
+PDF_CACHE_LOOKUPS = Counter(
+    "invoice_pdf_cache_lookups_total",
+    "Invoice PDF requests by disk cache result (hit or miss).",
+    ("result",),
+)
+_METRICS: tuple[Counter | Histogram, ...] = (
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    DB_QUERY_DURATION,
+    PDF_RENDER_DURATION,
+    PDF_CACHE_LOOKUPS,
+)
+
+
+def render_metrics() -> str:
+    """Merge every thread's series into the Prometheus text exposition format."""
+    merged: dict[str, dict[tuple[str, ...], list[float]]] = {metric.name: {} for metric in _METRICS}
+    snapshot = []
+    with _shards_lock:
+        for shard in _shards:
+            with shard.lock:
+                snapshot.extend((key, list(values)) for key, values in shard.series.items())
+    for (name, labels), values in snapshot:
+        _add(merged[name], labels, values)
+
+    lines: list[str] = []
+    for metric in _METRICS:
+        lines.extend(metric._render(merged[metric.name]))
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        with shard.lock:
+            shard.series.clear()
+
+
+def timed_query(name: str) -> Callable[[F], F]:
+    """Record the wrapped repository function in ``db_query_duration_seconds``."""
+
+    def decorate(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                DB_QUERY_DURATION.observe((name,), time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class MetricsMiddleware:
+    """Count requests and time them by route template, e.g. ``/api/clients/{client_id}``.
+
+    Requests that match no route are grouped under ``unmatched`` so unknown
+    paths cannot grow the series without bound.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe((method, template), time.perf_counter() - started)
+            HTTP_REQUESTS.inc((method, template, str(status)))
@@ -0,0 +1,37 @@
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+def encode_cursor(created_at: str, row_id: str) -> str:
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor") from None
+    if (
+        not isinstance(value, list)
+        or len(value) != 2
+        or not all(isinstance(part, str) for part in value)
+    ):
+        raise ValueError("Invalid cursor")
+    return value[0], value[1]
+
+
+def encode_offset_cursor(offset: int) -> str:
+    return encode_cursor("offset", str(offset))
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    kind, value = decode_cursor(cursor)
+    if kind != "offset" or not value.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(value)
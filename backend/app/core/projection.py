@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from pydantic import BaseModel, create_model
+
+ALWAYS_INCLUDED = ("id",)
+
+
+def parse_fields(value: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """Parse a comma-separated ``fields=`` value into field names of ``model``.
+
+    Names come back in model order, with ``id`` always included; ``None``
+    means no projection was requested.
+    """
+    if value is None:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("No fields requested")
+    requested.update(ALWAYS_INCLUDED)
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def project(row: dict, fields: tuple[str, ...] | None) -> dict:
+    return row if fields is None else {name: row[name] for name in fields}
+
+
+@lru_cache(maxsize=256)
+def projection_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    definitions = {
+        name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields
+    }
+    return create_model(f"{model.__name__}Projection", **definitions)
+
+
+@lru_cache(maxsize=256)
+def projection_page_model(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        f"{model.__name__}ProjectionPage",
+        items=(list[projection_model(model, fields)], ...),
+        next_cursor=(str | None, None),
+    )
+
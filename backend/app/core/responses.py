@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+
+
+class TrustedJSONResponse(JSONResponse):
+    """JSON response for repository output that already has its response shape.
+
+    Encoded by pydantic-core's Rust serializer, without building models first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def respond(
+    content: Any,
+    response: Response | None = None,
+    *,
+    model: type[BaseModel] | None = None,
+    status_code: int = 200,
+) -> Any:
+    """Return route output, skipping ``response_model`` re-validation when enabled.
+
+    With ``FAST_RESPONSES`` on, trusted repository dicts are encoded directly.
+    Otherwise ``model`` validates them when given, or FastAPI does against the
+    route's ``response_model``. Headers already set on ``response`` are kept.
+    The OpenAPI schema comes from ``response_model`` either way.
+    """
+    if get_settings().fast_responses:
+        rendered: Response = TrustedJSONResponse(content, status_code=status_code)
+    elif model is not None:
+        rendered = Response(
+            model.model_validate(content).model_dump_json(),
+            status_code=status_code,
+            media_type="application/json",
+        )
+    else:
+        return content
+    return _keep_headers(rendered, response)
+
+
+def encode_json(content: Any, model: type[BaseModel]) -> bytes:
+    """Encode ``content`` the way ``respond`` would, validating it with ``model``.
+
+    Blocking: async routes returning whole pages call it inside ``run_db``,
+    next to the query, so validating and encoding hundreds of rows does not
+    hold up the event loop. Send the result with ``json_response``.
+    """
+    if get_settings().fast_responses:
+        return to_json(content)
+    return model.model_validate(content).model_dump_json().encode()
+
+
+def json_response(body: bytes, response: Response | None = None, status_code: int = 200) -> Response:
+    """Send a body from ``encode_json``, keeping headers already set on ``response``."""
+    return _keep_headers(
+        Response(body, status_code=status_code, media_type="application/json"), response
+    )
+
+
+def _keep_headers(rendered: Response, response: Response | None) -> Response:
+    if response is not None:
+        rendered.raw_headers.extend(
+            header for header in response.raw_headers if header[0] != b"content-length"
+        )
+    return rendered
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def ensure_search_index(
+    conn: sqlite3.Connection, table: str, columns: tuple[str, ...], options: str
+) -> None:
+    """Create ``{table}_fts`` over ``columns`` and the triggers that keep it in sync.
+
+    It is an external-content FTS5 index on the ``table`` rowid, so row text is
+    not stored twice. ``options`` holds the tokenizer and prefix settings.
+    Soft-deleted rows are kept out of the index, so searches never have to
+    filter them and "delete" commands are only issued for indexed rows.
+    ``VACUUM`` may renumber the rowids of tables without an INTEGER PRIMARY
+    KEY, so an index that no longer matches the live rows is rebuilt here.
+    """
+    index = f"{table}_fts"
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)
+    ).fetchone()
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+            {names},
+            content = '{table}',
+            content_rowid = 'rowid',
+            {options}
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{index}_insert AFTER INSERT ON {table}
+        WHEN new.deleted_at IS NULL
+        BEGIN
+            INSERT INTO {index} (rowid, {names}) VALUES (new.rowid, {new_values});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{index}_delete AFTER DELETE ON {table}
+        WHEN old.deleted_at IS NULL
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {names})
+            VALUES ('delete', old.rowid, {old_values});
+        END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{index}_update AFTER UPDATE ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {names})
+            SELECT 'delete', old.rowid, {old_values} WHERE old.deleted_at IS NULL;
+            INSERT INTO {index} (rowid, {names})
+            SELECT new.rowid, {new_values} WHERE new.deleted_at IS NULL;
+        END
+        """
+    )
+    if not exists or not _index_matches_rows(conn, table):
+        rebuild_search_index(conn, table, columns)
+
+
+def _index_matches_rows(conn: sqlite3.Connection, table: str) -> bool:
+    # Renumbering keeps row order and only moves rowids down, so it always
+    # lowers the sum of the live rowids: equal counts and sums mean the index
+    # still points at the rows it was built from.
+    indexed = conn.execute(f"SELECT count(*), sum(id) FROM {table}_fts_docsize").fetchone()
+    live = conn.execute(
+        f"SELECT count(*), sum(rowid) FROM {table} WHERE deleted_at IS NULL"
+    ).fetchone()
+    return tuple(indexed) == tuple(live)
+
+
+def rebuild_search_index(conn: sqlite3.Connection, table: str, columns: tuple[str, ...]) -> None:
+    """Re-index every live row of ``table``, e.g. after ``VACUUM`` renumbered rowids."""
+    index = f"{table}_fts"
+    names = ", ".join(columns)
+    conn.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+    conn.execute(
+        f"""
+        INSERT INTO {index} ({index}, rowid, {names})
+        SELECT 'delete', rowid, {names} FROM {table} WHERE deleted_at IS NOT NULL
+        """
+    )
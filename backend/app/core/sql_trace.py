@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import get_settings
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+class _Statement:
+    __slots__ = ("sql", "parameters", "many", "elapsed", "rows")
+
+    def __init__(self, sql: str, parameters: Any, many: bool) -> None:
+        self.sql = sql
+        self.parameters = parameters
+        self.many = many
+        self.elapsed = 0.0
+        self.rows = 0
+
+
+class SqlTracer:
+    """Slow-query log and buffer of the ``capacity`` slowest statements.
+
+    A statement's duration is the time spent inside its execute and fetch
+    calls, so a cursor the caller reads slowly is not reported as slow SQL.
+    Only statements at or over ``threshold_ms`` are logged, explained and kept.
+    """
+
+    def __init__(self, threshold_ms: float, capacity: int) -> None:
+        self.threshold = threshold_ms / 1000
+        self.capacity = capacity
+        self._slowest: list[tuple[float, int, dict]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, conn: sqlite3.Connection, statement: _Statement) -> None:
+        if statement.elapsed < self.threshold:
+            return
+        plan = _query_plan(conn, statement)
+        duration_ms = round(statement.elapsed * 1000, 3)
+        slow_query_logger.warning(
+            "Slow query (%.3f ms, %d rows): %s%s",
+            duration_ms,
+            statement.rows,
+            " ".join(statement.sql.split()),
+            "\n" + "\n".join(plan) if plan else "",
+        )
+        entry = {
+            "sql": statement.sql,
+            "duration_ms": duration_ms,
+            "rows": statement.rows,
+            "executemany": statement.many,
+            "plan": plan,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        item = (statement.elapsed, next(self._sequence), entry)
+        with self._lock:
+            if len(self._slowest) < self.capacity:
+                heapq.heappush(self._slowest, item)
+            elif self._slowest and item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self) -> list[dict]:
+        with self._lock:
+            items = sorted(self._slowest, reverse=True)
+        return [entry for _, _, entry in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slowest.clear()
+
+
+def _query_plan(conn: sqlite3.Connection, statement: _Statement) -> list[str]:
+    """``EXPLAIN QUERY PLAN`` lines, indented by depth; empty if not explainable."""
+    if statement.many or not _EXPLAINABLE.match(statement.sql):
+        return []
+    try:
+        # A plain Cursor, so explaining is not traced itself.
+        rows = sqlite3.Cursor(conn).execute(
+            f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+    depths: dict[int, int] = {}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth = depths[node_id] = depths.get(parent, -1) + 1
+        lines.append(f"{'  ' * depth}{detail}")
+    return lines
+
+
+class TracedCursor(sqlite3.Cursor):
+    _statement: _Statement | None = None
+
+    def execute(self, sql: str, parameters: Any = (), /) -> TracedCursor:
+        return self._run(super().execute, _Statement(sql, parameters, many=False))
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> TracedCursor:
+        return self._run(super().executemany, _Statement(sql, seq_of_parameters, many=True))
+
+    def _run(self, execute, statement: _Statement) -> TracedCursor:
+        conn: TracedConnection = self.connection  # type: ignore[assignment]
+        conn.finish_statement()
+        self._statement = conn._statement = statement
+        started = time.perf_counter()
+        try:
+            execute(statement.sql, statement.parameters)
+        finally:
+            statement.elapsed += time.perf_counter() - started
+        if self.description is None:
+            statement.rows = max(self.rowcount, 0)
+        return self
+
+    def _fetched(self, started: float, rows: int) -> None:
+        statement = self._statement
+        if statement is not None:
+            statement.elapsed += time.perf_counter() - started
+            statement.rows += rows
+
+    def fetchone(self) -> Any:
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchmany(self, size: int | None = None) -> list:
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self) -> list:
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def __next__(self) -> Any:
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0)
+            raise
+        self._fetched(started, 1)
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors time every statement for ``tracer``.
+
+    Python's sqlite3 has no profile callback: the trace callback only fires
+    as a statement starts. A statement is therefore reported when the next
+    one starts on the connection, or when the pool takes the connection back.
+    """
+
+    tracer: SqlTracer | None = None
+    _statement: _Statement | None = None
+
+    def cursor(self, factory: type[sqlite3.Cursor] = TracedCursor) -> sqlite3.Cursor:  # type: ignore[override]
+        return super().cursor(factory)
+
+    # The C shortcuts build a plain Cursor without calling ``cursor()``.
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any, /) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def finish_statement(self) -> None:
+        statement, self._statement = self._statement, None
+        if statement is not None and self.tracer is not None:
+            self.tracer.record(self, statement)
+
+
+_tracer: SqlTracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_sql_tracer() -> SqlTracer | None:
+    global _tracer
+    settings = get_settings()
+    if not settings.sql_trace_enabled:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = SqlTracer(settings.sql_slow_query_ms, settings.sql_slow_query_buffer)
+        return _tracer
+
+
+def reset_sql_tracer() -> None:
+    global _tracer
+    with _tracer_lock:
+        _tracer = None
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import struct
+import tempfile
+import zlib
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.database import run_db
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+ZIP_MEDIA_TYPE = "application/zip"
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _encode_batches(
+    batches: Iterator[list[dict]], encode: Callable[[list[dict]], str]
+) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            batch = await run_db(next, batches, None)
+            if batch is None:
+                break
+            yield encode(batch).encode()
+    finally:
+        await run_db(batches.close)
+
+
+def _ndjson_chunk(batch: list[dict]) -> str:
+    return "".join(json.dumps(row) + "\n" for row in batch)
+
+
+def ndjson_response(batches: Iterator[list[dict]]) -> StreamingResponse:
+    """Stream repository row batches as NDJSON, one database fetch per chunk.
+
+    Each batch is pulled on the database executor. The repository iterators
+    check a connection out per batch, so neither an executor thread nor a
+    pooled connection is held while a chunk is being sent.
+    """
+    return StreamingResponse(_encode_batches(batches, _ndjson_chunk), media_type=NDJSON_MEDIA_TYPE)
+
+
+def csv_response(
+    batches: Iterator[list[dict]], fieldnames: list[str], filename: str
+) -> StreamingResponse:
+    header_pending = True
+
+    def encode(batch: list[dict]) -> str:
+        nonlocal header_pending
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+        if header_pending:
+            writer.writeheader()
+            header_pending = False
+        writer.writerows(batch)
+        return buffer.getvalue()
+
+    async def body() -> AsyncIterator[bytes]:
+        async for chunk in _encode_batches(batches, encode):
+            yield chunk
+        if header_pending:
+            yield encode([]).encode()
+
+    return StreamingResponse(
+        body(),
+        media_type=CSV_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Offsets and counts from these on are written as the 0xFFFFFFFF / 0xFFFF
+# markers, with the real values in ZIP64 records.
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+_ZIP_CHUNK_SIZE = 64 * 1024
+# Central directory records are about 80 bytes each; past this many bytes the
+# directory is kept on disk until the end of the archive.
+_ZIP_DIRECTORY_SPOOL = 256 * 1024
+
+
+def _dos_timestamp(moment: datetime) -> tuple[int, int]:
+    time_part = moment.hour << 11 | moment.minute << 5 | moment.second // 2
+    date_part = (moment.year - 1980) << 9 | moment.month << 5 | moment.day
+    return time_part, date_part
+
+
+def _read_entry(path: Path) -> tuple[bytes, int]:
+    data = path.read_bytes()
+    return data, zlib.crc32(data)
+
+
+class _ZipWriter:
+    """Streaming ZIP encoder for stored (uncompressed) files.
+
+    Each file is read whole first, so its CRC and size go straight into the
+    local header. Central directory records are spooled to a temporary file,
+    so memory does not grow with the number of entries.
+    """
+
+    def __init__(self) -> None:
+        self._offset = 0
+        self._count = 0
+        self._directory = tempfile.SpooledTemporaryFile(max_size=_ZIP_DIRECTORY_SPOOL)
+        self._time, self._date = _dos_timestamp(datetime.now())
+
+    def entry(self, name: str, data: bytes, crc: int) -> bytes:
+        encoded = name.encode()
+        size = len(data)
+        if size >= 0xFFFFFFFF:
+            raise ValueError(f"{name} is too large for a streamed ZIP entry")
+        version = 45 if self._offset >= _ZIP64_LIMIT else 20
+        # Bit 11: names are UTF-8.
+        header = struct.pack(
+            "<4s5H3L2H", b"PK\x03\x04", version, 0x0800, 0, self._time, self._date,
+            crc, size, size, len(encoded), 0,
+        )
+        offset, extra = self._offset, b""
+        if offset >= _ZIP64_LIMIT:
+            offset, extra = 0xFFFFFFFF, struct.pack("<2HQ", 1, 8, self._offset)
+        self._directory.write(
+            struct.pack(
+                "<4s6H3L5H2L", b"PK\x01\x02", version, version, 0x0800, 0, self._time,
+                self._date, crc, size, size, len(encoded), len(extra), 0, 0, 0, 0, offset,
+            )
+            + encoded
+            + extra
+        )
+        self._count += 1
+        self._offset += len(header) + len(encoded) + size
+        return header + encoded + data
+
+    def finish(self) -> Iterator[bytes]:
+        """Yield the central directory and the end records."""
+        directory_size = self._directory.tell()
+        self._directory.seek(0)
+        while chunk := self._directory.read(_ZIP_CHUNK_SIZE):
+            yield chunk
+        start, count = self._offset, self._count
+        end = b""
+        if start >= _ZIP64_LIMIT or count >= _ZIP64_COUNT_LIMIT:
+            end += struct.pack(
+                "<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0, count, count,
+                directory_size, start,
+            )
+            end += struct.pack("<4sLQL", b"PK\x06\x07", 0, start + directory_size, 1)
+            start, count = 0xFFFFFFFF, 0xFFFF
+        end += struct.pack(
+            "<4s4H2LH", b"PK\x05\x06", 0, 0, count, count, directory_size, start, 0
+        )
+        yield end
+
+    def close(self) -> None:
+        self._directory.close()
+
+
+def zip_response(
+    entries: AsyncGenerator[tuple[str, Path], None], filename: str
+) -> StreamingResponse:
+    """Stream ``(archive name, file)`` pairs as a ZIP, one file per chunk.
+
+    Files are stored as is and read on a worker thread. Memory holds one file
+    at a time however many entries there are.
+    """
+
+    async def body() -> AsyncIterator[bytes]:
+        writer = _ZipWriter()
+        try:
+            try:
+                async for name, path in entries:
+                    data, crc = await asyncio.to_thread(_read_entry, path)
+                    yield writer.entry(name, data, crc)
+            finally:
+                await entries.aclose()
+            for chunk in writer.finish():
+                yield chunk
+        finally:
+            writer.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=ZIP_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass
+from typing import Annotated, Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, BeforeValidator, Field, GetCoreSchemaHandler, model_validator
+from pydantic_core import core_schema
+
+
+def _strip(value: Any) -> Any:
+    # str.strip(), not strip_whitespace: pydantic-core trims Unicode
+    # White_Space only, which leaves separators such as "\x1c" in place.
+    return value.strip() if isinstance(value, str) else value
+
+
+def _text_schema(min_length: int | None, max_length: int) -> core_schema.CoreSchema:
+    # The strip wraps the whole str schema, so the type and length checks stay
+    # in pydantic-core; constraints added after a Python validator would run as
+    # Python validators instead.
+    return core_schema.no_info_before_validator_function(
+        _strip,
+        core_schema.str_schema(strict=True, min_length=min_length, max_length=max_length),
+    )
+
+
+@dataclass(frozen=True)
+class RequiredText:
+    """``Annotated[str, RequiredText(n)]``: a stripped, non-empty string of at most n characters."""
+
+    max_length: int
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return _text_schema(1, self.max_length)
+
+
+@dataclass(frozen=True)
+class OptionalText:
+    """``Annotated[str, OptionalText(n)]``: a stripped string of at most n characters."""
+
+    max_length: int
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return _text_schema(None, self.max_length)
+
+
+def _integer_input(value: Any) -> Any:
+    if isinstance(value, bool):
+        raise ValueError("Must be an integer")
+    if isinstance(value, str):
+        # Parsed like int(): "12" passes, "12.0" does not, where a lax int
+        # would accept any numeric string with an integral value.
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError("Must be an integer") from None
+    return value
+
+
+# Integral floats such as 12.0 are converted by the lax int itself, which
+# rejects 12.5 natively.
+NonNegativeInt = Annotated[int, BeforeValidator(_integer_input), Field(ge=0)]
+PositiveInt = Annotated[int, BeforeValidator(_integer_input), Field(ge=1)]
+
+
+class BlankAsNone(BaseModel):
+    """Store ``OptionalText`` fields that are blank after stripping as ``None``.
+
+    Required text cannot be blank, so every empty string left is optional.
+    This is the one Python pass left: blank optional text is accepted as
+    ``None`` by the API, and pydantic-core can only reject it (``min_length``),
+    not replace it.
+    """
+
+    @model_validator(mode="after")
+    def _blank_as_none(self) -> BlankAsNone:
+        for name, value in self.__dict__.items():
+            if value == "":
+                self.__dict__[name] = None
+        return self
+
+
+_ACRONYMS = {"ico": "ICO", "dic": "DIC", "iban": "IBAN", "swift": "SWIFT"}
+
+_MESSAGES = {
+    "string_type": "Must be a string",
+    "string_too_short": "Must not be empty",
+    "string_too_long": "{label} must be at most {max_length} characters",
+    "int_type": "Must be an integer",
+    "int_parsing": "Must be an integer",
+    "int_from_float": "Must be an integer",
+    "greater_than_equal": "Must be greater than or equal to {ge}",
+    "less_than_equal": "Must be less than or equal to {le}",
+}
+
+
+# First ``loc`` item of request parameter errors; body and model errors are
+# reworded.
+_PARAMETER_LOCATIONS = frozenset({"query", "path", "header", "cookie"})
+
+
+def _label(field: object) -> str:
+    name = str(field)
+    return _ACRONYMS.get(name, name.replace("_", " ").capitalize())
+
+
+def field_errors(errors: Iterable[dict], include_context: bool = True) -> list[dict]:
+    """Reword native constraint errors as the schemas' ``value_error`` messages.
+
+    Keeps the 422 payloads that clients already parse, e.g. "Value error,
+    Name must be at most 256 characters". Other errors pass through as is.
+    ``errors`` must carry their ``ctx``; ``include_context`` controls the output.
+    Query, path, header and cookie errors keep FastAPI's messages.
+    """
+    reworded = []
+    for error in errors:
+        template = _MESSAGES.get(error["type"])
+        context = error.get("ctx", {})
+        loc = error.get("loc")
+        if template is not None and loc and loc[0] not in _PARAMETER_LOCATIONS:
+            message = template.format(label=_label(error["loc"][-1]), **context)
+            error = {
+                **error,
+                "type": "value_error",
+                "msg": f"Value error, {message}",
+                "ctx": {"error": {}},
+            }
+        if not include_context:
+            error = {key: value for key, value in error.items() if key != "ctx"}
+        reworded.append(error)
+    return reworded
+
+
+class FieldErrorRoute(APIRoute):
+    """Route class answering request validation errors with ``field_errors``.
+
+    Set as ``route_class`` on the routers whose schemas use the constrained
+    types above, so other routes keep FastAPI's default 422 body.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except RequestValidationError as exc:
+                return JSONResponse(
+                    status_code=422,
+                    content={"detail": jsonable_encoder(field_errors(exc.errors()))},
+                )
+
+        return route_handler
@@ -3,15 +3,28 @@ import logging
 
 from fastapi import FastAPI
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.cache import cache_stats, clear_caches
 from app.core.config import get_settings
+from app.core.database import close_pools, get_pool, shutdown_db_executor
 from app.core.logging import configure_logging
+from app.core.metrics import (
+    PROMETHEUS_MEDIA_TYPE,
+    MetricsMiddleware,
+    render_metrics,
+    reset_metrics,
+)
+from app.core.sql_trace import get_sql_tracer, reset_sql_tracer
 from app.modules.catalog_items import init_module as init_catalog_items_module
 from app.modules.catalog_items import router as catalog_items_router
 from app.modules.clients import init_module as init_clients_module
 from app.modules.clients import router as clients_router
+from app.modules.invoices import init_module as init_invoices_module
+from app.modules.invoices import router as invoices_router
+from app.modules.invoices.rendering import shutdown_pdf_renderer
+from app.modules.reports import router as reports_router
 from app.modules.users import init_module as init_users_module
 from app.modules.users import router as users_router
 
@@ -23,10 +36,19 @@ async def lifespan(app: FastAPI):
         init_clients_module()
         init_catalog_items_module()
         init_users_module()
+        init_invoices_module()
     except Exception:
         logger.exception("Startup initialization failed")
         raise
-    yield
+    try:
+        yield
+    finally:
+        shutdown_pdf_renderer()
+        shutdown_db_executor()
+        close_pools()
+        clear_caches()
+        reset_metrics()
+        reset_sql_tracer()
 
 
 def create_app() -> FastAPI:
@@ -44,11 +66,37 @@ def create_app() -> FastAPI:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
 
     @app.get("/health")
     def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/health/db")
+    async def health_db() -> dict:
+        return {"pool": get_pool(get_settings().database_url).stats()}
+
+    @app.get("/health/cache")
+    async def health_cache() -> dict:
+        return {"caches": cache_stats()}
+
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> Response:
+            return Response(render_metrics(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+    if settings.sql_trace_enabled:
+
+        @app.get("/debug/sql/slow", include_in_schema=False)
+        async def debug_sql_slow() -> dict:
+            tracer = get_sql_tracer()
+            return {
+                "threshold_ms": settings.sql_slow_query_ms,
+                "queries": tracer.slowest() if tracer is not None else [],
+            }
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(
         request: Request, exc: Exception
@@ -61,6 +109,8 @@ def create_app() -> FastAPI:
     app.include_router(clients_router)
     app.include_router(catalog_items_router)
     app.include_router(users_router)
+    app.include_router(invoices_router)
+    app.include_router(reports_router)
 
     return app
 
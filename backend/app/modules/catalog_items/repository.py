@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import sqlite3
-from contextlib import closing
+from collections.abc import Iterator
 from datetime import datetime, timezone
-from pathlib import Path
 from uuid import uuid4
 
+from app.core.audit import current_user
+from app.core.cache import Cache, register_cache
+from app.core.conditional import change_version, ensure_change_counter, get_change_version
+from app.core.database import connection
+from app.core.metrics import timed_query
+from app.core.search import ensure_search_index
+
 from .schemas import CatalogItemCreate, CatalogItemUpdate
 
 
@@ -18,29 +24,49 @@ def _utc_now() -> str:
     )
 
 
-def _resolve_sqlite_path(database_url: str) -> Path:
-    if not database_url.startswith("sqlite:///"):
-        raise ValueError("Only sqlite database URLs are supported for now")
+# Partial indexes on live rows: keyset order serves list pages with no temp
+# B-tree sort, (name, unit) is the natural key used by bulk imports and the
+# case-insensitive name order serves typeahead prefixes. Lookups by id use
+# the primary key.
+INDEXES = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_catalog_items_live_created_at
+    ON catalog_items (created_at DESC, id DESC)
+    WHERE deleted_at IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_catalog_items_live_name_unit
+    ON catalog_items (name, unit)
+    WHERE deleted_at IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_catalog_items_live_name_nocase
+    ON catalog_items (name COLLATE NOCASE, id)
+    WHERE deleted_at IS NULL
+    """,
+)
 
-    path_str = database_url.removeprefix("sqlite:///")
-    path = Path(path_str)
-    if not path.is_absolute():
-        path = Path.cwd() / path
+# Trigram index for infix suggestions; it needs at least three characters.
+SUGGEST_COLUMNS = ("name", "description")
+SUGGEST_INDEX_OPTIONS = "tokenize = 'trigram'"
+SUGGEST_MIN_INFIX_LENGTH = 3
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return path
 
+# Detail reads by id, keyed by (database_url, id). This process's writes
+# refresh or drop the entry after commit. Entries are stored under the
+# catalog_items change counter, looked up at most once per revalidation interval
+# per entry, so hits in between never touch SQLite and writes by other
+# workers are seen within the interval. Capacity, TTL and interval come from
+# Settings.
+_catalog_item_cache = register_cache(Cache("catalog_items.entity"))
 
-def _connect(database_url: str) -> sqlite3.Connection:
-    path = _resolve_sqlite_path(database_url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+
+def configure_catalog_item_cache(capacity: int, ttl: float | None, revalidate: float) -> None:
+    _catalog_item_cache.configure(capacity, ttl, revalidate)
 
 
 def init_db(database_url: str) -> None:
-    with closing(_connect(database_url)) as conn:
+    with connection(database_url) as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS catalog_items (
@@ -57,46 +83,148 @@ def init_db(database_url: str) -> None:
             )
             """
         )
+        for statement in INDEXES:
+            conn.execute(statement)
+        ensure_change_counter(conn, "catalog_items")
+        ensure_search_index(conn, "catalog_items", SUGGEST_COLUMNS, SUGGEST_INDEX_OPTIONS)
         conn.commit()
 
 
-def _row_to_catalog_item(row: sqlite3.Row) -> dict:
+# Columns exposed by the API, in response order. List reads select only the
+# requested subset plus the keyset columns.
+CATALOG_ITEM_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "unit",
+    "unit_price",
+    "tax_rate",
+    "created_at",
+    "updated_at",
+)
+KEYSET_COLUMNS = ("created_at", "id")
+
+
+def _row_to_catalog_item(
+    row: sqlite3.Row, fields: tuple[str, ...] = CATALOG_ITEM_COLUMNS
+) -> dict:
+    return {field: row[field] for field in fields}
+
+
+def _selected_columns(fields: tuple[str, ...]) -> str:
+    return ", ".join(dict.fromkeys((*fields, *KEYSET_COLUMNS)))
+
+
+@timed_query("catalog_items.list")
+def list_catalog_items(
+    database_url: str,
+    limit: int,
+    after: tuple[str, str] | None = None,
+    fields: tuple[str, ...] = CATALOG_ITEM_COLUMNS,
+) -> tuple[list[dict], tuple[str, str] | None]:
+    keyset = "AND (created_at, id) < (?, ?)" if after else ""
+    with connection(database_url) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {_selected_columns(fields)}
+            FROM catalog_items
+            WHERE deleted_at IS NULL {keyset}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (*(after or ()), limit + 1),
+        ).fetchall()
+
+    items = [_row_to_catalog_item(row, fields) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    return items, (rows[limit - 1]["created_at"], rows[limit - 1]["id"])
+
+
+def iter_catalog_items(
+    database_url: str,
+    after: tuple[str, str] | None = None,
+    batch_size: int = 500,
+    fields: tuple[str, ...] = CATALOG_ITEM_COLUMNS,
+) -> Iterator[list[dict]]:
+    """Yield live catalog items in list order, ``batch_size`` at a time.
+
+    Each batch is a keyset page on its own short connection checkout, resumed
+    after the last row yielded, so a slow consumer holds neither a pooled
+    connection nor a read snapshot between batches.
+    """
+    while True:
+        batch, after = list_catalog_items(database_url, batch_size, after, fields)
+        if batch:
+            yield batch
+        if after is None:
+            return
+
+
+def _row_to_suggestion(row: sqlite3.Row) -> dict:
     return {
         "id": row["id"],
         "name": row["name"],
-        "description": row["description"],
         "unit": row["unit"],
         "unit_price": row["unit_price"],
         "tax_rate": row["tax_rate"],
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
     }
 
 
-def list_catalog_items(database_url: str) -> list[dict]:
-    with closing(_connect(database_url)) as conn:
+@timed_query("catalog_items.suggest")
+def suggest_catalog_items(database_url: str, prefix: str, limit: int) -> list[dict]:
+    """Suggest live items for typeahead: name prefix matches first, by name.
+
+    Remaining slots are filled with items containing ``prefix`` anywhere in
+    the name or description, once it is long enough for the trigram index.
+    Prefix matching folds ASCII case only.
+    """
+    text = prefix.strip()
+    if not text:
+        return []
+
+    pattern = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with connection(database_url) as conn:
         rows = conn.execute(
             """
-            SELECT
-                id,
-                name,
-                description,
-                unit,
-                unit_price,
-                tax_rate,
-                created_at,
-                updated_at
+            SELECT id, name, unit, unit_price, tax_rate
             FROM catalog_items
-            WHERE deleted_at IS NULL
-            ORDER BY created_at DESC
-            """
+            WHERE deleted_at IS NULL AND name LIKE ? ESCAPE '\\'
+            ORDER BY name COLLATE NOCASE, id
+            LIMIT ?
+            """,
+            (pattern, limit),
         ).fetchall()
-
-    return [_row_to_catalog_item(row) for row in rows]
+        if len(rows) < limit and len(text) >= SUGGEST_MIN_INFIX_LENGTH:
+            seen = {row["id"] for row in rows}
+            phrase = '"' + text.replace('"', '""') + '"'
+            infix = conn.execute(
+                """
+                SELECT item.id, item.name, item.unit, item.unit_price, item.tax_rate
+                FROM (
+                    SELECT rowid FROM catalog_items_fts WHERE catalog_items_fts MATCH ? LIMIT ?
+                ) AS hit
+                JOIN catalog_items AS item ON item.rowid = hit.rowid
+                ORDER BY item.name COLLATE NOCASE, item.id
+                """,
+                (phrase, limit + len(rows)),
+            ).fetchall()
+            rows.extend(row for row in infix if row["id"] not in seen)
+
+    return [_row_to_suggestion(row) for row in rows[:limit]]
 
 
 def get_catalog_item(database_url: str, item_id: str) -> dict | None:
-    with closing(_connect(database_url)) as conn:
+    return _catalog_item_cache.get_or_load(
+        (database_url, item_id),
+        lambda: _load_catalog_item(database_url, item_id),
+        lambda: get_change_version(database_url, "catalog_items"),
+    )
+
+
+@timed_query("catalog_items.get")
+def _load_catalog_item(database_url: str, item_id: str) -> dict | None:
+    with connection(database_url) as conn:
         row = conn.execute(
             """
             SELECT
@@ -120,12 +248,13 @@ def get_catalog_item(database_url: str, item_id: str) -> dict | None:
     return _row_to_catalog_item(row)
 
 
+@timed_query("catalog_items.create")
 def create_catalog_item(database_url: str, payload: CatalogItemCreate) -> dict:
     now = _utc_now()
-    created_by = _current_user()
+    created_by = current_user()
     item_id = str(uuid4())
-    with closing(_connect(database_url)) as conn:
-        conn.execute(
+    with connection(database_url) as conn:
+        row = conn.execute(
             """
             INSERT INTO catalog_items (
                 id,
@@ -139,6 +268,15 @@ def create_catalog_item(database_url: str, payload: CatalogItemCreate) -> dict:
                 updated_at
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING
+                id,
+                name,
+                description,
+                unit,
+                unit_price,
+                tax_rate,
+                created_at,
+                updated_at
             """,
             (
                 item_id,
@@ -151,20 +289,125 @@ def create_catalog_item(database_url: str, payload: CatalogItemCreate) -> dict:
                 now,
                 now,
             ),
-        )
+        ).fetchone()
+        version = change_version(conn, "catalog_items")
         conn.commit()
 
-    created = get_catalog_item(database_url, item_id)
-    if not created:
-        raise RuntimeError("Failed to load created catalog item")
-
+    created = _row_to_catalog_item(row)
+    _catalog_item_cache.set((database_url, created["id"]), created, version)
     return created
 
 
+@timed_query("catalog_items.upsert")
+def upsert_catalog_items_by_key(
+    database_url: str, payloads: list[tuple[int, CatalogItemCreate]]
+) -> tuple[dict[str, int], list[int]]:
+    """Insert or update live items matched by ``(name, unit)`` in one transaction.
+
+    ``payloads`` pairs each item with its import row number. Every row counts
+    as inserted, updated or unchanged against the state left by earlier rows;
+    unchanged rows are not written. Returns the counts and the row numbers
+    whose key matches more than one live item.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    ambiguous: list[int] = []
+    if not payloads:
+        return counts, ambiguous
+
+    keys = list({(payload.name, payload.unit) for _, payload in payloads})
+    now = _utc_now()
+    created_by = current_user()
+    with connection(database_url) as conn:
+        matches: dict[tuple[str, str], list[sqlite3.Row]] = {}
+        rows = conn.execute(
+            f"""
+            WITH keys (name, unit) AS (VALUES {", ".join(["(?, ?)"] * len(keys))})
+            SELECT
+                item.id,
+                item.name,
+                item.unit,
+                item.description,
+                item.unit_price,
+                item.tax_rate
+            FROM keys
+            JOIN catalog_items AS item ON item.name = keys.name AND item.unit = keys.unit
+            WHERE item.deleted_at IS NULL
+            """,
+            [value for key in keys for value in key],
+        ).fetchall()
+        for row in rows:
+            matches.setdefault((row["name"], row["unit"]), []).append(row)
+
+        current = {
+            key: (found[0]["id"], (found[0]["description"], found[0]["unit_price"], found[0]["tax_rate"]))
+            for key, found in matches.items()
+            if len(found) == 1
+        }
+        inserts: dict[str, tuple] = {}
+        updates: dict[str, tuple] = {}
+        for row_number, payload in payloads:
+            key = (payload.name, payload.unit)
+            values = (payload.description, payload.unit_price, payload.tax_rate)
+            if len(matches.get(key, ())) > 1:
+                ambiguous.append(row_number)
+                continue
+            if key not in current:
+                item_id = str(uuid4())
+                inserts[item_id] = (item_id, *key, *values, created_by, now, now)
+                counts["inserted"] += 1
+            elif current[key][1] == values:
+                counts["unchanged"] += 1
+                continue
+            else:
+                item_id = current[key][0]
+                if item_id in inserts:
+                    inserts[item_id] = (item_id, *key, *values, created_by, now, now)
+                else:
+                    updates[item_id] = (*values, now, item_id)
+                counts["updated"] += 1
+            current[key] = (item_id, values)
+
+        conn.executemany(
+            """
+            INSERT INTO catalog_items (
+                id,
+                name,
+                unit,
+                description,
+                unit_price,
+                tax_rate,
+                created_by,
+                created_at,
+                updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            list(inserts.values()),
+        )
+        conn.executemany(
+            """
+            UPDATE catalog_items
+            SET
+                description = ?,
+                unit_price = ?,
+                tax_rate = ?,
+                updated_at = ?
+            WHERE id = ? AND deleted_at IS NULL
+            """,
+            list(updates.values()),
+        )
+        conn.commit()
+
+    for item_id in updates:
+        _catalog_item_cache.invalidate((database_url, item_id))
+    return counts, ambiguous
+
+
+@timed_query("catalog_items.update")
 def update_catalog_item(database_url: str, item_id: str, payload: CatalogItemUpdate) -> dict | None:
     now = _utc_now()
-    with closing(_connect(database_url)) as conn:
-        cursor = conn.execute(
+    with connection(database_url) as conn:
+        row = conn.execute(
             """
             UPDATE catalog_items
             SET
@@ -175,6 +418,15 @@ def update_catalog_item(database_url: str, item_id: str, payload: CatalogItemUpd
                 tax_rate = ?,
                 updated_at = ?
             WHERE id = ? AND deleted_at IS NULL
+            RETURNING
+                id,
+                name,
+                description,
+                unit,
+                unit_price,
+                tax_rate,
+                created_at,
+                updated_at
             """,
             (
                 payload.name,
@@ -185,18 +437,22 @@ def update_catalog_item(database_url: str, item_id: str, payload: CatalogItemUpd
                 now,
                 item_id,
             ),
-        )
+        ).fetchone()
+        version = change_version(conn, "catalog_items")
         conn.commit()
 
-        if cursor.rowcount == 0:
-            return None
+    if not row:
+        return None
 
-    return get_catalog_item(database_url, item_id)
+    updated = _row_to_catalog_item(row)
+    _catalog_item_cache.set((database_url, item_id), updated, version)
+    return updated
 
 
+@timed_query("catalog_items.delete")
 def soft_delete_catalog_item(database_url: str, item_id: str) -> bool:
     now = _utc_now()
-    with closing(_connect(database_url)) as conn:
+    with connection(database_url) as conn:
         cursor = conn.execute(
             """
             UPDATE catalog_items
@@ -207,14 +463,5 @@ def soft_delete_catalog_item(database_url: str, item_id: str) -> bool:
         )
         conn.commit()
 
+    _catalog_item_cache.invalidate((database_url, item_id))
     return cursor.rowcount > 0
-
-
-def _current_user() -> str:
-    """Return the current user identifier for audit fields.
-
-    TODO: replace this stub with real user context once auth is available.
-    The future implementation should derive the user from the request context
-    (or equivalent service layer) and avoid hardcoded defaults.
-    """
-    return "dev"
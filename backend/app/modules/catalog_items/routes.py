@@ -1,57 +1,251 @@
-from fastapi import APIRouter, HTTPException, status
-
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.bulk import (
+    BULK_REQUEST_BODY,
+    BulkRowError,
+    UnsupportedMediaTypeError,
+    chunked,
+    request_records,
+    validate_records,
+)
+from app.core.conditional import (
+    get_change_counter,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
 from app.core.config import get_settings
+from app.core.database import run_db
+from app.core.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, decode_cursor, encode_cursor
+from app.core.projection import (
+    parse_fields,
+    project,
+    projection_model,
+    projection_page_model,
+)
+from app.core.responses import encode_json, json_response, respond
+from app.core.streaming import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    STREAM_BATCH_SIZE,
+    csv_response,
+    ndjson_response,
+    wants_ndjson,
+)
+from app.core.validation import FieldErrorRoute
 
 from .repository import (
+    CATALOG_ITEM_COLUMNS,
+    configure_catalog_item_cache,
     create_catalog_item,
     get_catalog_item,
     init_db,
+    iter_catalog_items,
     list_catalog_items,
     soft_delete_catalog_item,
+    suggest_catalog_items,
     update_catalog_item,
+    upsert_catalog_items_by_key,
+)
+from .schemas import (
+    MAX_NAME_LENGTH,
+    CatalogImportResult,
+    CatalogItemCreate,
+    CatalogItemOut,
+    CatalogItemPage,
+    CatalogItemSuggestion,
+    CatalogItemUpdate,
 )
-from .schemas import CatalogItemCreate, CatalogItemOut, CatalogItemUpdate
 
-router = APIRouter(prefix="/api/catalog-items", tags=["catalog-items"])
+router = APIRouter(
+    prefix="/api/catalog-items", tags=["catalog-items"], route_class=FieldErrorRoute
+)
 
 
 def _database_url() -> str:
     return get_settings().database_url
 
 
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+
+EXPORT_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "unit",
+    "unit_price",
+    "tax_rate",
+    "created_at",
+    "updated_at",
+]
+
+
 def init_module() -> None:
-    init_db(_database_url())
+    settings = get_settings()
+    init_db(settings.database_url)
+    configure_catalog_item_cache(
+        settings.entity_cache_capacity,
+        settings.entity_cache_ttl,
+        settings.entity_cache_revalidate,
+    )
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return, e.g. `name,unit_price`. `id` is always included.",
+)
 
 
-@router.get("", response_model=list[CatalogItemOut])
-def list_catalog_items_route() -> list[CatalogItemOut]:
-    return list_catalog_items(_database_url())
+def _parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(fields, CatalogItemOut)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+
+def _import_chunk(database_url: str, start: int, records: list) -> tuple[dict[str, int], list]:
+    valid, errors = validate_records(CatalogItemCreate, start, records)
+    counts, ambiguous = upsert_catalog_items_by_key(database_url, valid)
+    errors.extend(
+        BulkRowError(row=row, detail=[{"msg": "Multiple catalog items match name and unit"}])
+        for row in ambiguous
+    )
+    errors.sort(key=lambda error: error.row)
+    return counts, errors
+
+
+# Validated and encoded in the run_db worker: a 500-row page takes
+# milliseconds, which would otherwise block every request on the event loop.
+def _list_page(
+    database_url: str,
+    limit: int,
+    after: tuple[str, str] | None,
+    columns: tuple[str, ...],
+    model: type[BaseModel],
+) -> bytes:
+    items, next_key = list_catalog_items(database_url, limit, after, columns)
+    page = {"items": items, "next_cursor": encode_cursor(*next_key) if next_key else None}
+    return encode_json(page, model)
+
+
+@router.get(
+    "",
+    response_model=CatalogItemPage,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_catalog_items_route(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    stream: bool = False,
+    fields: str | None = FIELDS_QUERY,
+) -> CatalogItemPage:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    projection = _parse_fields(fields)
+    columns = projection or CATALOG_ITEM_COLUMNS
+    streaming = wants_ndjson(request, stream)
+    version, changed_at = await run_db(get_change_counter, _database_url(), "catalog_items")
+    etag = make_etag("catalog_items", version, str(request.query_params), streaming)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    if streaming:
+        streamed = ndjson_response(
+            iter_catalog_items(_database_url(), after, STREAM_BATCH_SIZE, columns)
+        )
+        set_validators(streamed, etag, changed_at)
+        return streamed
+    model = projection_page_model(CatalogItemOut, projection) if projection else CatalogItemPage
+    body = await run_db(_list_page, _database_url(), limit, after, columns, model)
+    set_validators(response, etag, changed_at)
+    return json_response(body, response)
 
 
 @router.post("", response_model=CatalogItemOut, status_code=status.HTTP_201_CREATED)
-def create_catalog_item_route(payload: CatalogItemCreate) -> CatalogItemOut:
-    return create_catalog_item(_database_url(), payload)
+async def create_catalog_item_route(payload: CatalogItemCreate) -> CatalogItemOut:
+    item = await run_db(create_catalog_item, _database_url(), payload)
+    return respond(item, status_code=status.HTTP_201_CREATED)
+
+
+@router.get(
+    "/export",
+    responses={200: {"content": {CSV_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}}},
+)
+async def export_catalog_items_route(
+    format: Literal["csv", "ndjson"] = "csv",
+) -> StreamingResponse:
+    batches = iter_catalog_items(_database_url(), None, STREAM_BATCH_SIZE)
+    if format == "ndjson":
+        return ndjson_response(batches)
+    return csv_response(batches, EXPORT_FIELDS, "catalog-items.csv")
+
+
+@router.get("/suggest", response_model=list[CatalogItemSuggestion])
+async def suggest_catalog_items_route(
+    prefix: str = Query(min_length=1, max_length=MAX_NAME_LENGTH),
+    limit: int = Query(DEFAULT_SUGGEST_LIMIT, ge=1, le=MAX_SUGGEST_LIMIT),
+) -> list[CatalogItemSuggestion]:
+    return respond(await run_db(suggest_catalog_items, _database_url(), prefix, limit))
+
+
+@router.post("/import", response_model=CatalogImportResult, openapi_extra=BULK_REQUEST_BODY)
+async def import_catalog_items_route(request: Request) -> CatalogImportResult:
+    try:
+        records = request_records(request)
+    except UnsupportedMediaTypeError as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from None
+
+    result = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": []}
+    try:
+        async for start, chunk in chunked(records):
+            counts, errors = await run_db(_import_chunk, _database_url(), start, chunk)
+            for name, count in counts.items():
+                result[name] += count
+            result["errors"].extend(errors)
+    except ValueError as exc:
+        # Only before the first row: later body errors arrive as the last row
+        # error, so the counts of the chunks already committed are returned.
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return result
 
 
 @router.get("/{item_id}", response_model=CatalogItemOut)
-def get_catalog_item_route(item_id: str) -> CatalogItemOut:
-    item = get_catalog_item(_database_url(), item_id)
+async def get_catalog_item_route(
+    item_id: str, request: Request, response: Response, fields: str | None = FIELDS_QUERY
+) -> CatalogItemOut:
+    projection = _parse_fields(fields)
+    item = await run_db(get_catalog_item, _database_url(), item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Catalog item not found")
-    return item
+    etag = make_etag(item, projection)
+    if is_not_modified(request, etag, item["updated_at"]):
+        return not_modified_response(etag, item["updated_at"])
+    set_validators(response, etag, item["updated_at"])
+    # Detail rows come whole from the entity cache; only encoding is narrowed.
+    model = projection_model(CatalogItemOut, projection) if projection else None
+    return respond(project(item, projection), response, model=model)
 
 
 @router.put("/{item_id}", response_model=CatalogItemOut)
-def update_catalog_item_route(item_id: str, payload: CatalogItemUpdate) -> CatalogItemOut:
-    item = update_catalog_item(_database_url(), item_id, payload)
+async def update_catalog_item_route(item_id: str, payload: CatalogItemUpdate) -> CatalogItemOut:
+    item = await run_db(update_catalog_item, _database_url(), item_id, payload)
     if not item:
         raise HTTPException(status_code=404, detail="Catalog item not found")
-    return item
+    return respond(item)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_catalog_item_route(item_id: str) -> None:
-    deleted = soft_delete_catalog_item(_database_url(), item_id)
+async def delete_catalog_item_route(item_id: str) -> None:
+    deleted = await run_db(soft_delete_catalog_item, _database_url(), item_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Catalog item not found")
     return None
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import logging
+import re
 import sqlite3
-from contextlib import closing
+from collections.abc import Iterator
 from datetime import datetime, timezone
-from pathlib import Path
 from uuid import uuid4
 
+from app.core.audit import current_user
+from app.core.cache import Cache, register_cache
+from app.core.conditional import change_version, ensure_change_counter, get_change_version
+from app.core.database import connection
+from app.core.metrics import timed_query
+from app.core.search import ensure_search_index
+
 from .schemas import ClientCreate, ClientUpdate
 
 
@@ -18,29 +26,45 @@ def _utc_now() -> str:
     )
 
 
-def _resolve_sqlite_path(database_url: str) -> Path:
-    if not database_url.startswith("sqlite:///"):
-        raise ValueError("Only sqlite database URLs are supported for now")
+# Partial index on live rows in keyset order: list pages are served by an
+# index seek with no temp B-tree sort. Lookups by id use the primary key.
+INDEXES = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_clients_live_created_at
+    ON clients (created_at DESC, id DESC)
+    WHERE deleted_at IS NULL
+    """,
+)
+
+
+SEARCH_COLUMNS = ("name", "city", "country", "main_contact", "ico", "dic", "notes")
+# bm25 weights, in SEARCH_COLUMNS order: names and registration numbers first.
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0, 4.0, 8.0, 8.0, 1.0)
+# Diacritics are folded on both sides, so "skoda" finds "Škoda".
+SEARCH_INDEX_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+# Every match is ranked. This only bounds the work of a query matching a huge
+# share of clients: past it only the newest matches are ranked and a warning
+# is logged.
+SEARCH_MATCH_LIMIT = 50_000
 
-    path_str = database_url.removeprefix("sqlite:///")
-    path = Path(path_str)
-    if not path.is_absolute():
-        path = Path.cwd() / path
+search_logger = logging.getLogger("app.search")
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return path
 
+# Detail reads by id, keyed by (database_url, id). This process's writes
+# refresh or drop the entry after commit. Entries are stored under the
+# clients change counter, looked up at most once per revalidation interval
+# per entry, so hits in between never touch SQLite and writes by other
+# workers are seen within the interval. Capacity, TTL and interval come from
+# Settings.
+_client_cache = register_cache(Cache("clients.entity"))
 
-def _connect(database_url: str) -> sqlite3.Connection:
-    path = _resolve_sqlite_path(database_url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+
+def configure_client_cache(capacity: int, ttl: float | None, revalidate: float) -> None:
+    _client_cache.configure(capacity, ttl, revalidate)
 
 
 def init_db(database_url: str) -> None:
-    with closing(_connect(database_url)) as conn:
+    with connection(database_url) as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS clients (
@@ -63,58 +87,171 @@ def init_db(database_url: str) -> None:
             )
             """
         )
+        for statement in INDEXES:
+            conn.execute(statement)
+        ensure_change_counter(conn, "clients")
+        ensure_search_index(conn, "clients", SEARCH_COLUMNS, SEARCH_INDEX_OPTIONS)
         conn.commit()
 
 
-def _row_to_client(row: sqlite3.Row) -> dict:
-    return {
-        "id": row["id"],
-        "name": row["name"],
-        "address": row["address"],
-        "city": row["city"],
-        "country": row["country"],
-        "main_contact_method": row["main_contact_method"],
-        "main_contact": row["main_contact"],
-        "additional_contact": row["additional_contact"],
-        "ico": row["ico"],
-        "dic": row["dic"],
-        "notes": row["notes"],
-        "favourite": bool(row["favourite"]),
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
-    }
-
-
-def list_clients(database_url: str) -> list[dict]:
-    with closing(_connect(database_url)) as conn:
+# Columns exposed by the API, in response order. List reads select only the
+# requested subset plus the keyset columns.
+CLIENT_COLUMNS = (
+    "id",
+    "name",
+    "address",
+    "city",
+    "country",
+    "main_contact_method",
+    "main_contact",
+    "additional_contact",
+    "ico",
+    "dic",
+    "notes",
+    "favourite",
+    "created_at",
+    "updated_at",
+)
+KEYSET_COLUMNS = ("created_at", "id")
+
+
+def _row_to_client(row: sqlite3.Row, fields: tuple[str, ...] = CLIENT_COLUMNS) -> dict:
+    client = {field: row[field] for field in fields}
+    if "favourite" in client:
+        client["favourite"] = bool(client["favourite"])
+    return client
+
+
+def _selected_columns(fields: tuple[str, ...]) -> str:
+    return ", ".join(dict.fromkeys((*fields, *KEYSET_COLUMNS)))
+
+
+@timed_query("clients.list")
+def list_clients(
+    database_url: str,
+    limit: int,
+    after: tuple[str, str] | None = None,
+    fields: tuple[str, ...] = CLIENT_COLUMNS,
+) -> tuple[list[dict], tuple[str, str] | None]:
+    keyset = "AND (created_at, id) < (?, ?)" if after else ""
+    with connection(database_url) as conn:
         rows = conn.execute(
-            """
-            SELECT
-                id,
-                name,
-                address,
-                city,
-                country,
-                main_contact_method,
-                main_contact,
-                additional_contact,
-                ico,
-                dic,
-                notes,
-                favourite,
-                created_at,
-                updated_at
+            f"""
+            SELECT {_selected_columns(fields)}
             FROM clients
-            WHERE deleted_at IS NULL
-            ORDER BY created_at DESC
-            """
+            WHERE deleted_at IS NULL {keyset}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (*(after or ()), limit + 1),
         ).fetchall()
 
-    return [_row_to_client(row) for row in rows]
+    items = [_row_to_client(row, fields) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    return items, (rows[limit - 1]["created_at"], rows[limit - 1]["id"])
+
+
+def iter_clients(
+    database_url: str,
+    after: tuple[str, str] | None = None,
+    batch_size: int = 500,
+    fields: tuple[str, ...] = CLIENT_COLUMNS,
+) -> Iterator[list[dict]]:
+    """Yield live clients in list order, ``batch_size`` at a time.
+
+    Each batch is a keyset page on its own short connection checkout, resumed
+    after the last row yielded, so a slow consumer holds neither a pooled
+    connection nor a read snapshot between batches.
+    """
+    while True:
+        batch, after = list_clients(database_url, batch_size, after, fields)
+        if batch:
+            yield batch
+        if after is None:
+            return
+
+
+def _match_expression(query: str) -> str | None:
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+@timed_query("clients.search")
+def search_clients(
+    database_url: str, query: str, limit: int, offset: int = 0
+) -> tuple[list[dict], int | None]:
+    """Rank live clients matching every word of ``query`` as a prefix.
+
+    All matches are ranked, up to the newest ``SEARCH_MATCH_LIMIT``. Returns
+    one page and the offset of the next one, or ``None`` on the last.
+    """
+    match = _match_expression(query)
+    if match is None:
+        return [], None
+
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+    with connection(database_url) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT
+                c.id,
+                c.name,
+                c.address,
+                c.city,
+                c.country,
+                c.main_contact_method,
+                c.main_contact,
+                c.additional_contact,
+                c.ico,
+                c.dic,
+                c.notes,
+                c.favourite,
+                c.created_at,
+                c.updated_at,
+                hit.matched
+            FROM (
+                SELECT rowid, score, count(*) OVER () AS matched
+                FROM (
+                    SELECT rowid, bm25(clients_fts, {weights}) AS score
+                    FROM clients_fts
+                    WHERE clients_fts MATCH ?
+                    ORDER BY rowid DESC
+                    LIMIT ?
+                )
+                ORDER BY score, rowid DESC
+                LIMIT ? OFFSET ?
+            ) AS hit
+            JOIN clients AS c ON c.rowid = hit.rowid
+            ORDER BY hit.score, hit.rowid DESC
+            """,
+            (match, SEARCH_MATCH_LIMIT, limit + 1, offset),
+        ).fetchall()
+
+    if rows and rows[0]["matched"] >= SEARCH_MATCH_LIMIT:
+        search_logger.warning(
+            "Client search %r matched at least %d clients; only the newest were ranked",
+            query,
+            SEARCH_MATCH_LIMIT,
+        )
+
+    items = [_row_to_client(row) for row in rows[:limit]]
+    return items, offset + limit if len(rows) > limit else None
 
 
 def get_client(database_url: str, client_id: str) -> dict | None:
-    with closing(_connect(database_url)) as conn:
+    return _client_cache.get_or_load(
+        (database_url, client_id),
+        lambda: _load_client(database_url, client_id),
+        lambda: get_change_version(database_url, "clients"),
+    )
+
+
+@timed_query("clients.get")
+def _load_client(database_url: str, client_id: str) -> dict | None:
+    with connection(database_url) as conn:
         row = conn.execute(
             """
             SELECT
@@ -144,12 +281,13 @@ def get_client(database_url: str, client_id: str) -> dict | None:
     return _row_to_client(row)
 
 
+@timed_query("clients.create")
 def create_client(database_url: str, payload: ClientCreate) -> dict:
     now = _utc_now()
-    created_by = _current_user()
+    created_by = current_user()
     client_id = str(uuid4())
-    with closing(_connect(database_url)) as conn:
-        cursor = conn.execute(
+    with connection(database_url) as conn:
+        row = conn.execute(
             """
             INSERT INTO clients (
                 id,
@@ -169,6 +307,21 @@ def create_client(database_url: str, payload: ClientCreate) -> dict:
                 updated_at
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING
+                id,
+                name,
+                address,
+                city,
+                country,
+                main_contact_method,
+                main_contact,
+                additional_contact,
+                ico,
+                dic,
+                notes,
+                favourite,
+                created_at,
+                updated_at
             """,
             (
                 client_id,
@@ -187,20 +340,72 @@ def create_client(database_url: str, payload: ClientCreate) -> dict:
                 now,
                 now,
             ),
-        )
+        ).fetchone()
+        version = change_version(conn, "clients")
         conn.commit()
 
-    created = get_client(database_url, client_id)
-    if not created:
-        raise RuntimeError("Failed to load created client")
-
+    created = _row_to_client(row)
+    _client_cache.set((database_url, created["id"]), created, version)
     return created
 
 
+@timed_query("clients.bulk_create")
+def bulk_create_clients(database_url: str, payloads: list[ClientCreate]) -> int:
+    now = _utc_now()
+    created_by = current_user()
+    with connection(database_url) as conn:
+        conn.executemany(
+            """
+            INSERT INTO clients (
+                id,
+                name,
+                address,
+                city,
+                country,
+                main_contact_method,
+                main_contact,
+                additional_contact,
+                ico,
+                dic,
+                notes,
+                favourite,
+                created_by,
+                created_at,
+                updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    str(uuid4()),
+                    payload.name,
+                    payload.address,
+                    payload.city,
+                    payload.country,
+                    payload.main_contact_method.value,
+                    payload.main_contact,
+                    payload.additional_contact,
+                    payload.ico,
+                    payload.dic,
+                    payload.notes,
+                    int(payload.favourite),
+                    created_by,
+                    now,
+                    now,
+                )
+                for payload in payloads
+            ],
+        )
+        conn.commit()
+
+    return len(payloads)
+
+
+@timed_query("clients.update")
 def update_client(database_url: str, client_id: str, payload: ClientUpdate) -> dict | None:
     now = _utc_now()
-    with closing(_connect(database_url)) as conn:
-        cursor = conn.execute(
+    with connection(database_url) as conn:
+        row = conn.execute(
             """
             UPDATE clients
             SET
@@ -217,6 +422,21 @@ def update_client(database_url: str, client_id: str, payload: ClientUpdate) -> d
                 favourite = ?,
                 updated_at = ?
             WHERE id = ? AND deleted_at IS NULL
+            RETURNING
+                id,
+                name,
+                address,
+                city,
+                country,
+                main_contact_method,
+                main_contact,
+                additional_contact,
+                ico,
+                dic,
+                notes,
+                favourite,
+                created_at,
+                updated_at
             """,
             (
                 payload.name,
@@ -233,18 +453,22 @@ def update_client(database_url: str, client_id: str, payload: ClientUpdate) -> d
                 now,
                 client_id,
             ),
-        )
+        ).fetchone()
+        version = change_version(conn, "clients")
         conn.commit()
 
-        if cursor.rowcount == 0:
-            return None
+    if not row:
+        return None
 
-    return get_client(database_url, client_id)
+    updated = _row_to_client(row)
+    _client_cache.set((database_url, client_id), updated, version)
+    return updated
 
 
+@timed_query("clients.delete")
 def soft_delete_client(database_url: str, client_id: str) -> bool:
     now = _utc_now()
-    with closing(_connect(database_url)) as conn:
+    with connection(database_url) as conn:
         cursor = conn.execute(
             """
             UPDATE clients
@@ -255,14 +479,5 @@ def soft_delete_client(database_url: str, client_id: str) -> bool:
         )
         conn.commit()
 
+    _client_cache.invalidate((database_url, client_id))
     return cursor.rowcount > 0
-
-
-def _current_user() -> str:
-    """Return the current user identifier for audit fields.
-
-    TODO: replace this stub with real user context once auth is available.
-    The future implementation should derive the user from the request context
-    (or equivalent service layer) and avoid hardcoded defaults.
-    """
-    return "dev"
@@ -1,11 +1,56 @@
-from fastapi import APIRouter, HTTPException, Response, status
-
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel
+
+from app.core.bulk import (
+    BULK_REQUEST_BODY,
+    UnsupportedMediaTypeError,
+    chunked,
+    request_records,
+    validate_records,
+)
+from app.core.conditional import (
+    get_change_counter,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
 from app.core.config import get_settings
-
-from .repository import create_client, get_client, init_db, list_clients, soft_delete_client, update_client
-from .schemas import ClientCreate, ClientOut, ClientUpdate
-
-router = APIRouter(prefix="/api/clients", tags=["clients"])
+from app.core.database import run_db
+from app.core.pagination import (
+    DEFAULT_PAGE_LIMIT,
+    MAX_PAGE_LIMIT,
+    decode_cursor,
+    decode_offset_cursor,
+    encode_cursor,
+    encode_offset_cursor,
+)
+from app.core.projection import (
+    parse_fields,
+    project,
+    projection_model,
+    projection_page_model,
+)
+from app.core.responses import encode_json, json_response, respond
+from app.core.streaming import NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE, ndjson_response, wants_ndjson
+from app.core.validation import FieldErrorRoute
+
+from .repository import (
+    CLIENT_COLUMNS,
+    bulk_create_clients,
+    configure_client_cache,
+    create_client,
+    get_client,
+    init_db,
+    iter_clients,
+    list_clients,
+    search_clients,
+    soft_delete_client,
+    update_client,
+)
+from .schemas import ClientBulkResult, ClientCreate, ClientOut, ClientPage, ClientUpdate
+
+router = APIRouter(prefix="/api/clients", tags=["clients"], route_class=FieldErrorRoute)
 
 
 def _database_url() -> str:
@@ -13,38 +58,159 @@ def _database_url() -> str:
 
 
 def init_module() -> None:
-    init_db(_database_url())
-
-
-@router.get("", response_model=list[ClientOut])
-def list_clients_route() -> list[ClientOut]:
-    return list_clients(_database_url())
+    settings = get_settings()
+    init_db(settings.database_url)
+    configure_client_cache(
+        settings.entity_cache_capacity,
+        settings.entity_cache_ttl,
+        settings.entity_cache_revalidate,
+    )
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return, e.g. `name,city`. `id` is always included.",
+)
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(fields, ClientOut)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+
+
+def _import_chunk(database_url: str, start: int, records: list) -> tuple[int, list]:
+    valid, errors = validate_records(ClientCreate, start, records)
+    created = bulk_create_clients(database_url, [payload for _, payload in valid]) if valid else 0
+    return created, errors
+
+
+# Page routes validate and encode in the run_db worker: a 500-row page takes
+# milliseconds, which would otherwise block every request on the event loop.
+def _list_page(
+    database_url: str,
+    limit: int,
+    after: tuple[str, str] | None,
+    columns: tuple[str, ...],
+    model: type[BaseModel],
+) -> bytes:
+    items, next_key = list_clients(database_url, limit, after, columns)
+    page = {"items": items, "next_cursor": encode_cursor(*next_key) if next_key else None}
+    return encode_json(page, model)
+
+
+def _search_page(database_url: str, q: str, limit: int, offset: int) -> bytes:
+    items, next_offset = search_clients(database_url, q, limit, offset)
+    page = {
+        "items": items,
+        "next_cursor": encode_offset_cursor(next_offset) if next_offset is not None else None,
+    }
+    return encode_json(page, ClientPage)
+
+
+@router.get(
+    "",
+    response_model=ClientPage,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_clients_route(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    stream: bool = False,
+    fields: str | None = FIELDS_QUERY,
+) -> ClientPage:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    projection = _parse_fields(fields)
+    columns = projection or CLIENT_COLUMNS
+    streaming = wants_ndjson(request, stream)
+    version, changed_at = await run_db(get_change_counter, _database_url(), "clients")
+    etag = make_etag("clients", version, str(request.query_params), streaming)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    if streaming:
+        streamed = ndjson_response(
+            iter_clients(_database_url(), after, STREAM_BATCH_SIZE, columns)
+        )
+        set_validators(streamed, etag, changed_at)
+        return streamed
+    model = projection_page_model(ClientOut, projection) if projection else ClientPage
+    body = await run_db(_list_page, _database_url(), limit, after, columns, model)
+    set_validators(response, etag, changed_at)
+    return json_response(body, response)
+
+
+@router.get("/search", response_model=ClientPage)
+async def search_clients_route(
+    q: str = Query(min_length=1, max_length=256),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+) -> ClientPage:
+    try:
+        offset = decode_offset_cursor(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    return json_response(await run_db(_search_page, _database_url(), q, limit, offset))
 
 
 @router.post("", response_model=ClientOut, status_code=status.HTTP_201_CREATED)
-def create_client_route(payload: ClientCreate) -> ClientOut:
-    return create_client(_database_url(), payload)
+async def create_client_route(payload: ClientCreate) -> ClientOut:
+    client = await run_db(create_client, _database_url(), payload)
+    return respond(client, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=ClientBulkResult, openapi_extra=BULK_REQUEST_BODY)
+async def bulk_create_clients_route(request: Request) -> ClientBulkResult:
+    try:
+        records = request_records(request)
+    except UnsupportedMediaTypeError as exc:
+        raise HTTPException(status_code=415, detail=str(exc)) from None
+
+    created = 0
+    errors = []
+    try:
+        async for start, chunk in chunked(records):
+            chunk_created, chunk_errors = await run_db(_import_chunk, _database_url(), start, chunk)
+            created += chunk_created
+            errors.extend(chunk_errors)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return {"created": created, "errors": errors}
 
 
 @router.get("/{client_id}", response_model=ClientOut)
-def get_client_route(client_id: str) -> ClientOut:
-    client = get_client(_database_url(), client_id)
+async def get_client_route(
+    client_id: str, request: Request, response: Response, fields: str | None = FIELDS_QUERY
+) -> ClientOut:
+    projection = _parse_fields(fields)
+    client = await run_db(get_client, _database_url(), client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    return client
+    etag = make_etag(client, projection)
+    if is_not_modified(request, etag, client["updated_at"]):
+        return not_modified_response(etag, client["updated_at"])
+    set_validators(response, etag, client["updated_at"])
+    # Detail rows come whole from the entity cache; only encoding is narrowed.
+    model = projection_model(ClientOut, projection) if projection else None
+    return respond(project(client, projection), response, model=model)
 
 
 @router.put("/{client_id}", response_model=ClientOut)
-def update_client_route(client_id: str, payload: ClientUpdate) -> ClientOut:
-    client = update_client(_database_url(), client_id, payload)
+async def update_client_route(client_id: str, payload: ClientUpdate) -> ClientOut:
+    client = await run_db(update_client, _database_url(), client_id, payload)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
-    return client
+    return respond(client)
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client_route(client_id: str) -> None:
-    deleted = soft_delete_client(_database_url(), client_id)
+async def delete_client_route(client_id: str) -> None:
+    deleted = await run_db(soft_delete_client, _database_url(), client_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Client not found")
     return None
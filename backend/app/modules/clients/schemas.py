@@ -1,8 +1,11 @@
 from enum import Enum
-from typing import Any
+from typing import Annotated, Any
 
 from pydantic import BaseModel, field_validator
 
+from app.core.bulk import BulkRowError
+from app.core.validation import BlankAsNone, OptionalText, RequiredText
+
 
 class ContactMethod(str, Enum):
     email = "email"
@@ -20,30 +23,19 @@ MAX_CLIENT_ICO_LENGTH = 32
 MAX_CLIENT_DIC_LENGTH = 32
 MAX_CLIENT_NOTES_LENGTH = 1024
 
-
-def _validate_length(value: str, max_len: int, label: str) -> str:
-    if len(value) > max_len:
-        raise ValueError(f"{label} must be at most {max_len} characters")
-    return value
+AdditionalContact = Annotated[str, OptionalText(MAX_CLIENT_ADDITIONAL_CONTACT_LENGTH)]
+Ico = Annotated[str, OptionalText(MAX_CLIENT_ICO_LENGTH)]
+Dic = Annotated[str, OptionalText(MAX_CLIENT_DIC_LENGTH)]
+Notes = Annotated[str, OptionalText(MAX_CLIENT_NOTES_LENGTH)]
 
 
 class ClientRequired(BaseModel):
-    name: str
-    address: str
-    city: str
-    country: str
+    name: Annotated[str, RequiredText(MAX_CLIENT_NAME_LENGTH)]
+    address: Annotated[str, RequiredText(MAX_CLIENT_ADDRESS_LENGTH)]
+    city: Annotated[str, RequiredText(MAX_CLIENT_CITY_LENGTH)]
+    country: Annotated[str, RequiredText(MAX_CLIENT_COUNTRY_LENGTH)]
     main_contact_method: ContactMethod
-    main_contact: str
-
-    @field_validator("name", "address", "city", "country", "main_contact", mode="before")
-    @classmethod
-    def strip_and_require(cls, value: Any) -> str:
-        if not isinstance(value, str):
-            raise ValueError("Must be a string")
-        trimmed = value.strip()
-        if not trimmed:
-            raise ValueError("Must not be empty")
-        return trimmed
+    main_contact: Annotated[str, RequiredText(MAX_CLIENT_MAIN_CONTACT_LENGTH)]
 
     @field_validator("main_contact_method", mode="before")
     @classmethod
@@ -52,127 +44,22 @@ class ClientRequired(BaseModel):
             return value.strip().lower()
         return value
 
-    @field_validator("name")
-    @classmethod
-    def validate_name_length(cls, value: str) -> str:
-        return _validate_length(value, MAX_CLIENT_NAME_LENGTH, "Name")
-
-    @field_validator("address")
-    @classmethod
-    def validate_address_length(cls, value: str) -> str:
-        return _validate_length(value, MAX_CLIENT_ADDRESS_LENGTH, "Address")
 
-    @field_validator("city")
-    @classmethod
-    def validate_city_length(cls, value: str) -> str:
-        return _validate_length(value, MAX_CLIENT_CITY_LENGTH, "City")
-
-    @field_validator("country")
-    @classmethod
-    def validate_country_length(cls, value: str) -> str:
-        return _validate_length(value, MAX_CLIENT_COUNTRY_LENGTH, "Country")
-
-    @field_validator("main_contact")
-    @classmethod
-    def validate_main_contact_length(cls, value: str) -> str:
-        return _validate_length(value, MAX_CLIENT_MAIN_CONTACT_LENGTH, "Main contact")
-
-
-class ClientCreate(ClientRequired):
-    additional_contact: str | None = None
-    ico: str | None = None
-    dic: str | None = None
-    notes: str | None = None
+class ClientCreate(ClientRequired, BlankAsNone):
+    additional_contact: AdditionalContact | None = None
+    ico: Ico | None = None
+    dic: Dic | None = None
+    notes: Notes | None = None
     favourite: bool = False
 
-    @field_validator("additional_contact", "ico", "dic", "notes", mode="before")
-    @classmethod
-    def strip_optional(cls, value: Any) -> str | None:
-        if value is None:
-            return None
-        if not isinstance(value, str):
-            raise ValueError("Must be a string")
-        trimmed = value.strip()
-        return trimmed or None
-
-    @field_validator("additional_contact")
-    @classmethod
-    def validate_additional_contact_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(
-            value, MAX_CLIENT_ADDITIONAL_CONTACT_LENGTH, "Additional contact"
-        )
-
-    @field_validator("ico")
-    @classmethod
-    def validate_ico_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_ICO_LENGTH, "ICO")
-
-    @field_validator("dic")
-    @classmethod
-    def validate_dic_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_DIC_LENGTH, "DIC")
-
-    @field_validator("notes")
-    @classmethod
-    def validate_notes_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_NOTES_LENGTH, "Notes")
-
 
-class ClientUpdate(ClientRequired):
-    additional_contact: str | None
-    ico: str | None
-    dic: str | None
-    notes: str | None
+class ClientUpdate(ClientRequired, BlankAsNone):
+    additional_contact: AdditionalContact | None
+    ico: Ico | None
+    dic: Dic | None
+    notes: Notes | None
     favourite: bool
 
-    @field_validator("additional_contact", "ico", "dic", "notes", mode="before")
-    @classmethod
-    def strip_optional(cls, value: Any) -> str | None:
-        if value is None:
-            return None
-        if not isinstance(value, str):
-            raise ValueError("Must be a string")
-        trimmed = value.strip()
-        return trimmed or None
-
-    @field_validator("additional_contact")
-    @classmethod
-    def validate_additional_contact_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(
-            value, MAX_CLIENT_ADDITIONAL_CONTACT_LENGTH, "Additional contact"
-        )
-
-    @field_validator("ico")
-    @classmethod
-    def validate_ico_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_ICO_LENGTH, "ICO")
-
-    @field_validator("dic")
-    @classmethod
-    def validate_dic_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_DIC_LENGTH, "DIC")
-
-    @field_validator("notes")
-    @classmethod
-    def validate_notes_length(cls, value: str | None) -> str | None:
-        if value is None:
-            return None
-        return _validate_length(value, MAX_CLIENT_NOTES_LENGTH, "Notes")
-
 
 class ClientOut(ClientRequired):
     additional_contact: str | None = None
@@ -183,3 +70,13 @@ class ClientOut(ClientRequired):
     id: str
     created_at: str
     updated_at: str
+
+
+class ClientPage(BaseModel):
+    items: list[ClientOut]
+    next_cursor: str | None = None
+
+
+class ClientBulkResult(BaseModel):
+    created: int
+    errors: list[BulkRowError]
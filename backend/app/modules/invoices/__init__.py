@@ -0,0 +1,3 @@
+from .routes import init_module, router
+
+__all__ = ["init_module", "router"]
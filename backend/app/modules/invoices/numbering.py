@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def init_numbering(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS invoice_number_sequences (
+            year INTEGER PRIMARY KEY,
+            last_sequence INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def check_number_format(number_format: str) -> None:
+    """Reject formats that cannot render or could repeat a number.
+
+    The format gets ``year`` and ``sequence`` as keyword arguments and must
+    use both, e.g. ``{year}-{sequence:06d}`` or ``INV/{sequence}/{year}``.
+    """
+    try:
+        samples = {
+            number_format.format(year=year, sequence=sequence)
+            for year, sequence in ((2026, 1), (2026, 2), (2027, 1))
+        }
+    except (KeyError, IndexError, ValueError) as exc:
+        raise ValueError(f"Invalid invoice number format {number_format!r}: {exc}") from None
+    if len(samples) != 3:
+        raise ValueError(
+            f"Invoice number format {number_format!r} must include both {{year}} and {{sequence}}"
+        )
+
+
+def allocate_invoice_number(conn: sqlite3.Connection, year: int, number_format: str) -> str:
+    """Take the next number in ``year`` inside the caller's write transaction.
+
+    The caller must already hold the write lock (``BEGIN IMMEDIATE``) and
+    insert the invoice before committing: the counter bump then commits or
+    rolls back with the invoice, so numbers are sequential without gaps, and
+    concurrent writers, in any process, queue on the lock instead of reading
+    the same counter.
+    """
+    if not conn.in_transaction:
+        raise RuntimeError("Invoice numbers must be allocated inside a write transaction")
+    (sequence,) = conn.execute(
+        """
+        INSERT INTO invoice_number_sequences (year, last_sequence)
+        VALUES (?, 1)
+        ON CONFLICT (year) DO UPDATE SET last_sequence = last_sequence + 1
+        RETURNING last_sequence
+        """,
+        (year,),
+    ).fetchone()
+    return number_format.format(year=year, sequence=sequence)
@@ -0,0 +1,370 @@
+"""Invoice PDF layout and a minimal PDF 1.4 writer.
+
+Standard library only, so render workers import nothing heavy. Text uses the
+built-in Helvetica fonts re-encoded to Windows-1250, so Czech and other
+Central European letters (``Řehoř Čech``) print as written; characters
+outside it fall back to their unaccented letter (``è`` prints as ``e``).
+Output depends only on the document, with no timestamps or random ids, so
+equal inputs give equal bytes and ``document_key`` can address the disk cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import textwrap
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+
+# Bump whenever the layout changes so cached files rendered by the old layout
+# are no longer addressed.
+PDF_LAYOUT_VERSION = 2
+PDF_MEDIA_TYPE = "application/pdf"
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+LINE_HEIGHT = 13
+
+# Helvetica advance widths (1/1000 em) for printable ASCII, from the standard
+# font metrics; accented letters are measured as their base letter and
+# anything else as a digit. Used to right-align amounts and to wrap
+# descriptions.
+_HELVETICA_WIDTHS = dict(
+    zip(
+        " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~",
+        (
+            278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+            556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+            1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+            667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+            333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+            556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+        ),
+    )
+)
+
+# Text is encoded as Windows-1250. PDF has no such named encoding, so the font
+# encoding is WinAnsi with these codes remapped to the Windows-1250 glyphs,
+# all of which the standard Helvetica fonts include.
+_CP1250_DIFFERENCES = {
+    0x8C: "Sacute", 0x8D: "Tcaron", 0x8F: "Zacute", 0x9C: "sacute", 0x9D: "tcaron",
+    0x9F: "zacute", 0xA1: "caron", 0xA2: "breve", 0xA3: "Lslash", 0xA5: "Aogonek",
+    0xAA: "Scedilla", 0xAF: "Zdotaccent", 0xB2: "ogonek", 0xB3: "lslash", 0xB9: "aogonek",
+    0xBA: "scedilla", 0xBC: "Lcaron", 0xBD: "hungarumlaut", 0xBE: "lcaron",
+    0xBF: "zdotaccent", 0xC0: "Racute", 0xC3: "Abreve", 0xC5: "Lacute", 0xC6: "Cacute",
+    0xC8: "Ccaron", 0xCA: "Eogonek", 0xCC: "Ecaron", 0xCF: "Dcaron", 0xD0: "Dcroat",
+    0xD1: "Nacute", 0xD2: "Ncaron", 0xD5: "Ohungarumlaut", 0xD8: "Rcaron", 0xD9: "Uring",
+    0xDB: "Uhungarumlaut", 0xDE: "Tcommaaccent", 0xE0: "racute", 0xE3: "abreve",
+    0xE5: "lacute", 0xE6: "cacute", 0xE8: "ccaron", 0xEA: "eogonek", 0xEC: "ecaron",
+    0xEF: "dcaron", 0xF0: "dcroat", 0xF1: "nacute", 0xF2: "ncaron", 0xF5: "ohungarumlaut",
+    0xF8: "rcaron", 0xF9: "uring", 0xFB: "uhungarumlaut", 0xFE: "tcommaaccent",
+    0xFF: "dotaccent",
+}
+
+ISSUER_FIELDS = (
+    "name",
+    "address",
+    "city",
+    "country",
+    "trade_licensing_office",
+    "ico",
+    "dic",
+    "email",
+    "phone",
+    "bank",
+    "iban",
+    "swift",
+)
+CLIENT_FIELDS = ("name", "address", "city", "country", "ico", "dic", "main_contact")
+INVOICE_FIELDS = (
+    "number",
+    "status",
+    "issue_date",
+    "due_date",
+    "notes",
+    "subtotal",
+    "tax_total",
+    "total",
+)
+LINE_FIELDS = ("description", "unit", "quantity", "unit_price", "tax_rate", "subtotal", "tax", "total")
+
+
+def invoice_document(invoice: dict, client: dict, issuer: dict) -> dict:
+    """Collect exactly the values printed on the PDF.
+
+    Ids and timestamps are left out, so edits that change nothing printed
+    keep the same ``document_key``.
+    """
+    return {
+        "issuer": {field: issuer[field] for field in ISSUER_FIELDS},
+        "client": {field: client[field] for field in CLIENT_FIELDS},
+        "invoice": {field: invoice[field] for field in INVOICE_FIELDS},
+        "lines": [{field: line[field] for field in LINE_FIELDS} for line in invoice["lines"]],
+    }
+
+
+def pdf_filename(number: str) -> str:
+    # Custom formats may contain separators such as "/" that are not safe in
+    # file or archive names.
+    return "invoice-" + re.sub(r"[^\w.-]+", "-", number, flags=re.ASCII) + ".pdf"
+
+
+def document_key(document: dict) -> str:
+    payload = json.dumps(
+        [PDF_LAYOUT_VERSION, document], sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _encode(value: str) -> bytes:
+    out = bytearray()
+    for char in value:
+        try:
+            out += char.encode("cp1250")
+        except UnicodeEncodeError:
+            base = unicodedata.normalize("NFKD", char)[:1]
+            out += base.encode("cp1250", errors="replace") if base else b"?"
+    return bytes(out)
+
+
+def _literal(value: str) -> str:
+    raw = _encode(value).replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return raw.replace(b"\r", b" ").replace(b"\n", b" ").decode("latin-1")
+
+
+def _char_width(char: str) -> int:
+    width = _HELVETICA_WIDTHS.get(char)
+    if width is None:
+        width = _HELVETICA_WIDTHS.get(unicodedata.normalize("NFKD", char)[:1], 556)
+    return width
+
+
+def text_width(value: str, size: float) -> float:
+    return sum(_char_width(char) for char in value) * size / 1000
+
+
+def _wrap(value: str, width: float, size: float) -> list[str]:
+    # Character-count wrap sized by the average glyph, then shortened until
+    # each line really fits.
+    columns = max(int(width / (size * 0.5)), 1)
+    lines: list[str] = []
+    for paragraph in value.splitlines() or [""]:
+        for line in textwrap.wrap(paragraph, columns) or [""]:
+            while len(line) > 1 and text_width(line, size) > width:
+                cut = line.rfind(" ", 0, len(line) - 1)
+                if cut <= 0:
+                    cut = len(line) - 1
+                lines.append(line[:cut].rstrip())
+                line = line[cut:].lstrip()
+            lines.append(line)
+    return lines
+
+
+def money(minor: int) -> str:
+    """``123456`` minor units -> ``1 234.56``."""
+    return f"{minor // 100:,}.{minor % 100:02d}".replace(",", " ")
+
+
+class _Canvas:
+    def __init__(self) -> None:
+        self.pages: list[list[str]] = []
+        self.new_page()
+
+    def new_page(self) -> None:
+        self.ops: list[str] = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height: float) -> bool:
+        """Start a new page unless ``height`` still fits; True if it did."""
+        if self.y - height >= MARGIN + LINE_HEIGHT:
+            return False
+        self.new_page()
+        return True
+
+    def text(
+        self, x: float, y: float, value: str, size: float = 9, bold: bool = False, right: bool = False
+    ) -> None:
+        if right:
+            x -= text_width(value, size)
+        font = "F2" if bold else "F1"
+        self.ops.append(f"BT /{font} {size} Tf {x:.2f} {y:.2f} Td ({_literal(value)}) Tj ET")
+
+    def rule(self, y: float) -> None:
+        self.ops.append(f"0.5 w {MARGIN} {y:.2f} m {PAGE_WIDTH - MARGIN} {y:.2f} l S")
+
+
+# Line table: description column width, then right edges of the number columns.
+_DESCRIPTION_WIDTH = 220
+_QUANTITY_RIGHT = 330
+_UNIT_LEFT = 338
+_PRICE_RIGHT = 440
+_TAX_RIGHT = 480
+_TOTAL_RIGHT = PAGE_WIDTH - MARGIN
+_CLIENT_LEFT = 320
+_PARTY_WIDTH = _CLIENT_LEFT - MARGIN - 20
+
+
+def _party(canvas: _Canvas, x: float, y: float, title: str, rows: list[str]) -> float:
+    canvas.text(x, y, title, size=8, bold=True)
+    y -= LINE_HEIGHT
+    for index, row in enumerate(rows):
+        for text in _wrap(row, _PARTY_WIDTH, 9):
+            canvas.text(x, y, text, bold=index == 0)
+            y -= LINE_HEIGHT
+    return y
+
+
+def _line_header(canvas: _Canvas) -> None:
+    y = canvas.y
+    canvas.text(MARGIN, y, "Description", bold=True)
+    canvas.text(_QUANTITY_RIGHT, y, "Qty", bold=True, right=True)
+    canvas.text(_UNIT_LEFT, y, "Unit", bold=True)
+    canvas.text(_PRICE_RIGHT, y, "Unit price", bold=True, right=True)
+    canvas.text(_TAX_RIGHT, y, "Tax %", bold=True, right=True)
+    canvas.text(_TOTAL_RIGHT, y, "Total", bold=True, right=True)
+    canvas.rule(y - 4)
+    canvas.y = y - LINE_HEIGHT - 4
+
+
+def _layout(document: dict) -> list[list[str]]:
+    issuer, client, invoice = document["issuer"], document["client"], document["invoice"]
+    canvas = _Canvas()
+
+    canvas.text(MARGIN, canvas.y, f"Invoice {invoice['number']}", size=18, bold=True)
+    if invoice["status"] == "cancelled":
+        canvas.text(_TOTAL_RIGHT, canvas.y, "CANCELLED", size=14, bold=True, right=True)
+    canvas.y -= 36
+
+    issuer_rows = [issuer["name"], issuer["address"], issuer["city"], issuer["country"]]
+    issuer_rows += [f"ICO: {issuer['ico']}", f"DIC: {issuer['dic']}", issuer["trade_licensing_office"]]
+    issuer_rows += [issuer["email"], issuer["phone"]]
+    client_rows = [client["name"], client["address"], client["city"], client["country"]]
+    client_rows += [f"ICO: {client['ico']}"] if client["ico"] else []
+    client_rows += [f"DIC: {client['dic']}"] if client["dic"] else []
+    client_rows.append(client["main_contact"])
+    bottom = min(
+        _party(canvas, MARGIN, canvas.y, "SUPPLIER", issuer_rows),
+        _party(canvas, _CLIENT_LEFT, canvas.y, "CUSTOMER", client_rows),
+    )
+
+    y = bottom - 10
+    for label, value in (("Issue date", invoice["issue_date"]), ("Due date", invoice["due_date"])):
+        canvas.text(MARGIN, y, label, bold=True)
+        canvas.text(MARGIN + 70, y, value)
+        y -= LINE_HEIGHT
+    canvas.y = y - 16
+
+    _line_header(canvas)
+    for line in document["lines"]:
+        description = _wrap(line["description"], _DESCRIPTION_WIDTH, 9)
+        if canvas.ensure(LINE_HEIGHT * len(description)):
+            _line_header(canvas)
+        y = canvas.y
+        tax_rate = line["tax_rate"]
+        canvas.text(_QUANTITY_RIGHT, y, f"{line['quantity']:,}".replace(",", " "), right=True)
+        canvas.text(_UNIT_LEFT, y, line["unit"][:16])
+        canvas.text(_PRICE_RIGHT, y, money(line["unit_price"]), right=True)
+        canvas.text(_TAX_RIGHT, y, f"{tax_rate}" if tax_rate is not None else "-", right=True)
+        canvas.text(_TOTAL_RIGHT, y, money(line["total"]), right=True)
+        for text in description:
+            canvas.text(MARGIN, canvas.y, text)
+            canvas.y -= LINE_HEIGHT
+
+    canvas.ensure(LINE_HEIGHT * 4)
+    canvas.rule(canvas.y + LINE_HEIGHT - 4)
+    for label, amount, bold in (
+        ("Subtotal", invoice["subtotal"], False),
+        ("Tax", invoice["tax_total"], False),
+        ("Total", invoice["total"], True),
+    ):
+        canvas.text(_PRICE_RIGHT, canvas.y, label, bold=bold, right=True)
+        canvas.text(_TOTAL_RIGHT, canvas.y, money(amount), bold=bold, right=True)
+        canvas.y -= LINE_HEIGHT
+
+    canvas.y -= 16
+    canvas.ensure(LINE_HEIGHT * 4)
+    canvas.text(MARGIN, canvas.y, "PAYMENT", size=8, bold=True)
+    canvas.y -= LINE_HEIGHT
+    for label, value in (("Bank", issuer["bank"]), ("IBAN", issuer["iban"]), ("SWIFT", issuer["swift"])):
+        canvas.text(MARGIN, canvas.y, label, bold=True)
+        canvas.text(MARGIN + 70, canvas.y, value)
+        canvas.y -= LINE_HEIGHT
+
+    if invoice["notes"]:
+        canvas.y -= 16
+        canvas.ensure(LINE_HEIGHT * 2)
+        canvas.text(MARGIN, canvas.y, "NOTES", size=8, bold=True)
+        canvas.y -= LINE_HEIGHT
+        for text in _wrap(invoice["notes"], PAGE_WIDTH - 2 * MARGIN, 9):
+            canvas.ensure(LINE_HEIGHT)
+            canvas.text(MARGIN, canvas.y, text)
+            canvas.y -= LINE_HEIGHT
+
+    count = len(canvas.pages)
+    for index, ops in enumerate(canvas.pages, start=1):
+        footer = f"{invoice['number']}  |  Page {index} of {count}"
+        ops.append(f"BT /F1 8 Tf {MARGIN} {MARGIN / 2:.2f} Td ({_literal(footer)}) Tj ET")
+    return canvas.pages
+
+
+def _assemble(pages: list[list[str]]) -> bytes:
+    font = "<< /Type /Font /Subtype /Type1 /BaseFont /{} /Encoding 5 0 R >>"
+    differences = " ".join(f"{code} /{glyph}" for code, glyph in _CP1250_DIFFERENCES.items())
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page ids are known
+        font.format("Helvetica").encode(),
+        font.format("Helvetica-Bold").encode(),
+        f"<< /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [{differences}] >>".encode(),
+    ]
+    page_ids = []
+    for ops in pages:
+        content = zlib.compress("\n".join(ops).encode("latin-1"), 6)
+        objects.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_invoice_pdf(document: dict) -> bytes:
+    return _assemble(_layout(document))
+
+
+def write_invoice_pdf(document: dict, path: str) -> float:
+    """Render ``document`` to ``path`` and return the render time in seconds.
+
+    Runs in a render worker process. The file is written under a temporary
+    name and renamed, so readers never see a partial PDF.
+    """
+    started = time.perf_counter()
+    data = render_invoice_pdf(document)
+    elapsed = time.perf_counter() - started
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, target)
+    return elapsed
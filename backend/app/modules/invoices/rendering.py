@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.core.metrics import PDF_CACHE_LOOKUPS, PDF_RENDER_DURATION
+
+from .pdf import document_key, write_invoice_pdf
+
+
+class PdfRenderer:
+    """Render invoice PDFs in a bounded process pool, cached on disk by content.
+
+    Files are named by ``document_key``, a hash of everything printed, so a
+    cached file is valid for as long as it exists and changed invoices simply
+    address a new file. Concurrent requests for the same document share one
+    render.
+    """
+
+    def __init__(self, cache_dir: Path, workers: int) -> None:
+        if workers < 1:
+            raise ValueError("PDF render workers must be at least 1")
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: dict[str, Future[float]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    async def render(self, document: dict, key: str | None = None) -> Path:
+        """Return the cached PDF for ``document``, rendering it first if needed."""
+        key = key or document_key(document)
+        path = self.path_for(key)
+        # A stat on a slow or network disk must not stall the event loop.
+        if await asyncio.to_thread(path.is_file):
+            PDF_CACHE_LOOKUPS.inc(("hit",))
+            return path
+        PDF_CACHE_LOOKUPS.inc(("miss",))
+        # Shielded: a client that disconnects must not cancel a render other
+        # requests are waiting on.
+        await asyncio.shield(asyncio.wrap_future(self._submit(key, document, path)))
+        return path
+
+    async def render_many(
+        self, documents: AsyncIterator[dict]
+    ) -> AsyncGenerator[tuple[dict, Path], None]:
+        """Yield ``(document, path)`` in input order, rendering ahead of the consumer.
+
+        At most two documents per worker are in flight, so a slow consumer
+        holds back rendering and reading instead of letting them pile up.
+        """
+        window = self.workers * 2
+        pending: deque[tuple[dict, asyncio.Task[Path]]] = deque()
+        try:
+            async for document in documents:
+                pending.append((document, asyncio.create_task(self.render(document))))
+                if len(pending) >= window:
+                    document, task = pending.popleft()
+                    yield document, await task
+            while pending:
+                document, task = pending.popleft()
+                yield document, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def _submit(self, key: str, document: dict, path: Path) -> Future[float]:
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            # Spawned workers start clean instead of forking the server's
+            # threads and open database connections.
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            future = self._pool.submit(write_invoice_pdf, document, str(path))
+            self._pending[key] = future
+        # Outside the lock: a render that already finished runs the callback
+        # right here.
+        future.add_done_callback(partial(self._finished, key))
+        return future
+
+    def _finished(self, key: str, future: Future[float]) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            PDF_RENDER_DURATION.observe((), future.result())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_renderer: PdfRenderer | None = None
+_renderer_lock = threading.Lock()
+
+
+def get_pdf_renderer() -> PdfRenderer:
+    global _renderer
+    if _renderer is not None:
+        return _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            settings = get_settings()
+            cache_dir = Path(settings.pdf_cache_dir)
+            if not cache_dir.is_absolute():
+                cache_dir = Path.cwd() / cache_dir
+            _renderer = PdfRenderer(cache_dir, settings.pdf_render_workers)
+        return _renderer
+
+
+def shutdown_pdf_renderer() -> None:
+    global _renderer
+    with _renderer_lock:
+        renderer, _renderer = _renderer, None
+    if renderer is not None:
+        renderer.shutdown()
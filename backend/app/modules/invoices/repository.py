@@ -0,0 +1,632 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.core.audit import current_user
+from app.core.cache import Cache, register_cache
+from app.core.conditional import change_version, ensure_change_counter, get_change_version
+from app.core.config import get_settings
+from app.core.database import connection
+from app.core.metrics import timed_query
+from app.modules.users.repository import get_user
+
+from .numbering import allocate_invoice_number, init_numbering
+from .pdf import CLIENT_FIELDS, invoice_document
+from .revenue import apply_invoice_revenue, init_revenue
+from .schemas import DEFAULT_PAYMENT_TERM_DAYS, InvoiceCreate, InvoiceLineIn, InvoiceUpdate
+
+
+class InvoiceReferenceError(ValueError):
+    """The payload names a client or catalog item that does not exist."""
+
+
+class InvoiceStateError(RuntimeError):
+    """The invoice's status does not allow the requested change."""
+
+
+def _utc_now() -> str:
+    return (
+        datetime.now(timezone.utc)
+        .replace(microsecond=0)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+# Invoices are never deleted, only cancelled, so the indexes are not partial.
+# Numbers are unique across all years; keyset order serves list pages, the
+# client index serves per-client pages and the issue date index serves
+# exports by period, already in (issue_date, number) order.
+# Lines are a WITHOUT ROWID table clustered on (invoice_id, position), so an
+# invoice's lines sit together and come back in order from the primary key.
+INDEXES = (
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_number
+    ON invoices (number)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_invoices_created_at
+    ON invoices (created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_invoices_client_created_at
+    ON invoices (client_id, created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_invoices_issue_date
+    ON invoices (issue_date, number)
+    """,
+)
+
+# Invoices per batch when streaming documents for export; each may carry up
+# to MAX_INVOICE_LINES lines.
+DOCUMENT_BATCH_SIZE = 50
+
+
+# Detail reads by id, keyed by (database_url, id). Entries are stored under the
+# invoices change counter and reloaded once it moves, so an invoice edited or
+# cancelled by another worker is never served, or printed, stale. Writes store
+# the written invoice after commit; capacity and TTL come from Settings.
+_invoice_cache = register_cache(Cache("invoices.entity"))
+
+
+def configure_invoice_cache(capacity: int, ttl: float | None) -> None:
+    _invoice_cache.configure(capacity, ttl)
+
+
+def init_db(database_url: str) -> None:
+    with connection(database_url) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS invoices (
+                id TEXT PRIMARY KEY,
+                number TEXT NOT NULL,
+                client_id TEXT NOT NULL REFERENCES clients (id),
+                status TEXT NOT NULL DEFAULT 'issued' CHECK (status IN ('issued', 'cancelled')),
+                issue_date TEXT NOT NULL,
+                due_date TEXT NOT NULL,
+                notes TEXT,
+                subtotal INTEGER NOT NULL,
+                tax_total INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                created_by TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                cancelled_at TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS invoice_lines (
+                invoice_id TEXT NOT NULL REFERENCES invoices (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                catalog_item_id TEXT REFERENCES catalog_items (id),
+                description TEXT NOT NULL,
+                unit TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price INTEGER NOT NULL,
+                tax_rate INTEGER,
+                subtotal INTEGER NOT NULL,
+                tax INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                PRIMARY KEY (invoice_id, position)
+            ) WITHOUT ROWID
+            """
+        )
+        for statement in INDEXES:
+            conn.execute(statement)
+        init_numbering(conn)
+        init_revenue(conn)
+        ensure_change_counter(conn, "invoices")
+        conn.commit()
+
+
+def line_amounts(quantity: int, unit_price: int, tax_rate: int | None) -> tuple[int, int, int]:
+    """Return a line's ``(subtotal, tax, total)`` in minor currency units.
+
+    Integer arithmetic only: tax is ``tax_rate`` percent of the subtotal,
+    rounded half up to a whole minor unit.
+    """
+    subtotal = quantity * unit_price
+    tax = (subtotal * tax_rate + 50) // 100 if tax_rate else 0
+    return subtotal, tax, subtotal + tax
+
+
+# Summary columns exposed by list pages, in response order. Detail reads add
+# the lines.
+INVOICE_COLUMNS = (
+    "id",
+    "number",
+    "client_id",
+    "status",
+    "issue_date",
+    "due_date",
+    "notes",
+    "subtotal",
+    "tax_total",
+    "total",
+    "created_at",
+    "updated_at",
+    "cancelled_at",
+)
+LINE_COLUMNS = (
+    "position",
+    "catalog_item_id",
+    "description",
+    "unit",
+    "quantity",
+    "unit_price",
+    "tax_rate",
+    "subtotal",
+    "tax",
+    "total",
+)
+
+_INVOICE_SELECT = ", ".join(f"invoice.{column}" for column in INVOICE_COLUMNS)
+_LINE_SELECT = ", ".join(f"line.{column} AS line_{column}" for column in LINE_COLUMNS)
+
+
+def _row_to_invoice(row: sqlite3.Row) -> dict:
+    return {column: row[column] for column in INVOICE_COLUMNS}
+
+
+@timed_query("invoices.list")
+def list_invoices(
+    database_url: str,
+    limit: int,
+    after: tuple[str, str] | None = None,
+    client_id: str | None = None,
+) -> tuple[list[dict], tuple[str, str] | None]:
+    """Page through invoice summaries, newest first, reading stored totals only."""
+    conditions = []
+    params: list[object] = []
+    if client_id is not None:
+        conditions.append("client_id = ?")
+        params.append(client_id)
+    if after:
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with connection(database_url) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(INVOICE_COLUMNS)}
+            FROM invoices
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        ).fetchall()
+
+    items = [_row_to_invoice(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    return items, (rows[limit - 1]["created_at"], rows[limit - 1]["id"])
+
+
+def _fetch_invoice(conn: sqlite3.Connection, invoice_id: str) -> dict | None:
+    """Read an invoice and its lines in one statement."""
+    rows = conn.execute(
+        f"""
+        SELECT {_INVOICE_SELECT}, {_LINE_SELECT}
+        FROM invoices AS invoice
+        LEFT JOIN invoice_lines AS line ON line.invoice_id = invoice.id
+        WHERE invoice.id = ?
+        ORDER BY line.position
+        """,
+        (invoice_id,),
+    ).fetchall()
+    if not rows:
+        return None
+
+    invoice = _row_to_invoice(rows[0])
+    invoice["lines"] = [
+        {column: row[f"line_{column}"] for column in LINE_COLUMNS}
+        for row in rows
+        if row["line_position"] is not None
+    ]
+    return invoice
+
+
+def get_invoice(database_url: str, invoice_id: str) -> dict | None:
+    return _invoice_cache.get_or_load(
+        (database_url, invoice_id),
+        lambda: _load_invoice(database_url, invoice_id),
+        get_change_version(database_url, "invoices"),
+    )
+
+
+@timed_query("invoices.get")
+def _load_invoice(database_url: str, invoice_id: str) -> dict | None:
+    with connection(database_url) as conn:
+        return _fetch_invoice(conn, invoice_id)
+
+
+def get_invoice_document(database_url: str, invoice_id: str) -> dict | None:
+    """Everything the PDF prints: the invoice, its client and the issuer profile.
+
+    ``None`` if the invoice does not exist. Raises ``InvoiceStateError`` while
+    the issuer profile is not filled in.
+    """
+    invoice = get_invoice(database_url, invoice_id)
+    if invoice is None:
+        return None
+    issuer = _document_issuer(database_url)
+    client = _load_document_client(database_url, invoice["client_id"])
+    return invoice_document(invoice, client, issuer)
+
+
+def _document_issuer(database_url: str) -> dict:
+    issuer = get_user(database_url)
+    if issuer is None or None in issuer.values():
+        raise InvoiceStateError("Fill in the issuer profile before downloading invoices")
+    return issuer
+
+
+@timed_query("invoices.document_client")
+def _load_document_client(database_url: str, client_id: str) -> dict:
+    with connection(database_url) as conn:
+        return _fetch_document_clients(conn, [client_id])[client_id]
+
+
+def _fetch_document_clients(conn: sqlite3.Connection, client_ids: list[str]) -> dict[str, dict]:
+    # Deleted clients still print on the invoices they were billed on.
+    rows = conn.execute(
+        f"""
+        SELECT id, {", ".join(CLIENT_FIELDS)}
+        FROM clients
+        WHERE id IN ({", ".join("?" * len(client_ids))})
+        """,
+        client_ids,
+    ).fetchall()
+    return {row["id"]: {field: row[field] for field in CLIENT_FIELDS} for row in rows}
+
+
+def _fetch_lines(conn: sqlite3.Connection, invoice_ids: list[str]) -> dict[str, list[dict]]:
+    rows = conn.execute(
+        f"""
+        SELECT invoice_id, {", ".join(LINE_COLUMNS)}
+        FROM invoice_lines
+        WHERE invoice_id IN ({", ".join("?" * len(invoice_ids))})
+        ORDER BY invoice_id, position
+        """,
+        invoice_ids,
+    ).fetchall()
+    lines: dict[str, list[dict]] = {}
+    for row in rows:
+        lines.setdefault(row["invoice_id"], []).append({column: row[column] for column in LINE_COLUMNS})
+    return lines
+
+
+def iter_invoice_documents(
+    database_url: str,
+    issued_from: date | None = None,
+    issued_to: date | None = None,
+    client_id: str | None = None,
+    batch_size: int = DOCUMENT_BATCH_SIZE,
+) -> Iterator[list[dict]]:
+    """Return batches of PDF documents for the matching invoices, by issue date
+    then number.
+
+    Raises ``InvoiceStateError`` right away, before anything is streamed, if
+    the issuer profile is not filled in.
+    """
+    issuer = _document_issuer(database_url)
+    conditions = []
+    params: list[object] = []
+    if issued_from is not None:
+        conditions.append("issue_date >= ?")
+        params.append(issued_from.isoformat())
+    if issued_to is not None:
+        conditions.append("issue_date <= ?")
+        params.append(issued_to.isoformat())
+    if client_id is not None:
+        conditions.append("client_id = ?")
+        params.append(client_id)
+    return _iter_documents(database_url, issuer, conditions, params, batch_size)
+
+
+def _iter_documents(
+    database_url: str,
+    issuer: dict,
+    conditions: list[str],
+    params: list[object],
+    batch_size: int,
+) -> Iterator[list[dict]]:
+    # Each batch is a keyset page on (issue_date, number), with its lines and
+    # clients read by one query each on the same short checkout. The
+    # connection, and its read snapshot, is released before the batch is
+    # yielded, so rendering and sending never hold it; memory is bounded by
+    # batch_size rather than by the number of invoices.
+    after: tuple[str, str] | None = None
+    while True:
+        keyset = ["(issue_date, number) > (?, ?)"] if after else []
+        where = " AND ".join((*conditions, *keyset))
+        with connection(database_url) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join(INVOICE_COLUMNS)}
+                FROM invoices
+                {f"WHERE {where}" if where else ""}
+                ORDER BY issue_date, number
+                LIMIT ?
+                """,
+                (*params, *(after or ()), batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            invoices = [_row_to_invoice(row) for row in rows]
+            lines = _fetch_lines(conn, [invoice["id"] for invoice in invoices])
+            clients = _fetch_document_clients(
+                conn, list({invoice["client_id"] for invoice in invoices})
+            )
+        yield [
+            invoice_document(
+                {**invoice, "lines": lines.get(invoice["id"], [])},
+                clients[invoice["client_id"]],
+                issuer,
+            )
+            for invoice in invoices
+        ]
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1]["issue_date"], rows[-1]["number"])
+
+
+def _check_client(conn: sqlite3.Connection, client_id: str) -> None:
+    row = conn.execute(
+        "SELECT 1 FROM clients WHERE id = ? AND deleted_at IS NULL", (client_id,)
+    ).fetchone()
+    if not row:
+        raise InvoiceReferenceError("Client not found")
+
+
+def _resolve_lines(
+    conn: sqlite3.Connection, invoice_id: str, lines: Iterable[InvoiceLineIn]
+) -> list[tuple]:
+    """Snapshot catalog values onto the lines and compute their amounts.
+
+    Returns ``invoice_lines`` rows, positions numbered from 1.
+    """
+    lines = list(lines)
+    item_ids = list({line.catalog_item_id for line in lines if line.catalog_item_id})
+    items: dict[str, sqlite3.Row] = {}
+    if item_ids:
+        rows = conn.execute(
+            f"""
+            SELECT id, name, unit, unit_price, tax_rate
+            FROM catalog_items
+            WHERE deleted_at IS NULL AND id IN ({", ".join("?" * len(item_ids))})
+            """,
+            item_ids,
+        ).fetchall()
+        items = {row["id"]: row for row in rows}
+
+    resolved = []
+    for position, line in enumerate(lines, start=1):
+        given = line.model_fields_set
+        values = {
+            "description": line.description,
+            "unit": line.unit,
+            "unit_price": line.unit_price,
+            "tax_rate": line.tax_rate,
+        }
+        if line.catalog_item_id:
+            item = items.get(line.catalog_item_id)
+            if item is None:
+                raise InvoiceReferenceError(f"Catalog item not found: {line.catalog_item_id}")
+            snapshot = {
+                "description": item["name"],
+                "unit": item["unit"],
+                "unit_price": item["unit_price"],
+                "tax_rate": item["tax_rate"],
+            }
+            for name, value in values.items():
+                # Only tax_rate may be overridden with null (untaxed).
+                if name not in given or (value is None and name != "tax_rate"):
+                    values[name] = snapshot[name]
+        subtotal, tax, total = line_amounts(line.quantity, values["unit_price"], values["tax_rate"])
+        resolved.append(
+            (
+                invoice_id,
+                position,
+                line.catalog_item_id,
+                values["description"],
+                values["unit"],
+                line.quantity,
+                values["unit_price"],
+                values["tax_rate"],
+                subtotal,
+                tax,
+                total,
+            )
+        )
+    return resolved
+
+
+def _insert_lines(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO invoice_lines (
+            invoice_id,
+            position,
+            catalog_item_id,
+            description,
+            unit,
+            quantity,
+            unit_price,
+            tax_rate,
+            subtotal,
+            tax,
+            total
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def _totals(rows: list[tuple]) -> tuple[int, int, int]:
+    subtotal = sum(row[8] for row in rows)
+    tax_total = sum(row[9] for row in rows)
+    return subtotal, tax_total, subtotal + tax_total
+
+
+@timed_query("invoices.create")
+def create_invoice(database_url: str, payload: InvoiceCreate) -> dict:
+    now = _utc_now()
+    created_by = current_user()
+    invoice_id = str(uuid4())
+    issue_date = payload.issue_date or datetime.now(timezone.utc).date()
+    due_date = payload.due_date or issue_date + timedelta(days=DEFAULT_PAYMENT_TERM_DAYS)
+    number_format = get_settings().invoice_number_format
+    with connection(database_url) as conn:
+        _check_client(conn, payload.client_id)
+        lines = _resolve_lines(conn, invoice_id, payload.lines)
+        # Lookups above run outside the lock. BEGIN IMMEDIATE takes the write
+        # lock up front, so creators in every process queue on busy_timeout
+        # and the counter bump and revenue summaries commit or roll back with
+        # the invoice.
+        conn.execute("BEGIN IMMEDIATE")
+        number = allocate_invoice_number(conn, issue_date.year, number_format)
+        conn.execute(
+            """
+            INSERT INTO invoices (
+                id,
+                number,
+                client_id,
+                issue_date,
+                due_date,
+                notes,
+                subtotal,
+                tax_total,
+                total,
+                created_by,
+                created_at,
+                updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                invoice_id,
+                number,
+                payload.client_id,
+                issue_date.isoformat(),
+                due_date.isoformat(),
+                payload.notes,
+                *_totals(lines),
+                created_by,
+                now,
+                now,
+            ),
+        )
+        _insert_lines(conn, lines)
+        apply_invoice_revenue(conn, invoice_id)
+        version = change_version(conn, "invoices")
+        conn.commit()
+        created = _fetch_invoice(conn, invoice_id)
+
+    _invoice_cache.set((database_url, invoice_id), created, version)
+    return created
+
+
+@timed_query("invoices.update")
+def update_invoice(database_url: str, invoice_id: str, payload: InvoiceUpdate) -> dict | None:
+    """Replace an issued invoice's header and lines; ``None`` if it does not exist.
+
+    Raises ``InvoiceStateError`` for cancelled invoices and for an
+    ``issue_date`` in another year than the one the number was allocated in.
+    """
+    now = _utc_now()
+    with connection(database_url) as conn:
+        _check_client(conn, payload.client_id)
+        lines = _resolve_lines(conn, invoice_id, payload.lines)
+        # The old amounts come off the revenue summaries and the new ones go
+        # on under the same write lock as the change itself.
+        conn.execute("BEGIN IMMEDIATE")
+        apply_invoice_revenue(conn, invoice_id, -1)
+        cursor = conn.execute(
+            """
+            UPDATE invoices
+            SET
+                client_id = ?,
+                issue_date = ?,
+                due_date = ?,
+                notes = ?,
+                subtotal = ?,
+                tax_total = ?,
+                total = ?,
+                updated_at = ?
+            WHERE id = ? AND status = 'issued' AND substr(issue_date, 1, 4) = ?
+            """,
+            (
+                payload.client_id,
+                payload.issue_date.isoformat(),
+                payload.due_date.isoformat(),
+                payload.notes,
+                *_totals(lines),
+                now,
+                invoice_id,
+                f"{payload.issue_date.year:04d}",
+            ),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            row = conn.execute(
+                "SELECT status FROM invoices WHERE id = ?", (invoice_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] != "issued":
+                raise InvoiceStateError("Cancelled invoices cannot be changed")
+            # The number belongs to its year's gap-free sequence.
+            raise InvoiceStateError("The issue date cannot be moved to another year")
+        conn.execute("DELETE FROM invoice_lines WHERE invoice_id = ?", (invoice_id,))
+        _insert_lines(conn, lines)
+        apply_invoice_revenue(conn, invoice_id)
+        version = change_version(conn, "invoices")
+        conn.commit()
+        updated = _fetch_invoice(conn, invoice_id)
+
+    _invoice_cache.set((database_url, invoice_id), updated, version)
+    return updated
+
+
+@timed_query("invoices.cancel")
+def cancel_invoice(database_url: str, invoice_id: str) -> dict | None:
+    """Mark an issued invoice cancelled; ``None`` if it does not exist.
+
+    Raises ``InvoiceStateError`` if it is already cancelled.
+    """
+    now = _utc_now()
+    with connection(database_url) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        apply_invoice_revenue(conn, invoice_id, -1)
+        cursor = conn.execute(
+            """
+            UPDATE invoices
+            SET status = 'cancelled', cancelled_at = ?, updated_at = ?
+            WHERE id = ? AND status = 'issued'
+            """,
+            (now, now, invoice_id),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            _raise_if_exists(conn, invoice_id, "Invoice is already cancelled")
+            return None
+        version = change_version(conn, "invoices")
+        conn.commit()
+        cancelled = _fetch_invoice(conn, invoice_id)
+
+    _invoice_cache.set((database_url, invoice_id), cancelled, version)
+    return cancelled
+
+
+def _raise_if_exists(conn: sqlite3.Connection, invoice_id: str, message: str) -> None:
+    if conn.execute("SELECT 1 FROM invoices WHERE id = ?", (invoice_id,)).fetchone():
+        raise InvoiceStateError(message)
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import sqlite3
+
+from app.core.database import connection
+
+# Untaxed lines are summed under this rate: a NULL in the key would never
+# match ON CONFLICT, so every change would add a row instead of updating one.
+UNTAXED = -1
+
+# table -> (key columns, count column). Every table also sums subtotal,
+# tax_total and total over issued invoices; cancelled ones count for nothing.
+REVENUE_TABLES = {
+    "revenue_by_client": (("client_id",), "invoice_count"),
+    "revenue_by_month": (("month",), "invoice_count"),
+    "revenue_by_tax_rate": (("month", "tax_rate"), "line_count"),
+}
+AMOUNT_COLUMNS = ("subtotal", "tax_total", "total")
+
+
+def init_revenue(conn: sqlite3.Connection) -> None:
+    """Create the summary tables, filling them from existing invoices the
+    first time."""
+    existing = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'revenue_by_month'"
+    ).fetchone()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revenue_by_client (
+            client_id TEXT PRIMARY KEY,
+            invoice_count INTEGER NOT NULL,
+            subtotal INTEGER NOT NULL,
+            tax_total INTEGER NOT NULL,
+            total INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_revenue_by_client_total
+        ON revenue_by_client (total DESC, client_id DESC)
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revenue_by_month (
+            month TEXT PRIMARY KEY,
+            invoice_count INTEGER NOT NULL,
+            subtotal INTEGER NOT NULL,
+            tax_total INTEGER NOT NULL,
+            total INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS revenue_by_tax_rate (
+            month TEXT NOT NULL,
+            tax_rate INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            subtotal INTEGER NOT NULL,
+            tax_total INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            PRIMARY KEY (month, tax_rate)
+        ) WITHOUT ROWID
+        """
+    )
+    if not existing:
+        _store(conn, compute_revenue(conn))
+
+
+def apply_invoice_revenue(conn: sqlite3.Connection, invoice_id: str, sign: int = 1) -> None:
+    """Add an issued invoice's amounts to the summaries, or take them off with
+    ``sign=-1``.
+
+    Call it inside the write transaction that changes the invoice: after
+    inserting a new state, before replacing or cancelling an old one. The
+    summaries then commit or roll back with the invoice. Cancelled invoices
+    are not counted, so the call does nothing for them.
+    """
+    invoice = conn.execute(
+        """
+        SELECT client_id, issue_date, subtotal, tax_total, total
+        FROM invoices
+        WHERE id = ? AND status = 'issued'
+        """,
+        (invoice_id,),
+    ).fetchone()
+    if invoice is None:
+        return
+    month = invoice["issue_date"][:7]
+    amounts = [sign, *(sign * invoice[column] for column in AMOUNT_COLUMNS)]
+    _add(conn, "revenue_by_client", (invoice["client_id"],), amounts)
+    _add(conn, "revenue_by_month", (month,), amounts)
+    rates = conn.execute(
+        """
+        SELECT ifnull(tax_rate, ?), count(*), sum(subtotal), sum(tax), sum(total)
+        FROM invoice_lines
+        WHERE invoice_id = ?
+        GROUP BY 1
+        """,
+        (UNTAXED, invoice_id),
+    ).fetchall()
+    for tax_rate, *line_amounts in rates:
+        _add(conn, "revenue_by_tax_rate", (month, tax_rate), [sign * value for value in line_amounts])
+
+
+def _add(conn: sqlite3.Connection, table: str, key: tuple, amounts: list[int]) -> None:
+    key_columns, count_column = REVENUE_TABLES[table]
+    counters = (count_column, *AMOUNT_COLUMNS)
+    conn.execute(
+        f"""
+        INSERT INTO {table} ({", ".join((*key_columns, *counters))})
+        VALUES ({", ".join("?" * (len(key_columns) + len(counters)))})
+        ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET
+            {", ".join(f"{column} = {column} + excluded.{column}" for column in counters)}
+        """,
+        (*key, *amounts),
+    )
+    if amounts[0] < 0:
+        conn.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE {" AND ".join(f"{column} = ?" for column in key_columns)}
+                AND {count_column} = 0
+            """,
+            key,
+        )
+
+
+Summaries = dict[str, dict[tuple, tuple[int, ...]]]
+
+
+def compute_revenue(conn: sqlite3.Connection) -> Summaries:
+    """Sum every issued invoice from scratch, as ``{table: {key: counts}}``.
+
+    Streams one cursor over the invoices and one over their lines, so memory
+    grows with the number of clients and months, not with invoices.
+    """
+    summaries: Summaries = {table: {} for table in REVENUE_TABLES}
+    invoices = conn.execute(
+        """
+        SELECT client_id, substr(issue_date, 1, 7), subtotal, tax_total, total
+        FROM invoices
+        WHERE status = 'issued'
+        """
+    )
+    for client_id, month, *amounts in invoices:
+        _accumulate(summaries["revenue_by_client"], (client_id,), [1, *amounts])
+        _accumulate(summaries["revenue_by_month"], (month,), [1, *amounts])
+    lines = conn.execute(
+        """
+        SELECT substr(invoice.issue_date, 1, 7), ifnull(line.tax_rate, ?),
+            line.subtotal, line.tax, line.total
+        FROM invoices AS invoice
+        JOIN invoice_lines AS line ON line.invoice_id = invoice.id
+        WHERE invoice.status = 'issued'
+        """,
+        (UNTAXED,),
+    )
+    for month, tax_rate, *amounts in lines:
+        _accumulate(summaries["revenue_by_tax_rate"], (month, tax_rate), [1, *amounts])
+    return summaries
+
+
+def _accumulate(summary: dict[tuple, tuple[int, ...]], key: tuple, amounts: list[int]) -> None:
+    current = summary.get(key)
+    summary[key] = tuple(amounts) if current is None else tuple(map(sum, zip(current, amounts)))
+
+
+def _stored(conn: sqlite3.Connection) -> Summaries:
+    summaries: Summaries = {}
+    for table, (key_columns, count_column) in REVENUE_TABLES.items():
+        rows = conn.execute(
+            f"SELECT {', '.join((*key_columns, count_column, *AMOUNT_COLUMNS))} FROM {table}"
+        )
+        width = len(key_columns)
+        summaries[table] = {tuple(row)[:width]: tuple(row)[width:] for row in rows}
+    return summaries
+
+
+def _store(conn: sqlite3.Connection, summaries: Summaries) -> None:
+    for table, (key_columns, count_column) in REVENUE_TABLES.items():
+        columns = (*key_columns, count_column, *AMOUNT_COLUMNS)
+        conn.execute(f"DELETE FROM {table}")
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            (key + counts for key, counts in summaries[table].items()),
+        )
+
+
+def rebuild_revenue(database_url: str, write: bool = True) -> list[str]:
+    """Recompute the summaries from the invoices and describe each stored row
+    that differs; with ``write``, replace the stored rows when any do.
+
+    The rebuild holds the write lock for the whole pass, so invoice writes
+    wait for it; a check only reads a snapshot.
+    """
+    with connection(database_url) as conn:
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            expected = compute_revenue(conn)
+            stored = _stored(conn)
+            differences = [
+                f"{table} {key}: stored {stored[table].get(key)}, expected {expected[table].get(key)}"
+                for table in REVENUE_TABLES
+                for key in sorted(expected[table].keys() | stored[table].keys(), key=repr)
+                if stored[table].get(key) != expected[table].get(key)
+            ]
+            if write and differences:
+                _store(conn, expected)
+                conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+    return differences
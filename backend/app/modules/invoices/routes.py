@@ -0,0 +1,168 @@
+from collections.abc import AsyncGenerator, Iterator
+from datetime import date
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.core.conditional import (
+    get_change_counter,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
+from app.core.config import get_settings
+from app.core.database import run_db
+from app.core.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, decode_cursor, encode_cursor
+from app.core.responses import respond
+from app.core.streaming import zip_response
+from app.core.validation import FieldErrorRoute
+
+from .numbering import check_number_format
+from .pdf import PDF_MEDIA_TYPE, document_key, pdf_filename
+from .rendering import get_pdf_renderer
+from .repository import (
+    InvoiceReferenceError,
+    InvoiceStateError,
+    cancel_invoice,
+    configure_invoice_cache,
+    create_invoice,
+    get_invoice,
+    get_invoice_document,
+    init_db,
+    iter_invoice_documents,
+    list_invoices,
+    update_invoice,
+)
+from .schemas import InvoiceCreate, InvoiceOut, InvoicePage, InvoiceUpdate
+
+router = APIRouter(prefix="/api/invoices", tags=["invoices"], route_class=FieldErrorRoute)
+
+
+def _database_url() -> str:
+    return get_settings().database_url
+
+
+def init_module() -> None:
+    settings = get_settings()
+    check_number_format(settings.invoice_number_format)
+    init_db(settings.database_url)
+    configure_invoice_cache(settings.entity_cache_capacity, settings.entity_cache_ttl)
+
+
+async def _write(func, *args) -> dict | None:
+    try:
+        return await run_db(func, _database_url(), *args)
+    except InvoiceReferenceError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    except InvoiceStateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from None
+
+
+@router.get("", response_model=InvoicePage)
+async def list_invoices_route(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    client_id: str | None = None,
+) -> InvoicePage:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    version, changed_at = await run_db(get_change_counter, _database_url(), "invoices")
+    etag = make_etag("invoices", version, str(request.query_params))
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    items, next_key = await run_db(list_invoices, _database_url(), limit, after, client_id)
+    page = {"items": items, "next_cursor": encode_cursor(*next_key) if next_key else None}
+    set_validators(response, etag, changed_at)
+    return respond(page, response)
+
+
+async def _export_documents(batches: Iterator[list[dict]]) -> AsyncGenerator[dict, None]:
+    try:
+        while (batch := await run_db(next, batches, None)) is not None:
+            for document in batch:
+                yield document
+    finally:
+        await run_db(batches.close)
+
+
+async def _export_entries(batches: Iterator[list[dict]]) -> AsyncGenerator[tuple[str, Path], None]:
+    documents = _export_documents(batches)
+    rendered = get_pdf_renderer().render_many(documents)
+    try:
+        async for document, path in rendered:
+            yield pdf_filename(document["invoice"]["number"]), path
+    finally:
+        await rendered.aclose()
+        await documents.aclose()
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_invoices_route(
+    issued_from: date | None = None,
+    issued_to: date | None = None,
+    client_id: str | None = None,
+) -> StreamingResponse:
+    """Stream a ZIP of invoice PDFs, rendering or reading each from the cache
+    as the archive is sent."""
+    if issued_from and issued_to and issued_to < issued_from:
+        raise HTTPException(status_code=422, detail="issued_to must not be before issued_from")
+    batches = await _write(iter_invoice_documents, issued_from, issued_to, client_id)
+    period = "-".join(value.isoformat() for value in (issued_from, issued_to) if value)
+    filename = f"invoices-{period}.zip" if period else "invoices.zip"
+    return zip_response(_export_entries(batches), filename)
+
+
+@router.post("", response_model=InvoiceOut, status_code=status.HTTP_201_CREATED)
+async def create_invoice_route(payload: InvoiceCreate) -> InvoiceOut:
+    invoice = await _write(create_invoice, payload)
+    return respond(invoice, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/{invoice_id}", response_model=InvoiceOut)
+async def get_invoice_route(invoice_id: str, request: Request, response: Response) -> InvoiceOut:
+    invoice = await run_db(get_invoice, _database_url(), invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    etag = make_etag(invoice)
+    if is_not_modified(request, etag, invoice["updated_at"]):
+        return not_modified_response(etag, invoice["updated_at"])
+    set_validators(response, etag, invoice["updated_at"])
+    return respond(invoice, response)
+
+
+@router.get("/{invoice_id}/pdf", response_class=FileResponse)
+async def get_invoice_pdf_route(invoice_id: str, request: Request) -> Response:
+    document = await _write(get_invoice_document, invoice_id)
+    if not document:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    key = document_key(document)
+    etag = make_etag(key)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    path = await get_pdf_renderer().render(document, key)
+    filename = pdf_filename(document["invoice"]["number"])
+    response = FileResponse(path, media_type=PDF_MEDIA_TYPE, filename=filename)
+    set_validators(response, etag)
+    return response
+
+
+@router.put("/{invoice_id}", response_model=InvoiceOut)
+async def update_invoice_route(invoice_id: str, payload: InvoiceUpdate) -> InvoiceOut:
+    invoice = await _write(update_invoice, invoice_id, payload)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return respond(invoice)
+
+
+@router.post("/{invoice_id}/cancel", response_model=InvoiceOut)
+async def cancel_invoice_route(invoice_id: str) -> InvoiceOut:
+    invoice = await _write(cancel_invoice, invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return respond(invoice)
@@ -0,0 +1,107 @@
+from datetime import date
+from enum import Enum
+from typing import Annotated
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.validation import BlankAsNone, NonNegativeInt, OptionalText, PositiveInt, RequiredText
+
+
+class InvoiceStatus(str, Enum):
+    issued = "issued"
+    cancelled = "cancelled"
+
+
+MAX_INVOICE_LINES = 200
+MAX_LINE_DESCRIPTION_LENGTH = 256
+MAX_LINE_UNIT_LENGTH = 64
+MAX_LINE_QUANTITY = 1_000_000
+MAX_INVOICE_NOTES_LENGTH = 1024
+MAX_REFERENCE_LENGTH = 64
+DEFAULT_PAYMENT_TERM_DAYS = 14
+
+Reference = Annotated[str, RequiredText(MAX_REFERENCE_LENGTH)]
+InvoiceNotes = Annotated[str, OptionalText(MAX_INVOICE_NOTES_LENGTH)]
+
+
+class InvoiceLineIn(BaseModel):
+    """One invoice line, either from the catalog or written out in full.
+
+    With ``catalog_item_id`` the item's name, unit, price and tax rate are
+    copied onto the line; any of them given here overrides the copy, and an
+    explicit ``"tax_rate": null`` makes the line untaxed.
+    """
+
+    catalog_item_id: Reference | None = None
+    description: Annotated[str, RequiredText(MAX_LINE_DESCRIPTION_LENGTH)] | None = None
+    unit: Annotated[str, RequiredText(MAX_LINE_UNIT_LENGTH)] | None = None
+    quantity: Annotated[PositiveInt, Field(le=MAX_LINE_QUANTITY)]
+    unit_price: NonNegativeInt | None = None
+    tax_rate: NonNegativeInt | None = None
+
+    @model_validator(mode="after")
+    def require_catalog_item_or_details(self) -> "InvoiceLineIn":
+        if self.catalog_item_id is None and None in (self.description, self.unit, self.unit_price):
+            raise ValueError("Lines without catalog_item_id need description, unit and unit_price")
+        return self
+
+
+class InvoiceCreate(BlankAsNone):
+    """Missing ``issue_date`` means today (UTC); missing ``due_date`` adds the
+    default payment term to the issue date."""
+
+    client_id: Reference
+    issue_date: date | None = None
+    due_date: date | None = None
+    notes: InvoiceNotes | None = None
+    lines: list[InvoiceLineIn] = Field(min_length=1, max_length=MAX_INVOICE_LINES)
+
+    @model_validator(mode="after")
+    def due_after_issue(self) -> "InvoiceCreate":
+        if self.issue_date and self.due_date and self.due_date < self.issue_date:
+            raise ValueError("Due date must not be before issue date")
+        return self
+
+
+class InvoiceUpdate(InvoiceCreate):
+    issue_date: date
+    due_date: date
+    notes: InvoiceNotes | None
+
+
+class InvoiceLineOut(BaseModel):
+    position: int
+    catalog_item_id: str | None = None
+    description: str
+    unit: str
+    quantity: int
+    unit_price: int
+    tax_rate: int | None = None
+    subtotal: int
+    tax: int
+    total: int
+
+
+class InvoiceSummary(BaseModel):
+    id: str
+    number: str
+    client_id: str
+    status: InvoiceStatus
+    issue_date: str
+    due_date: str
+    notes: str | None = None
+    subtotal: int
+    tax_total: int
+    total: int
+    created_at: str
+    updated_at: str
+    cancelled_at: str | None = None
+
+
+class InvoiceOut(InvoiceSummary):
+    lines: list[InvoiceLineOut]
+
+
+class InvoicePage(BaseModel):
+    items: list[InvoiceSummary]
+    next_cursor: str | None = None
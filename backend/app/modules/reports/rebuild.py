@@ -0,0 +1,49 @@
+"""Recompute the revenue summaries from the invoices and compare them with the
+stored ones.
+
+    python -m app.modules.reports.rebuild [--check] [--database-url URL]
+
+Prints each summary row that differs. Without ``--check`` the stored rows are
+then replaced; with it nothing is written and the exit status is 1 when any
+row differs, so it can run as a periodic verification job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.core.config import get_settings
+from app.core.database import close_pools
+from app.modules.invoices.repository import init_db
+from app.modules.invoices.revenue import rebuild_revenue
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check", action="store_true", help="only compare; exit 1 if any summary row differs"
+    )
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or get_settings().database_url
+    try:
+        init_db(database_url)
+        differences = rebuild_revenue(database_url, write=not args.check)
+    finally:
+        close_pools()
+    for difference in differences:
+        print(difference)
+    if not differences:
+        print("Revenue summaries match the invoices")
+        return 0
+    if args.check:
+        print(f"{len(differences)} summary rows differ", file=sys.stderr)
+        return 1
+    print(f"Rebuilt revenue summaries; {len(differences)} rows had differed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
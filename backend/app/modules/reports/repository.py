@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from app.core.database import connection
+from app.core.metrics import timed_query
+from app.modules.invoices.revenue import UNTAXED
+
+# Reports read only the revenue summaries kept by the invoices module, never
+# invoices or lines: a month range costs one row per month (and tax rate), a
+# client page one index range.
+TOTAL_COLUMNS = ("subtotal", "tax_total", "total")
+
+
+def _month_range(from_month: str | None, to_month: str | None) -> tuple[str, list[str]]:
+    conditions = []
+    params: list[str] = []
+    if from_month is not None:
+        conditions.append("month >= ?")
+        params.append(from_month)
+    if to_month is not None:
+        conditions.append("month <= ?")
+        params.append(to_month)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+@timed_query("reports.revenue_by_month")
+def revenue_by_month(
+    database_url: str, from_month: str | None = None, to_month: str | None = None
+) -> list[dict]:
+    where, params = _month_range(from_month, to_month)
+    with connection(database_url) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT month, invoice_count, {", ".join(TOTAL_COLUMNS)}
+            FROM revenue_by_month
+            {where}
+            ORDER BY month
+            """,
+            params,
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@timed_query("reports.revenue_by_tax_rate")
+def revenue_by_tax_rate(
+    database_url: str, from_month: str | None = None, to_month: str | None = None
+) -> list[dict]:
+    """Totals per tax rate over the months in range; ``tax_rate`` is ``None``
+    for untaxed lines."""
+    where, params = _month_range(from_month, to_month)
+    with connection(database_url) as conn:
+        rows = conn.execute(
+            f"""
+            SELECT
+                tax_rate,
+                sum(line_count) AS line_count,
+                {", ".join(f"sum({column}) AS {column}" for column in TOTAL_COLUMNS)}
+            FROM revenue_by_tax_rate
+            {where}
+            GROUP BY tax_rate
+            ORDER BY tax_rate
+            """,
+            params,
+        ).fetchall()
+    return [
+        {**dict(row), "tax_rate": None if row["tax_rate"] == UNTAXED else row["tax_rate"]}
+        for row in rows
+    ]
+
+
+@timed_query("reports.revenue_by_client")
+def revenue_by_client(
+    database_url: str, limit: int, after: tuple[int, str] | None = None
+) -> tuple[list[dict], tuple[int, str] | None]:
+    """Page through clients by revenue, highest total first."""
+    where = "WHERE (revenue.total, revenue.client_id) < (?, ?)" if after else ""
+    with connection(database_url) as conn:
+        # Deleted clients keep their name and their revenue.
+        rows = conn.execute(
+            f"""
+            SELECT
+                revenue.client_id,
+                client.name AS client_name,
+                revenue.invoice_count,
+                {", ".join(f"revenue.{column}" for column in TOTAL_COLUMNS)}
+            FROM revenue_by_client AS revenue
+            JOIN clients AS client ON client.id = revenue.client_id
+            {where}
+            ORDER BY revenue.total DESC, revenue.client_id DESC
+            LIMIT ?
+            """,
+            (*(after or ()), limit + 1),
+        ).fetchall()
+
+    items = [dict(row) for row in rows[:limit]]
+    if len(rows) <= limit:
+        return items, None
+    return items, (rows[limit - 1]["total"], rows[limit - 1]["client_id"])
+
+
+@timed_query("reports.revenue_total")
+def revenue_total(database_url: str) -> int:
+    """All-time revenue, summed over the months."""
+    with connection(database_url) as conn:
+        (total,) = conn.execute("SELECT ifnull(sum(total), 0) FROM revenue_by_month").fetchone()
+    return total
@@ -0,0 +1,115 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.core.conditional import (
+    get_change_counter,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
+from app.core.config import get_settings
+from app.core.database import run_db
+from app.core.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, decode_cursor, encode_cursor
+from app.core.responses import respond
+
+from .repository import revenue_by_client, revenue_by_month, revenue_by_tax_rate, revenue_total
+from .schemas import (
+    DEFAULT_TOP_CLIENTS,
+    MAX_TOP_CLIENTS,
+    MONTH_PATTERN,
+    ClientRevenuePage,
+    MonthRevenueReport,
+    TaxRateRevenueReport,
+    TopClientsReport,
+)
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+def _database_url() -> str:
+    return get_settings().database_url
+
+
+def _check_months(from_month: str | None, to_month: str | None) -> None:
+    if from_month and to_month and to_month < from_month:
+        raise HTTPException(status_code=422, detail="to_month must not be before from_month")
+
+
+async def _validators(request: Request) -> tuple[str, str]:
+    # The summaries change only together with an invoice, so the invoices
+    # version counter covers them.
+    version, changed_at = await run_db(get_change_counter, _database_url(), "invoices")
+    return make_etag("revenue", version, request.url.path, str(request.query_params)), changed_at
+
+
+@router.get("/revenue/by-month", response_model=MonthRevenueReport)
+async def revenue_by_month_route(
+    request: Request,
+    response: Response,
+    from_month: str | None = Query(None, pattern=MONTH_PATTERN),
+    to_month: str | None = Query(None, pattern=MONTH_PATTERN),
+) -> MonthRevenueReport:
+    _check_months(from_month, to_month)
+    etag, changed_at = await _validators(request)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    items = await run_db(revenue_by_month, _database_url(), from_month, to_month)
+    set_validators(response, etag, changed_at)
+    return respond({"items": items}, response)
+
+
+@router.get("/revenue/by-tax-rate", response_model=TaxRateRevenueReport)
+async def revenue_by_tax_rate_route(
+    request: Request,
+    response: Response,
+    from_month: str | None = Query(None, pattern=MONTH_PATTERN),
+    to_month: str | None = Query(None, pattern=MONTH_PATTERN),
+) -> TaxRateRevenueReport:
+    _check_months(from_month, to_month)
+    etag, changed_at = await _validators(request)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    items = await run_db(revenue_by_tax_rate, _database_url(), from_month, to_month)
+    set_validators(response, etag, changed_at)
+    return respond({"items": items}, response)
+
+
+@router.get("/revenue/by-client", response_model=ClientRevenuePage)
+async def revenue_by_client_route(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+) -> ClientRevenuePage:
+    try:
+        after = None
+        if cursor:
+            total, client_id = decode_cursor(cursor)
+            after = (int(total), client_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    etag, changed_at = await _validators(request)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    items, next_key = await run_db(revenue_by_client, _database_url(), limit, after)
+    page = {
+        "items": items,
+        "next_cursor": encode_cursor(str(next_key[0]), next_key[1]) if next_key else None,
+    }
+    set_validators(response, etag, changed_at)
+    return respond(page, response)
+
+
+@router.get("/revenue/top-clients", response_model=TopClientsReport)
+async def top_clients_route(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_TOP_CLIENTS, ge=1, le=MAX_TOP_CLIENTS),
+) -> TopClientsReport:
+    etag, changed_at = await _validators(request)
+    if is_not_modified(request, etag, changed_at):
+        return not_modified_response(etag, changed_at)
+    items, _ = await run_db(revenue_by_client, _database_url(), limit)
+    total = await run_db(revenue_total, _database_url())
+    set_validators(response, etag, changed_at)
+    return respond({"items": items, "total": total}, response)
@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+DEFAULT_TOP_CLIENTS = 10
+MAX_TOP_CLIENTS = 100
+
+
+class RevenueTotals(BaseModel):
+    subtotal: int
+    tax_total: int
+    total: int
+
+
+class MonthRevenue(RevenueTotals):
+    month: str
+    invoice_count: int
+
+
+class TaxRateRevenue(RevenueTotals):
+    tax_rate: int | None = None
+    line_count: int
+
+
+class ClientRevenue(RevenueTotals):
+    client_id: str
+    client_name: str
+    invoice_count: int
+
+
+class MonthRevenueReport(BaseModel):
+    items: list[MonthRevenue]
+
+
+class TaxRateRevenueReport(BaseModel):
+    items: list[TaxRateRevenue]
+
+
+class ClientRevenuePage(BaseModel):
+    items: list[ClientRevenue]
+    next_cursor: str | None = None
+
+
+class TopClientsReport(BaseModel):
+    items: list[ClientRevenue]
+    total: int
@@ -2,14 +2,28 @@ from __future__ import annotations
 
 import re
 import sqlite3
-from contextlib import closing
 from datetime import datetime, timezone
-from pathlib import Path
+
+from app.core.cache import Cache, register_cache
+from app.core.conditional import change_version, ensure_change_counter, get_change_version
+from app.core.database import connection
+from app.core.metrics import timed_query
 
 from .schemas import UserUpsert
 
 LOCAL_USER_ID = "local-user"
 
+# The single profile is read on nearly every screen and printed on every
+# invoice; keep it per database. Updates in this process write through; the
+# users change counter is checked at most once per revalidation interval, so
+# hits in between never touch SQLite and other workers' updates are seen
+# within the interval.
+_profile_cache = register_cache(Cache("users.profile"))
+
+
+def configure_profile_cache(revalidate: float) -> None:
+    _profile_cache.configure(None, None, revalidate)
+
 
 def _utc_now() -> str:
     return (
@@ -20,29 +34,8 @@ def _utc_now() -> str:
     )
 
 
-def _resolve_sqlite_path(database_url: str) -> Path:
-    if not database_url.startswith("sqlite:///"):
-        raise ValueError("Only sqlite database URLs are supported for now")
-
-    path_str = database_url.removeprefix("sqlite:///")
-    path = Path(path_str)
-    if not path.is_absolute():
-        path = Path.cwd() / path
-
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def _connect(database_url: str) -> sqlite3.Connection:
-    path = _resolve_sqlite_path(database_url)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
-
-
 def init_db(database_url: str) -> None:
-    with closing(_connect(database_url)) as conn:
+    with connection(database_url) as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -65,6 +58,7 @@ def init_db(database_url: str) -> None:
             """
         )
         _ensure_columns(conn)
+        ensure_change_counter(conn, "users")
         conn.commit()
 
 
@@ -124,7 +118,16 @@ def _row_to_user(row: sqlite3.Row) -> dict:
 
 
 def get_user(database_url: str) -> dict | None:
-    with closing(_connect(database_url)) as conn:
+    return _profile_cache.get_or_load(
+        database_url,
+        lambda: _load_user(database_url),
+        lambda: get_change_version(database_url, "users"),
+    )
+
+
+@timed_query("users.get")
+def _load_user(database_url: str) -> dict | None:
+    with connection(database_url) as conn:
         row = conn.execute(
             """
             SELECT
@@ -155,10 +158,11 @@ def get_user(database_url: str) -> dict | None:
     return _row_to_user(row)
 
 
+@timed_query("users.upsert")
 def upsert_user(database_url: str, payload: UserUpsert) -> dict:
     now = _utc_now()
-    with closing(_connect(database_url)) as conn:
-        conn.execute(
+    with connection(database_url) as conn:
+        row = conn.execute(
             """
             INSERT INTO users (
                 id,
@@ -192,6 +196,22 @@ def upsert_user(database_url: str, payload: UserUpsert) -> dict:
                 iban = excluded.iban,
                 swift = excluded.swift,
                 updated_at = excluded.updated_at
+            RETURNING
+                id,
+                name,
+                address,
+                city,
+                country,
+                trade_licensing_office,
+                ico,
+                dic,
+                email,
+                phone,
+                bank,
+                iban,
+                swift,
+                created_at,
+                updated_at
             """,
             (
                 LOCAL_USER_ID,
@@ -210,11 +230,10 @@ def upsert_user(database_url: str, payload: UserUpsert) -> dict:
                 now,
                 now,
             ),
-        )
+        ).fetchone()
+        version = change_version(conn, "users")
         conn.commit()
 
-    user = get_user(database_url)
-    if not user:
-        raise RuntimeError("Failed to load user profile")
-
+    user = _row_to_user(row)
+    _profile_cache.set(database_url, user, version)
     return user
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from app.core.conditional import is_not_modified, make_etag, not_modified_response, set_validators
 from app.core.config import get_settings
+from app.core.database import run_db
+from app.core.responses import respond
+from app.core.validation import FieldErrorRoute
 
-from .repository import get_user, init_db, upsert_user
+from .repository import configure_profile_cache, get_user, init_db, upsert_user
 from .schemas import UserOut, UserUpsert
 
-router = APIRouter(prefix="/api/users", tags=["users"])
+router = APIRouter(prefix="/api/users", tags=["users"], route_class=FieldErrorRoute)
 
 
 def _database_url() -> str:
@@ -13,17 +17,23 @@ def _database_url() -> str:
 
 
 def init_module() -> None:
-    init_db(_database_url())
+    settings = get_settings()
+    init_db(settings.database_url)
+    configure_profile_cache(settings.entity_cache_revalidate)
 
 
 @router.get("/me", response_model=UserOut)
-def get_user_route() -> UserOut:
-    user = get_user(_database_url())
+async def get_user_route(request: Request, response: Response) -> UserOut:
+    user = await run_db(get_user, _database_url())
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    etag = make_etag(user)
+    if is_not_modified(request, etag, user["updated_at"]):
+        return not_modified_response(etag, user["updated_at"])
+    set_validators(response, etag, user["updated_at"])
+    return respond(user, response)
 
 
 @router.put("/me", response_model=UserOut)
-def upsert_user_route(payload: UserUpsert) -> UserOut:
-    return upsert_user(_database_url(), payload)
+async def upsert_user_route(payload: UserUpsert) -> UserOut:
+    return respond(await run_db(upsert_user, _database_url(), payload))
@@ -0,0 +1,112 @@
+"""Measure bulk import throughput for clients and the catalog.
+
+Clients are posted to /api/clients/bulk as NDJSON, CSV and JSON. The catalog
+is imported from CSV twice: the first pass inserts, the second changes every
+other price, so half the rows are updated and half are unchanged.
+
+Usage (from backend/):
+    python -m benchmarks.bulk_import --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+SAMPLE_CLIENT = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+    "notes": "Imported",
+    "favourite": False,
+}
+
+
+def _bodies(rows: int) -> dict[str, tuple[str, str]]:
+    records = [dict(SAMPLE_CLIENT, name=f"Client {index}") for index in range(rows)]
+    header = ",".join(SAMPLE_CLIENT)
+    csv_lines = [
+        ",".join(str(value).lower() if isinstance(value, bool) else value for value in record.values())
+        for record in records
+    ]
+    return {
+        "ndjson": ("application/x-ndjson", "\n".join(json.dumps(record) for record in records)),
+        "csv": ("text/csv", "\n".join([header, *csv_lines])),
+        "json": ("application/json", json.dumps(records)),
+    }
+
+
+def _catalog_csv(rows: int, price_bump: bool) -> str:
+    lines = ["name,description,unit,unit_price,tax_rate"]
+    for index in range(rows):
+        price = 1000 + index + (1 if price_bump and index % 2 else 0)
+        lines.append(f"Item {index},Catalog item {index},hour,{price},21")
+    return "\n".join(lines)
+
+
+async def _post(app, path: str, content_type: str, body: str) -> tuple[float, dict]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        response = await client.post(
+            path, content=body, headers={"Content-Type": content_type}
+        )
+        elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    return elapsed, response.json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["CORS_ORIGINS"] = ""
+
+        from app.core.config import get_settings
+        from app.core.database import close_pools, shutdown_db_executor
+        from app.main import create_app
+        from app.modules.catalog_items import init_module as init_catalog_items_module
+        from app.modules.clients import init_module
+
+        get_settings.cache_clear()
+        init_module()
+        init_catalog_items_module()
+        app = create_app()
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        for name, (content_type, body) in _bodies(args.rows).items():
+            elapsed, result = asyncio.run(_post(app, "/api/clients/bulk", content_type, body))
+            print(
+                f"{name:>6}: {result['created']} rows in {elapsed:.2f}s, "
+                f"{result['created'] / elapsed:,.0f} rows/s, {len(result['errors'])} errors"
+            )
+
+        for label, price_bump in (("catalog insert", False), ("catalog update", True)):
+            body = _catalog_csv(args.rows, price_bump)
+            elapsed, result = asyncio.run(_post(app, "/api/catalog-items/import", "text/csv", body))
+            print(
+                f"{label}: {args.rows} rows in {elapsed:.2f}s, {args.rows / elapsed:,.0f} rows/s, "
+                f"inserted {result['inserted']}, updated {result['updated']}, "
+                f"unchanged {result['unchanged']}"
+            )
+
+        shutdown_db_executor()
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
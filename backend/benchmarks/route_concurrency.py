@@ -0,0 +1,105 @@
+"""Compare GET /api/clients/{id} throughput for sync vs async route handlers.
+
+The async variant is the real app: handlers await repository calls on the
+bounded database executor. The sync variant mounts the same repository call
+in a plain ``def`` handler, which Starlette runs on its shared threadpool
+(40 threads by default).
+
+Usage (from backend/):
+    python -m benchmarks.route_concurrency --concurrency 200 --requests 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+SAMPLE_CLIENT = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+
+
+def _sync_app(database_url: str) -> FastAPI:
+    from app.modules.clients.repository import get_client
+
+    app = FastAPI()
+
+    @app.get("/api/clients/{client_id}")
+    def get_client_route(client_id: str) -> dict:
+        client = get_client(database_url, client_id)
+        if not client:
+            raise HTTPException(status_code=404, detail="Client not found")
+        return client
+
+    return app
+
+
+async def _run(app: FastAPI, client_ids: list[str], concurrency: int, total: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for index in counter:
+                client_id = client_ids[index % len(client_ids)]
+                response = await client.get(f"/api/clients/{client_id}")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ["CORS_ORIGINS"] = ""
+
+        from app.core.config import get_settings
+        from app.core.database import close_pools, shutdown_db_executor
+        from app.main import create_app
+        from app.modules.clients import init_module
+        from app.modules.clients.repository import create_client
+        from app.modules.clients.schemas import ClientCreate
+
+        get_settings.cache_clear()
+        init_module()
+        payload = ClientCreate(**SAMPLE_CLIENT)
+        client_ids = [create_client(database_url, payload)["id"] for _ in range(args.clients)]
+
+        variants = {"sync def": _sync_app(database_url), "async def": create_app()}
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        for name, app in variants.items():
+            elapsed = asyncio.run(_run(app, client_ids, args.concurrency, args.requests))
+            print(
+                f"{name:>10}: {args.requests} requests, concurrency {args.concurrency}, "
+                f"{elapsed:.2f}s, {args.requests / elapsed:,.0f} req/s"
+            )
+
+        shutdown_db_executor()
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
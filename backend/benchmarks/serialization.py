@@ -0,0 +1,125 @@
+"""Measure per-row response serialization cost for 10k-row client lists.
+
+Encoding only: the same page of repository dicts is encoded the way a
+``response_model`` route does it (validate into ClientPage, then dump JSON)
+and the way ``FAST_RESPONSES`` does it (TrustedJSONResponse, no models).
+
+End to end: the whole table is paged through GET /api/clients with
+``limit=500``, once per mode, so database reads are included.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --rows 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+
+SAMPLE_CLIENT = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+    "additional_contact": "+420123456789",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "notes": "Long-standing account. " * 20,
+    "favourite": False,
+}
+
+
+def _per_row_us(encode: Callable[[], bytes], rows: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode()
+        timings.append(time.perf_counter() - started)
+    return min(timings) / rows * 1_000_000
+
+
+async def _page_through(app) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        params = {"limit": "500"}
+        while True:
+            response = await client.get("/api/clients", params=params)
+            response.raise_for_status()
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["CORS_ORIGINS"] = ""
+
+        from pydantic import TypeAdapter
+
+        from app.core.config import get_settings
+        from app.core.database import close_pools, shutdown_db_executor
+        from app.core.responses import TrustedJSONResponse
+        from app.main import create_app
+        from app.modules.clients import init_module
+        from app.modules.clients.repository import bulk_create_clients, list_clients
+        from app.modules.clients.schemas import ClientCreate, ClientPage
+
+        get_settings.cache_clear()
+        database_url = get_settings().database_url
+        init_module()
+        bulk_create_clients(
+            database_url,
+            [
+                ClientCreate(**dict(SAMPLE_CLIENT, name=f"Client {index}"))
+                for index in range(args.rows)
+            ],
+        )
+        items, _ = list_clients(database_url, args.rows)
+        page = {"items": items, "next_cursor": None}
+        adapter = TypeAdapter(ClientPage)
+
+        validated = _per_row_us(
+            lambda: adapter.dump_json(adapter.validate_python(page)), args.rows, args.repeat
+        )
+        trusted = _per_row_us(lambda: TrustedJSONResponse(page).body, args.rows, args.repeat)
+        print(f"encode {args.rows} rows:")
+        print(f"  response_model: {validated:6.2f} us/row")
+        print(f"  fast:           {trusted:6.2f} us/row ({validated / trusted:.1f}x)")
+
+        for logger in ("httpx", "asyncio"):
+            logging.getLogger(logger).setLevel(logging.WARNING)
+        print(f"page through {args.rows} rows (limit=500):")
+        results = {}
+        for label, fast in (("response_model", "0"), ("fast", "1")):
+            os.environ["FAST_RESPONSES"] = fast
+            get_settings.cache_clear()
+            app = create_app()
+            asyncio.run(_page_through(app))
+            results[label] = min(asyncio.run(_page_through(app)) for _ in range(args.repeat))
+            print(f"  {label + ':':<15} {results[label] / args.rows * 1_000_000:6.2f} us/row")
+
+        shutdown_db_executor()
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure request schema validation throughput.
+
+Validates the same payloads the API receives with ``model_validate``, one
+model per record as bulk imports do, and reports records per second and the
+cost per record for clients, catalog items and the user profile.
+
+Usage (from backend/):
+    python -m benchmarks.validation --records 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.modules.catalog_items.schemas import CatalogItemCreate
+from app.modules.clients.schemas import ClientCreate
+from app.modules.users.schemas import UserUpsert
+
+CLIENT = {
+    "name": " Acme Co ",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "Email",
+    "main_contact": "hello@acme.test",
+    "additional_contact": "+420123456789",
+    "ico": "12345678",
+    "dic": "",
+    "notes": "Imported",
+    "favourite": False,
+}
+CATALOG_ITEM = {
+    "name": "Design work",
+    "description": "Product design services",
+    "unit": "hour",
+    "unit_price": "15000",
+    "tax_rate": 21,
+}
+USER = {
+    "name": "Jan Novak",
+    "address": "Main 1",
+    "city": "Prague",
+    "country": "Czechia",
+    "trade_licensing_office": "Prague 1",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "email": "jan@example.test",
+    "phone": "+420123456789",
+    "bank": "Bank",
+    "iban": "CZ6508000000192000145399",
+    "swift": "GIBACZPX",
+}
+
+
+def _measure(model, payload: dict, records: int, repeat: int) -> float:
+    payloads = [dict(payload, name=f"{payload['name']} {index}") for index in range(records)]
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for record in payloads:
+            model.model_validate(record)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, model, payload in (
+        ("client", ClientCreate, CLIENT),
+        ("catalog item", CatalogItemCreate, CATALOG_ITEM),
+        ("user", UserUpsert, USER),
+    ):
+        elapsed = _measure(model, payload, args.records, args.repeat)
+        print(
+            f"{label:>12}: {args.records / elapsed:>10,.0f} records/s, "
+            f"{elapsed / args.records * 1_000_000:.2f} us/record"
+        )
+
+
+if __name__ == "__main__":
+    main()
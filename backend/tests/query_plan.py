@@ -0,0 +1,48 @@
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from app.core.database import ConnectionPool
+
+_DML_PREFIXES = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@contextmanager
+def captured_statements(pool: ConnectionPool) -> Iterator[list[str]]:
+    """Record every DML statement run through a single-connection pool."""
+    assert pool.size == 1, "statement capture needs a single-connection pool"
+    statements: list[str] = []
+
+    def record(sql: str) -> None:
+        if sql.lstrip().upper().startswith(_DML_PREFIXES):
+            statements.append(sql)
+
+    with pool.connection() as conn:
+        conn.set_trace_callback(record)
+    try:
+        yield statements
+    finally:
+        with pool.connection() as conn:
+            conn.set_trace_callback(None)
+
+
+def query_plan(conn: sqlite3.Connection, sql: str) -> list[str]:
+    return [row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def assert_uses_index(
+    conn: sqlite3.Connection, sql: str, index: str, allowed_scans: tuple[str, ...] = ()
+) -> None:
+    """Fail if the statement scans a table, sorts in a temp B-tree or skips ``index``.
+
+    Scans of constant rows and of the CTEs named in ``allowed_scans`` are fine.
+    """
+    plan = query_plan(conn, sql)
+    for detail in plan:
+        assert "TEMP B-TREE" not in detail, f"temp sort in plan {plan} for: {sql}"
+        if not detail.startswith("SCAN") or "CONSTANT ROW" in detail:
+            continue
+        if detail.split()[1] in allowed_scans:
+            continue
+        assert "USING" in detail, f"full table scan in plan {plan} for: {sql}"
+    assert any(index in detail for detail in plan), f"{index} not used in plan {plan} for: {sql}"
@@ -0,0 +1,113 @@
+from app.core.cache import Cache
+
+
+def test_get_or_load_counts_hits_and_misses():
+    cache = Cache("test")
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"value": 1}
+
+    assert cache.get_or_load("key", loader) == {"value": 1}
+    assert cache.get_or_load("key", loader) == {"value": 1}
+    assert len(loads) == 1
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 1, 0.5)
+
+
+def test_missing_values_are_cached():
+    cache = Cache("test")
+    assert cache.get_or_load("key", lambda: None) is None
+    assert cache.get_or_load("key", lambda: "loaded") is None
+
+
+def test_load_racing_with_write_is_not_stored():
+    cache = Cache("test")
+
+    def stale_loader():
+        cache.set("key", "fresh")
+        return "stale"
+
+    assert cache.get_or_load("key", stale_loader) == "stale"
+    assert cache.get_or_load("key", lambda: "reloaded") == "fresh"
+
+
+def test_invalidate_forces_reload():
+    cache = Cache("test")
+    cache.set("key", "old")
+    cache.invalidate("key")
+    assert cache.get_or_load("key", lambda: "new") == "new"
+
+
+def test_capacity_evicts_least_recently_used():
+    cache = Cache("test", capacity=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get_or_load("a", lambda: None)
+    cache.set("c", 3)
+
+    assert cache.get_or_load("a", lambda: "reloaded") == 1
+    assert cache.get_or_load("b", lambda: "reloaded") == "reloaded"
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 2
+    assert stats["estimated_bytes"] > 0
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = Cache("test", ttl=5)
+    cache.set("key", "old")
+    now[0] += 4
+    assert cache.get_or_load("key", lambda: "new") == "old"
+    now[0] += 2
+    assert cache.get_or_load("key", lambda: "new") == "new"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_configure_shrinks_capacity():
+    cache = Cache("test")
+    for key in range(5):
+        cache.set(key, key)
+    cache.configure(capacity=3, ttl=None)
+    assert cache.stats()["entries"] == 3
+
+
+def test_entries_from_another_version_are_reloaded():
+    cache = Cache("test")
+    cache.set("key", "written", version=3)
+    assert cache.get_or_load("key", lambda: "loaded", version=3) == "written"
+    assert cache.get_or_load("key", lambda: "reloaded", version=4) == "reloaded"
+    assert cache.get_or_load("key", lambda: "again", version=4) == "reloaded"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (2, 1, 1)
+
+
+def test_version_callable_is_read_once_per_revalidation_interval(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = Cache("test", revalidate=1.0)
+    version = [3]
+    reads = []
+
+    def current():
+        reads.append(1)
+        return version[0]
+
+    cache.set("key", "written", version=3)
+    assert cache.get_or_load("key", lambda: "loaded", current) == "written"
+    assert reads == []
+
+    now[0] += 1
+    version[0] = 4
+    assert cache.get_or_load("key", lambda: "reloaded", current) == "reloaded"
+    assert cache.get_or_load("key", lambda: "again", current) == "reloaded"
+    assert len(reads) == 1
+
+    now[0] += 1
+    assert cache.get_or_load("key", lambda: "again", current) == "reloaded"
+    assert len(reads) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (3, 1, 1)
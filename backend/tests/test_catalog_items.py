@@ -1,8 +1,13 @@
+import asyncio
+import json
+
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
 
 from app.core.config import get_settings
 from app.main import create_app
+from app.modules.catalog_items.routes import import_catalog_items_route
 
 
 @pytest.fixture()
@@ -36,7 +41,7 @@ def test_create_list_get_update_delete(client, sample_payload):
 
     list_response = client.get("/api/catalog-items")
     assert list_response.status_code == 200
-    listed = list_response.json()
+    listed = list_response.json()["items"]
     assert len(listed) == 1
     assert listed[0]["unit_price"] == sample_payload["unit_price"]
     assert listed[0]["tax_rate"] == sample_payload["tax_rate"]
@@ -63,7 +68,7 @@ def test_create_list_get_update_delete(client, sample_payload):
 
     list_after_delete = client.get("/api/catalog-items")
     assert list_after_delete.status_code == 200
-    assert list_after_delete.json() == []
+    assert list_after_delete.json() == {"items": [], "next_cursor": None}
 
 
 def test_name_too_long_returns_validation_error(client, sample_payload):
@@ -80,3 +85,209 @@ def test_description_too_long_returns_validation_error(client, sample_payload):
 
     response = client.post("/api/catalog-items", json=bad_payload)
     assert response.status_code == 422
+
+
+def test_prices_are_coerced_to_non_negative_integers(client, sample_payload):
+    payload = dict(sample_payload, unit_price="120", tax_rate=21.0)
+    created = client.post("/api/catalog-items", json=payload)
+    assert (created.json()["unit_price"], created.json()["tax_rate"]) == (120, 21)
+
+    for value, message in [
+        (True, "Must be an integer"),
+        (1.5, "Must be an integer"),
+        ("12.0", "Must be an integer"),
+        ("abc", "Must be an integer"),
+        (-1, "Must be greater than or equal to 0"),
+    ]:
+        response = client.post("/api/catalog-items", json=dict(sample_payload, unit_price=value))
+        assert response.json()["detail"][0]["msg"] == f"Value error, {message}", value
+
+
+def test_list_paginates_with_cursor(client, sample_payload):
+    for index in range(3):
+        client.post("/api/catalog-items", json=dict(sample_payload, name=f"Item {index}"))
+
+    first = client.get("/api/catalog-items", params={"limit": 2}).json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+
+    second = client.get(
+        "/api/catalog-items", params={"limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    assert {item["name"] for item in first["items"] + second["items"]} == {
+        "Item 0",
+        "Item 1",
+        "Item 2",
+    }
+
+
+def test_list_streams_ndjson_after_cursor(client, sample_payload):
+    for index in range(3):
+        client.post("/api/catalog-items", json=dict(sample_payload, name=f"Item {index}"))
+
+    first = client.get("/api/catalog-items", params={"limit": 1}).json()
+    response = client.get(
+        "/api/catalog-items", params={"stream": 1, "cursor": first["next_cursor"]}
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2
+    assert first["items"][0]["id"] not in {row["id"] for row in rows}
+
+
+def test_export_csv_and_ndjson(client, sample_payload):
+    client.post("/api/catalog-items", json=sample_payload)
+
+    csv_response = client.get("/api/catalog-items/export")
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    lines = csv_response.text.splitlines()
+    assert lines[0] == "id,name,description,unit,unit_price,tax_rate,created_at,updated_at"
+    assert len(lines) == 2
+    assert ",Design work,Product design services,hour,15000,21," in lines[1]
+
+    ndjson_response = client.get("/api/catalog-items/export", params={"format": "ndjson"})
+    assert json.loads(ndjson_response.text)["name"] == "Design work"
+
+
+def test_export_empty_catalog_has_header_only(client):
+    response = client.get("/api/catalog-items/export")
+    assert response.text.splitlines() == [
+        "id,name,description,unit,unit_price,tax_rate,created_at,updated_at"
+    ]
+
+
+def test_import_upserts_by_name_and_unit(client, sample_payload):
+    existing = client.post("/api/catalog-items", json=sample_payload).json()
+    client.post("/api/catalog-items", json=dict(sample_payload, name="Unchanged"))
+    client.post("/api/catalog-items", json=dict(sample_payload, name="Twin"))
+    client.post("/api/catalog-items", json=dict(sample_payload, name="Twin"))
+
+    body = (
+        "name,description,unit,unit_price,tax_rate\n"
+        "Design work,Product design services,hour,18000,21\n"
+        "Unchanged,Product design services,hour,15000,21\n"
+        "Design work,Product design services,day,100000,21\n"
+        "Twin,Product design services,hour,1,\n"
+        "Broken,,hour,-5,\n"
+        "Design work,Product design services,day,120000,\n"
+    )
+    response = client.post(
+        "/api/catalog-items/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["inserted"] == 1
+    assert result["updated"] == 2
+    assert result["unchanged"] == 1
+    assert [error["row"] for error in result["errors"]] == [4, 5]
+    assert result["errors"][0]["detail"] == [{"msg": "Multiple catalog items match name and unit"}]
+
+    updated = client.get(f"/api/catalog-items/{existing['id']}").json()
+    assert updated["unit_price"] == 18000
+    items = client.get("/api/catalog-items").json()["items"]
+    day_items = [item for item in items if item["unit"] == "day"]
+    assert len(day_items) == 1
+    assert day_items[0]["unit_price"] == 120000
+    assert day_items[0]["tax_rate"] is None
+
+
+def test_import_returns_counts_when_body_breaks_after_committed_rows(client, sample_payload):
+    client.post("/api/catalog-items", json=sample_payload)
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in [
+            (json.dumps(dict(sample_payload, unit_price=18000)) + "\n").encode(),
+            (json.dumps(dict(sample_payload, name="New")) + "\n").encode(),
+            b"\xff\n",
+        ]
+    ]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    request = Request(
+        {"type": "http", "method": "POST", "headers": [(b"content-type", b"application/x-ndjson")]},
+        receive,
+    )
+    result = asyncio.run(import_catalog_items_route(request))
+    assert (result["inserted"], result["updated"], result["unchanged"]) == (1, 1, 0)
+    assert [(error.row, error.detail) for error in result["errors"]] == [
+        (3, [{"msg": "Request body must be UTF-8; the rest of the body was not imported"}])
+    ]
+    names = {item["name"]: item["unit_price"] for item in client.get("/api/catalog-items").json()["items"]}
+    assert names == {"Design work": 18000, "New": 15000}
+
+
+def test_export_round_trips_through_import(client, sample_payload):
+    client.post("/api/catalog-items", json=sample_payload)
+    exported = client.get("/api/catalog-items/export").text
+
+    response = client.post(
+        "/api/catalog-items/import", content=exported, headers={"Content-Type": "text/csv"}
+    )
+    assert response.json() == {"inserted": 0, "updated": 0, "unchanged": 1, "errors": []}
+
+
+def test_import_changes_list_validator(client, sample_payload):
+    etag = client.get("/api/catalog-items").headers["etag"]
+    assert client.get("/api/catalog-items", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/catalog-items/import", json=[sample_payload])
+    assert client.get("/api/catalog-items", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_import_update_invalidates_cached_detail(client, sample_payload):
+    created = client.post("/api/catalog-items", json=sample_payload).json()
+    url = f"/api/catalog-items/{created['id']}"
+    assert client.get(url).json()["unit_price"] == 15000
+
+    client.post("/api/catalog-items/import", json=[dict(sample_payload, unit_price=17000)])
+    assert client.get(url).json()["unit_price"] == 17000
+
+
+def test_suggest_prefers_name_prefix_then_infix(client, sample_payload):
+    client.post("/api/catalog-items", json=sample_payload)
+    for name, description in [
+        ("Web design", "Landing pages"),
+        ("design review", "Second opinion"),
+        ("Consulting", "Design systems workshop"),
+        ("100% audit", "Accessibility"),
+    ]:
+        client.post(
+            "/api/catalog-items",
+            json=dict(sample_payload, name=name, description=description),
+        )
+    deleted = client.post(
+        "/api/catalog-items", json=dict(sample_payload, name="Design archive")
+    ).json()
+    client.delete(f"/api/catalog-items/{deleted['id']}")
+
+    response = client.get("/api/catalog-items/suggest", params={"prefix": "desi"})
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()]
+    assert names == ["design review", "Design work", "Consulting", "Web design"]
+    assert set(response.json()[0]) == {"id", "name", "unit", "unit_price", "tax_rate"}
+
+    short = client.get("/api/catalog-items/suggest", params={"prefix": "De", "limit": 1}).json()
+    assert [item["name"] for item in short] == ["design review"]
+    assert client.get("/api/catalog-items/suggest", params={"prefix": "es"}).json() == []
+    assert [
+        item["name"]
+        for item in client.get("/api/catalog-items/suggest", params={"prefix": "100%"}).json()
+    ] == ["100% audit"]
+    assert client.get("/api/catalog-items/suggest", params={"prefix": "1_0"}).json() == []
+    assert client.get("/api/catalog-items/suggest", params={"prefix": ""}).status_code == 422
+
+
+def test_fields_projects_list_and_detail(client, sample_payload):
+    created = client.post("/api/catalog-items", json=sample_payload).json()
+
+    page = client.get("/api/catalog-items", params={"fields": "name,unit_price"}).json()
+    assert page["items"] == [{"id": created["id"], "name": "Design work", "unit_price": 15000}]
+    detail = client.get(f"/api/catalog-items/{created['id']}", params={"fields": "tax_rate"})
+    assert detail.json() == {"id": created["id"], "tax_rate": 21}
+    assert client.get("/api/catalog-items", params={"fields": "price"}).status_code == 400
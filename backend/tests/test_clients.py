@@ -1,8 +1,22 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
 
+from app.core import conditional
 from app.core.config import get_settings
+from app.core.database import ConnectionPool
 from app.main import create_app
+from app.modules.clients import repository
+from app.modules.clients.routes import bulk_create_clients_route
+from app.modules.clients.schemas import ClientCreate
 
 
 @pytest.fixture()
@@ -42,7 +56,7 @@ def test_create_list_get_update_delete(client, sample_payload):
 
     list_response = client.get("/api/clients")
     assert list_response.status_code == 200
-    listed = list_response.json()
+    listed = list_response.json()["items"]
     assert len(listed) == 1
     assert listed[0]["main_contact"] == sample_payload["main_contact"]
     assert listed[0]["favourite"] is True
@@ -77,7 +91,7 @@ def test_create_list_get_update_delete(client, sample_payload):
 
     list_after_delete = client.get("/api/clients")
     assert list_after_delete.status_code == 200
-    assert list_after_delete.json() == []
+    assert list_after_delete.json() == {"items": [], "next_cursor": None}
 
     recreate_response = client.post("/api/clients", json=sample_payload)
     assert recreate_response.status_code == 201
@@ -97,3 +111,476 @@ def test_name_too_long_returns_validation_error(client, sample_payload):
 
     response = client.post("/api/clients", json=bad_payload)
     assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"] == "Value error, Name must be at most 256 characters"
+
+
+def test_text_fields_are_stripped_and_checked(client, sample_payload):
+    payload = dict(sample_payload, name="  Acme  ", ico="   ", notes=None)
+    created = client.post("/api/clients", json=payload).json()
+    assert (created["name"], created["ico"], created["notes"]) == ("Acme", None, None)
+
+    invalid = dict(sample_payload, name="\x1c\x1f", city=" ", country=5, dic="x" * 33)
+    response = client.post("/api/clients", json=invalid)
+    assert [(error["loc"], error["msg"]) for error in response.json()["detail"]] == [
+        (["body", "name"], "Value error, Must not be empty"),
+        (["body", "city"], "Value error, Must not be empty"),
+        (["body", "country"], "Value error, Must be a string"),
+        (["body", "dic"], "Value error, DIC must be at most 32 characters"),
+    ]
+
+    # Query errors and other routers keep FastAPI's own messages.
+    limit = client.get("/api/clients", params={"limit": 501}).json()["detail"][0]
+    assert limit["type"] == "less_than_equal"
+    assert limit["msg"] == "Input should be less than or equal to 500"
+    month = client.get("/api/reports/revenue/by-month", params={"from_month": "x"})
+    assert month.json()["detail"][0]["type"] == "string_pattern_mismatch"
+
+
+def test_writes_use_a_single_connection_checkout(client, sample_payload):
+    def checkouts():
+        return client.get("/health/db").json()["pool"]["checkouts"]
+
+    before = checkouts()
+    created = client.post("/api/clients", json=sample_payload).json()
+    assert checkouts() - before == 1
+
+    before = checkouts()
+    client.put(f"/api/clients/{created['id']}", json=sample_payload)
+    assert checkouts() - before == 1
+
+
+def test_update_missing_client_returns_404(client, sample_payload):
+    response = client.put("/api/clients/missing", json=sample_payload)
+    assert response.status_code == 404
+
+
+def test_list_paginates_with_cursor(client, sample_payload):
+    created_ids = []
+    for index in range(5):
+        payload = dict(sample_payload, name=f"Client {index}")
+        created_ids.append(client.post("/api/clients", json=payload).json()["id"])
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/clients", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(created_ids)
+    assert len(set(seen)) == len(seen)
+
+
+def test_list_rejects_invalid_cursor_and_limit(client):
+    assert client.get("/api/clients", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/clients", params={"limit": 0}).status_code == 422
+    assert client.get("/api/clients", params={"limit": 501}).status_code == 422
+
+
+def test_list_streams_ndjson(client, sample_payload):
+    for index in range(3):
+        client.post("/api/clients", json=dict(sample_payload, name=f"Client {index}"))
+
+    response = client.get("/api/clients", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["name"] for row in rows} == {"Client 0", "Client 1", "Client 2"}
+    assert rows[0]["favourite"] is True
+    assert "created_by" not in rows[0]
+
+    query_response = client.get("/api/clients", params={"stream": 1})
+    assert query_response.text == response.text
+
+
+def test_half_consumed_stream_does_not_hold_a_connection(tmp_path, monkeypatch, sample_payload):
+    database_url = f"sqlite:///{tmp_path / 'stream.db'}"
+    pool = ConnectionPool(database_url, size=1, timeout=0.5)
+    monkeypatch.setattr("app.core.database._pools", {database_url: pool})
+    repository.init_db(database_url)
+    created = [
+        repository.create_client(database_url, ClientCreate(**dict(sample_payload, name=f"Client {index}")))
+        for index in range(5)
+    ]
+
+    listed = [row["id"] for row in repository.list_clients(database_url, limit=10)[0]]
+
+    batches = repository.iter_clients(database_url, batch_size=2)
+    first = next(batches)
+    assert pool.stats()["in_use"] == 0
+    # Other reads and writes run between batches; the rest resumes after the
+    # last row yielded.
+    assert repository._load_client(database_url, created[0]["id"])["id"] == created[0]["id"]
+    repository.soft_delete_client(database_url, listed[3])
+    rest = [row for batch in batches for row in batch]
+    assert [row["id"] for row in first + rest] == listed[:3] + listed[4:]
+    pool.close()
+
+
+def test_bulk_import_json_reports_row_errors(client, sample_payload):
+    rows = [
+        sample_payload,
+        dict(sample_payload, name=""),
+        dict(sample_payload, name="Second", main_contact_method="sms"),
+        dict(sample_payload, name="Third"),
+    ]
+    response = client.post("/api/clients/bulk", json=rows)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    assert [error["row"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["detail"][0]["loc"] == ["name"]
+
+    listed = client.get("/api/clients").json()["items"]
+    assert {item["name"] for item in listed} == {"Acme Co", "Third"}
+
+
+def test_bulk_import_ndjson(client, sample_payload):
+    body = "\n".join(
+        [json.dumps(sample_payload), "{not json", "", json.dumps(dict(sample_payload, name="B"))]
+    )
+    response = client.post(
+        "/api/clients/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    assert result["errors"] == [{"row": 2, "detail": [{"msg": "Invalid JSON"}]}]
+
+
+def test_bulk_import_csv_with_multiline_quoted_field(client):
+    body = (
+        "name,address,city,country,main_contact_method,main_contact,notes,favourite\r\n"
+        'Acme,1 Main,Prague,Czechia,email,a@acme.test,"line one\r\nline ""two""",true\r\n'
+        "Beta,2 Main,Brno,Czechia,discord,beta#1,,\r\n"
+        "Gamma,,Brno,Czechia,email,g@gamma.test,,\r\n"
+    )
+    response = client.post(
+        "/api/clients/bulk", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    assert [error["row"] for error in result["errors"]] == [3]
+
+    listed = {item["name"]: item for item in client.get("/api/clients").json()["items"]}
+    assert listed["Acme"]["notes"] == 'line one\r\nline "two"'
+    assert listed["Acme"]["favourite"] is True
+    assert listed["Beta"]["favourite"] is False
+
+
+def test_bulk_import_csv_reports_rows_with_wrong_field_count(client):
+    body = (
+        "name,address,city,country,main_contact_method,main_contact\r\n"
+        "Acme,1 Main,Prague,Czechia,email,a@acme.test,extra\r\n"
+        "Beta,2 Main,Brno,Czechia,discord\r\n"
+        "Gamma,3 Main,Brno,Czechia,email,g@gamma.test\r\n"
+    )
+    response = client.post("/api/clients/bulk", content=body, headers={"Content-Type": "text/csv"})
+    assert response.json() == {
+        "created": 1,
+        "errors": [
+            {"row": 1, "detail": [{"msg": "Expected 6 fields, got 7"}]},
+            {"row": 2, "detail": [{"msg": "Expected 6 fields, got 5"}]},
+        ],
+    }
+
+
+def _streamed_request(chunks: list[bytes]) -> Request:
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    headers = [(b"content-type", b"application/x-ndjson")]
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+def test_bulk_import_reports_unreadable_body_after_committed_rows(client, sample_payload):
+    chunks = [
+        (json.dumps(sample_payload) + "\n").encode(),
+        (json.dumps(dict(sample_payload, name="B")) + "\n").encode(),
+        b"\xff\n",
+        (json.dumps(dict(sample_payload, name="C")) + "\n").encode(),
+    ]
+    result = asyncio.run(bulk_create_clients_route(_streamed_request(chunks)))
+    assert result["created"] == 2
+    assert [error.model_dump() for error in result["errors"]] == [
+        {"row": 3, "detail": [{"msg": "Request body must be UTF-8; the rest of the body was not imported"}]}
+    ]
+    listed = client.get("/api/clients").json()["items"]
+    assert {item["name"] for item in listed} == {"Acme Co", "B"}
+
+    # Nothing was imported yet, so the whole request fails.
+    response = client.post(
+        "/api/clients/bulk", content=b"\xff\n", headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 400
+
+
+def test_bulk_import_rejects_unsupported_content_type(client):
+    response = client.post(
+        "/api/clients/bulk", content="<xml/>", headers={"Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+
+    response = client.post("/api/clients/bulk", json={"name": "not a list"})
+    assert response.status_code == 400
+
+
+def _clock_at(monkeypatch, moment: datetime) -> None:
+    monkeypatch.setattr(conditional, "_utc_now", lambda: moment)
+
+
+def test_conditional_get_returns_304_until_list_changes(client, sample_payload, monkeypatch):
+    created = client.post("/api/clients", json=sample_payload).json()
+    _clock_at(monkeypatch, datetime.now(timezone.utc) + timedelta(seconds=2))
+
+    first = client.get("/api/clients")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    assert "last-modified" in first.headers
+
+    cached = client.get("/api/clients", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    other_page = client.get("/api/clients", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+    client.delete(f"/api/clients/{created['id']}")
+    after_delete = client.get("/api/clients", headers={"If-None-Match": etag})
+    assert after_delete.status_code == 200
+    assert after_delete.headers["etag"] != etag
+
+
+def test_conditional_get_detail(client, sample_payload, monkeypatch):
+    created = client.post("/api/clients", json=sample_payload).json()
+    url = f"/api/clients/{created['id']}"
+    _clock_at(monkeypatch, datetime.now(timezone.utc) + timedelta(seconds=2))
+
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert (
+        client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code
+        == 304
+    )
+
+    client.put(url, json=dict(sample_payload, name="Renamed"))
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["name"] == "Renamed"
+
+
+def test_last_modified_waits_until_its_second_is_over(client, sample_payload, monkeypatch):
+    created = client.post("/api/clients", json=sample_payload).json()
+    url = f"/api/clients/{created['id']}"
+    updated_at = datetime.fromisoformat(created["updated_at"].replace("Z", "+00:00"))
+    since = {"If-Modified-Since": "Sun, 01 Jan 2095 00:00:00 GMT"}
+
+    # Another change in the same second would keep the same date, so it is
+    # neither sent nor trusted until the second is over.
+    _clock_at(monkeypatch, updated_at + timedelta(milliseconds=900))
+    response = client.get(url, headers=since)
+    assert response.status_code == 200
+    assert "last-modified" not in response.headers
+
+    _clock_at(monkeypatch, updated_at + timedelta(seconds=1))
+    assert "last-modified" in client.get(url).headers
+    assert client.get(url, headers=since).status_code == 304
+
+def test_detail_reads_are_cached_and_invalidated_on_write(client, sample_payload):
+    def checkouts():
+        return client.get("/health/db").json()["pool"]["checkouts"]
+
+    created = client.post("/api/clients", json=sample_payload).json()
+    url = f"/api/clients/{created['id']}"
+
+    before = checkouts()
+    client.get(url)
+    client.get(url)
+    # Hits within the revalidation interval do not touch SQLite at all.
+    assert checkouts() == before
+
+    client.put(url, json=dict(sample_payload, city="Ostrava"))
+    assert client.get(url).json()["city"] == "Ostrava"
+
+    client.delete(url)
+    assert client.get(url).status_code == 404
+    stats = client.get("/health/cache").json()["caches"]["clients.entity"]
+    assert stats["capacity"] == 1024
+    assert stats["hits"] >= 3
+
+
+def _in_other_worker(database_url: str, code: str) -> None:
+    """Run repository code in a separate process, like another uvicorn worker."""
+    subprocess.run(
+        [sys.executable, "-c", f"from app.modules.clients.repository import *\n{code}"],
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "DATABASE_URL": database_url},
+    )
+
+
+def test_cached_detail_sees_writes_from_other_workers(client, sample_payload, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    revalidate = get_settings().entity_cache_revalidate
+    created = client.post("/api/clients", json=sample_payload).json()
+    url = f"/api/clients/{created['id']}"
+    etag = client.get(url).headers["etag"]
+    database_url = os.environ["DATABASE_URL"]
+
+    _in_other_worker(
+        database_url,
+        "from app.modules.clients.schemas import ClientUpdate\n"
+        f"payload = ClientUpdate(**{dict(sample_payload, city='Brno')!r})\n"
+        f"update_client({database_url!r}, {created['id']!r}, payload)",
+    )
+    # Seen once the entry is due for its change-counter check.
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    now[0] += revalidate
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["city"] == "Brno"
+
+    _in_other_worker(database_url, f"soft_delete_client({database_url!r}, {created['id']!r})")
+    now[0] += revalidate
+    assert client.get(url).status_code == 404
+    stats = client.get("/health/cache").json()["caches"]["clients.entity"]
+    assert stats["stale"] == 2
+
+
+def test_search_is_ranked_prefix_and_diacritics_insensitive(client, sample_payload):
+    skoda = client.post(
+        "/api/clients", json=dict(sample_payload, name="Škoda Auto", city="Mladá Boleslav")
+    ).json()
+    client.post(
+        "/api/clients", json=dict(sample_payload, name="Dodavatel", notes="Partner of Škoda")
+    )
+    client.post("/api/clients", json=dict(sample_payload, name="Unrelated", notes=None))
+
+    response = client.get("/api/clients/search", params={"q": "skod"})
+    assert response.status_code == 200
+    names = [item["name"] for item in response.json()["items"]]
+    assert names == ["Škoda Auto", "Dodavatel"]
+
+    by_city = client.get("/api/clients/search", params={"q": "mlada boles"}).json()["items"]
+    assert [item["id"] for item in by_city] == [skoda["id"]]
+
+    client.put(f"/api/clients/{skoda['id']}", json=dict(sample_payload, name="Renamed"))
+    assert client.get("/api/clients/search", params={"q": "mlada"}).json()["items"] == []
+
+    client.delete(f"/api/clients/{skoda['id']}")
+    remaining = client.get("/api/clients/search", params={"q": "skoda"}).json()["items"]
+    assert [item["name"] for item in remaining] == ["Dodavatel"]
+
+
+def test_search_paginates(client, sample_payload):
+    for index in range(3):
+        client.post("/api/clients", json=dict(sample_payload, name=f"Novák {index}"))
+
+    first = client.get("/api/clients/search", params={"q": "novak", "limit": 2}).json()
+    assert len(first["items"]) == 2
+    second = client.get(
+        "/api/clients/search", params={"q": "novak", "limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    seen = {item["id"] for item in first["items"] + second["items"]}
+    assert len(seen) == 3
+
+    assert client.get("/api/clients/search", params={"q": "?!"}).json()["items"] == []
+    assert client.get("/api/clients/search", params={"q": ""}).status_code == 422
+
+
+def test_search_ranks_every_match_up_to_the_safety_limit(
+    client, sample_payload, monkeypatch, caplog
+):
+    # The best match is the oldest, so ranking a newest-first subset would miss it.
+    client.post("/api/clients", json=dict(sample_payload, name="Novák", notes=None))
+    for index in range(3):
+        client.post("/api/clients", json=dict(sample_payload, name=f"Firma {index}", notes="novák"))
+
+    items = client.get("/api/clients/search", params={"q": "novak"}).json()["items"]
+    assert len(items) == 4
+    assert items[0]["name"] == "Novák"
+    assert not caplog.records
+
+    monkeypatch.setattr(repository, "SEARCH_MATCH_LIMIT", 3)
+    items = client.get("/api/clients/search", params={"q": "novak"}).json()["items"]
+    assert sorted(item["name"] for item in items) == ["Firma 0", "Firma 1", "Firma 2"]
+    assert "matched at least 3 clients" in caplog.text
+
+
+def test_search_index_is_rebuilt_after_rowids_move(client, sample_payload):
+    created = client.post("/api/clients", json=dict(sample_payload, name="Škoda Auto")).json()
+    client.post("/api/clients", json=dict(sample_payload, name="Dodavatel"))
+    database_url = get_settings().database_url
+    # What VACUUM may do to a table without an INTEGER PRIMARY KEY, unseen by
+    # the triggers.
+    with repository.connection(database_url) as conn:
+        conn.execute("DROP TRIGGER trg_clients_fts_update")
+        conn.execute("UPDATE clients SET rowid = rowid + 10")
+        conn.commit()
+
+    repository.init_db(database_url)
+    items = client.get("/api/clients/search", params={"q": "skoda"}).json()["items"]
+    assert [item["id"] for item in items] == [created["id"]]
+
+
+def test_fields_projects_list_stream_and_detail(client, sample_payload):
+    for index in range(3):
+        client.post("/api/clients", json=dict(sample_payload, name=f"Client {index}"))
+
+    first = client.get("/api/clients", params={"limit": 2, "fields": "name, favourite"})
+    assert first.status_code == 200
+    assert first.headers["etag"]
+    assert [set(item) for item in first.json()["items"]] == [{"id", "name", "favourite"}] * 2
+    assert first.json()["items"][0]["favourite"] is True
+    rest = client.get(
+        "/api/clients",
+        params={"limit": 2, "fields": "name", "cursor": first.json()["next_cursor"]},
+    ).json()
+    assert len(rest["items"]) == 1
+    assert rest["next_cursor"] is None
+
+    full = client.get("/api/clients", params={"limit": 3}).json()["items"]
+    projected = first.json()["items"] + rest["items"]
+    assert [item["name"] for item in projected] == [item["name"] for item in full]
+    assert first.headers["etag"] != client.get("/api/clients", params={"limit": 2}).headers["etag"]
+
+    streamed = client.get("/api/clients", params={"stream": 1, "fields": "city"})
+    rows = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [set(row) for row in rows] == [{"id", "city"}] * 3
+
+    client_id = rows[0]["id"]
+    detail = client.get(f"/api/clients/{client_id}", params={"fields": "name"})
+    assert set(detail.json()) == {"id", "name"}
+    assert detail.json()["id"] == client_id
+    assert detail.headers["etag"] != client.get(f"/api/clients/{client_id}").headers["etag"]
+    revalidated = client.get(
+        f"/api/clients/{client_id}",
+        params={"fields": "name"},
+        headers={"If-None-Match": detail.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+    unknown = client.get("/api/clients", params={"fields": "name,created_by"})
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "Unknown fields: created_by"
+    assert client.get(f"/api/clients/{client_id}", params={"fields": ","}).status_code == 400
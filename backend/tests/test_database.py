@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Settings, get_settings
+from app.core.database import ConnectionPool, PoolTimeoutError, run_db, shutdown_db_executor
+from app.main import create_app
+
+
+@pytest.fixture()
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'pool.db'}"
+
+
+def test_pool_reuses_connections(database_url):
+    pool = ConnectionPool(database_url, size=2, timeout=1.0)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+        assert second.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["open"] == 1
+    assert stats["in_use"] == 0
+    pool.close()
+
+
+def test_pool_rolls_back_uncommitted_work_on_release(database_url):
+    pool = ConnectionPool(database_url, size=1, timeout=1.0)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.commit()
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_pool_times_out_when_exhausted(database_url):
+    pool = ConnectionPool(database_url, size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    assert pool.stats()["timeouts"] == 1
+    pool.close()
+
+
+def test_pool_waiter_gets_released_connection(database_url):
+    pool = ConnectionPool(database_url, size=1, timeout=2.0)
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with pool.connection():
+            acquired.set()
+            release.wait()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    acquired.wait()
+    threading.Timer(0.05, release.set).start()
+    with pool.connection():
+        pass
+    thread.join()
+
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time_max_ms"] > 0
+    pool.close()
+
+
+def test_fast_profile_applies_pragmas_with_overrides(database_url):
+    settings = Settings(sqlite_profile="fast", sqlite_cache_size=-1024)
+    pool = ConnectionPool(database_url, size=1, timeout=1.0, pragmas=settings.sqlite_pragmas())
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1024
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    pool.close()
+
+
+def test_invalid_pragma_override_is_rejected():
+    with pytest.raises(ValueError):
+        Settings(sqlite_journal_mode="WAL; DROP TABLE clients")
+
+
+def test_wal_writer_commits_while_reader_holds_snapshot(database_url):
+    settings = Settings(sqlite_busy_timeout=100)
+    pool = ConnectionPool(database_url, size=2, timeout=1.0, pragmas=settings.sqlite_pragmas())
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+
+    with pool.connection() as reader, pool.connection() as writer:
+        reader.execute("BEGIN")
+        assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+        writer.execute("INSERT INTO t VALUES (2)")
+        writer.commit()
+
+        assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        reader.rollback()
+        assert reader.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    pool.close()
+
+
+def test_health_db_exposes_pool_stats(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'health.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    get_settings.cache_clear()
+
+    with TestClient(create_app()) as client:
+        client.get("/api/clients")
+        response = client.get("/health/db")
+
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert pool["size"] == 3
+    assert pool["checkouts"] >= 1
+
+
+def test_run_db_is_bounded_by_executor_workers(monkeypatch):
+    monkeypatch.setenv("DB_EXECUTOR_WORKERS", "2")
+    get_settings.cache_clear()
+    shutdown_db_executor()
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def blocking_call(value):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return value * 2
+
+    async def run_many():
+        return await asyncio.gather(*(run_db(blocking_call, index) for index in range(8)))
+
+    try:
+        assert asyncio.run(run_many()) == [index * 2 for index in range(8)]
+    finally:
+        shutdown_db_executor()
+    assert peak == 2
@@ -0,0 +1,171 @@
+import asyncio
+import io
+import zipfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import create_app
+from app.modules.invoices.rendering import PdfRenderer
+
+ISSUER = {
+    "name": "Studio",
+    "address": "Dlouha 1",
+    "city": "Praha",
+    "country": "Czechia",
+    "trade_licensing_office": "Praha 1",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "email": "billing@studio.test",
+    "phone": "+420123456789",
+    "bank": "Example Bank",
+    "iban": "CZ6508000000192000145399",
+    "swift": "GIBACZPX",
+}
+LINE = {"description": "Work", "unit": "pc", "unit_price": 100, "quantity": 1}
+
+
+def _client_payload(name: str) -> dict:
+    return {
+        "name": name,
+        "address": "123 Main St",
+        "city": "Prague",
+        "country": "Czechia",
+        "main_contact_method": "email",
+        "main_contact": "hello@acme.test",
+    }
+
+
+@pytest.fixture()
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'export.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "pdf-cache"))
+    monkeypatch.setenv("PDF_RENDER_WORKERS", "1")
+    get_settings.cache_clear()
+    return create_app()
+
+
+@pytest.fixture()
+def client(app):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _create_invoices(client, client_id: str, issue_dates: list[str]) -> list[str]:
+    return [
+        client.post(
+            "/api/invoices", json={"client_id": client_id, "issue_date": issue_date, "lines": [LINE]}
+        ).json()["number"]
+        for issue_date in issue_dates
+    ]
+
+
+def test_export_filters_by_period_and_client(client):
+    acme = client.post("/api/clients", json=_client_payload("Acme")).json()["id"]
+    globex = client.post("/api/clients", json=_client_payload("Globex")).json()["id"]
+    _create_invoices(client, acme, ["2026-03-31", "2026-02-28", "2026-03-01"])
+    _create_invoices(client, globex, ["2026-03-15", "2026-04-01"])
+    assert client.get("/api/invoices/export").status_code == 409  # issuer profile missing
+    client.put("/api/users/me", json=ISSUER)
+
+    response = client.get("/api/invoices/export?issued_from=2026-03-01&issued_to=2026-03-31")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="invoices-2026-03-01-2026-03-31.zip"' in response.headers["content-disposition"]
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        # Issue date order, numbered in creation order within the year.
+        assert archive.namelist() == [
+            "invoice-2026-000003.pdf",
+            "invoice-2026-000004.pdf",
+            "invoice-2026-000001.pdf",
+        ]
+        invoices = client.get("/api/invoices").json()["items"]
+        first = next(invoice for invoice in invoices if invoice["number"] == "2026-000003")
+        assert archive.read("invoice-2026-000003.pdf") == client.get(
+            f"/api/invoices/{first['id']}/pdf"
+        ).content
+
+    by_client = client.get(f"/api/invoices/export?client_id={globex}")
+    with zipfile.ZipFile(io.BytesIO(by_client.content)) as archive:
+        assert archive.namelist() == ["invoice-2026-000004.pdf", "invoice-2026-000005.pdf"]
+
+    empty = client.get("/api/invoices/export?issued_from=2030-01-01")
+    with zipfile.ZipFile(io.BytesIO(empty.content)) as archive:
+        assert archive.namelist() == []
+
+    reversed_range = client.get("/api/invoices/export?issued_from=2026-03-02&issued_to=2026-03-01")
+    assert reversed_range.status_code == 422
+
+
+def test_export_streams_one_file_per_chunk_while_rendering(app, client, tmp_path):
+    client.put("/api/users/me", json=ISSUER)
+    client_id = client.post("/api/clients", json=_client_payload("Acme")).json()["id"]
+    count = 12
+    _create_invoices(client, client_id, ["2026-05-01"] * count)
+    cache_dir = tmp_path / "pdf-cache"
+    chunks: list[tuple[int, int]] = []  # (chunk size, PDFs rendered when it was sent)
+
+    async def export() -> None:
+        requested = asyncio.Event()
+
+        async def receive():
+            if requested.is_set():
+                await asyncio.Event().wait()  # never disconnects
+            requested.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                chunks.append((len(message["body"]), len(list(cache_dir.rglob("*.pdf")))))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/invoices/export",
+            "raw_path": b"/api/invoices/export",
+            "query_string": b"",
+            "headers": [],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+        await app(scope, receive, send)
+
+    client.portal.call(export)
+
+    assert len(chunks) == count + 2  # one per file, the central directory, the end record
+    largest_pdf = max(path.stat().st_size for path in cache_dir.rglob("*.pdf"))
+    assert max(size for size, _ in chunks) < largest_pdf + 200
+    # The first file went out while most invoices were still unrendered:
+    # one worker renders at most two ahead.
+    assert chunks[0][1] <= 3
+
+
+def test_render_many_keeps_order_and_a_bounded_window(tmp_path):
+    class SlowRenderer(PdfRenderer):
+        in_flight = 0
+        peak = 0
+
+        async def render(self, document: dict, key: str | None = None) -> Path:
+            SlowRenderer.in_flight += 1
+            SlowRenderer.peak = max(SlowRenderer.peak, SlowRenderer.in_flight)
+            await asyncio.sleep(0.001 * (document["index"] % 3))
+            SlowRenderer.in_flight -= 1
+            return tmp_path / f"{document['index']}.pdf"
+
+    async def documents():
+        for index in range(20):
+            yield {"index": index}
+
+    async def collect() -> list[int]:
+        renderer = SlowRenderer(tmp_path, workers=2)
+        return [document["index"] async for document, _ in renderer.render_many(documents())]
+
+    assert asyncio.run(collect()) == list(range(20))
+    assert SlowRenderer.peak <= 4
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.database import close_pools
+from app.modules.catalog_items import repository as catalog_items_repository
+from app.modules.clients import repository as clients_repository
+from app.modules.clients.schemas import ClientCreate
+from app.modules.invoices import repository as invoices_repository
+from app.modules.invoices.numbering import check_number_format
+from app.modules.invoices.schemas import InvoiceCreate, InvoiceUpdate
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+LINE = {"description": "Work", "unit": "pc", "unit_price": 100, "quantity": 1}
+
+
+@pytest.fixture()
+def database(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'numbering.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    get_settings.cache_clear()
+    clients_repository.init_db(database_url)
+    catalog_items_repository.init_db(database_url)
+    invoices_repository.init_db(database_url)
+    client = clients_repository.create_client(database_url, ClientCreate(**CLIENT_PAYLOAD))
+    yield database_url, client["id"]
+    close_pools()
+
+
+def _invoice(client_id: str, issue_date: str) -> InvoiceCreate:
+    return InvoiceCreate(client_id=client_id, issue_date=issue_date, lines=[LINE])
+
+
+def _create_invoices(database_url: str, client_id: str, issue_dates: list[str]) -> list[str]:
+    os.environ["DATABASE_URL"] = database_url
+    get_settings.cache_clear()
+    return [
+        invoices_repository.create_invoice(database_url, _invoice(client_id, issue_date))["number"]
+        for issue_date in issue_dates
+    ]
+
+
+def test_numbers_are_sequential_per_year(database):
+    database_url, client_id = database
+    numbers = [
+        invoices_repository.create_invoice(database_url, _invoice(client_id, issue_date))["number"]
+        for issue_date in ("2025-12-31", "2026-01-01", "2026-06-30", "2025-12-31", "2026-12-31")
+    ]
+    assert numbers == ["2025-000001", "2026-000001", "2026-000002", "2025-000002", "2026-000003"]
+
+
+def test_failed_insert_does_not_use_up_a_number(database, monkeypatch):
+    database_url, client_id = database
+
+    def fail(conn, rows):
+        raise RuntimeError("disk on fire")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(invoices_repository, "_insert_lines", fail)
+        with pytest.raises(RuntimeError):
+            invoices_repository.create_invoice(database_url, _invoice(client_id, "2026-02-01"))
+
+    created = invoices_repository.create_invoice(database_url, _invoice(client_id, "2026-02-01"))
+    assert created["number"] == "2026-000001"
+    assert invoices_repository.list_invoices(database_url, 10)[0] == [
+        {key: value for key, value in created.items() if key != "lines"}
+    ]
+
+
+def test_issue_date_cannot_move_to_another_year(database):
+    database_url, client_id = database
+    created = invoices_repository.create_invoice(database_url, _invoice(client_id, "2025-12-31"))
+
+    def update(issue_date: str) -> dict:
+        payload = InvoiceUpdate(
+            client_id=client_id,
+            issue_date=issue_date,
+            due_date="2026-01-31",
+            notes=None,
+            lines=[LINE],
+        )
+        return invoices_repository.update_invoice(database_url, created["id"], payload)
+
+    with pytest.raises(invoices_repository.InvoiceStateError, match="another year"):
+        update("2026-01-02")
+    assert invoices_repository.get_invoice(database_url, created["id"])["issue_date"] == "2025-12-31"
+
+    moved = update("2025-12-01")
+    assert (moved["issue_date"], moved["number"]) == ("2025-12-01", "2025-000001")
+
+
+def test_custom_format(database, monkeypatch):
+    database_url, client_id = database
+    monkeypatch.setenv("INVOICE_NUMBER_FORMAT", "INV/{sequence:04d}/{year}")
+    get_settings.cache_clear()
+    created = invoices_repository.create_invoice(database_url, _invoice(client_id, "2026-02-01"))
+    assert created["number"] == "INV/0001/2026"
+
+
+@pytest.mark.parametrize("number_format", ["{year}", "{sequence}", "{year}-{seq}", "{year}-{sequence:x"])
+def test_ambiguous_or_broken_formats_are_rejected(number_format):
+    with pytest.raises(ValueError):
+        check_number_format(number_format)
+
+
+def test_concurrent_processes_get_gap_free_unique_numbers(database):
+    database_url, client_id = database
+    processes, per_process = 6, 25
+    dates = ["2026-03-01" if index % 3 else "2027-01-15" for index in range(per_process)]
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processes, mp_context=context) as pool:
+        futures = [
+            pool.submit(_create_invoices, database_url, client_id, dates) for _ in range(processes)
+        ]
+        numbers = [number for future in futures for number in future.result()]
+
+    assert len(numbers) == len(set(numbers)) == processes * per_process
+    for year, count in (("2026", dates.count("2026-03-01")), ("2027", dates.count("2027-01-15"))):
+        taken = sorted(number for number in numbers if number.startswith(f"{year}-"))
+        assert taken == [f"{year}-{sequence:06d}" for sequence in range(1, processes * count + 1)]
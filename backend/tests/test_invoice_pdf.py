@@ -0,0 +1,191 @@
+import re
+import sqlite3
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.metrics import render_metrics, reset_metrics
+from app.main import create_app
+from app.modules.invoices.pdf import document_key, money, render_invoice_pdf
+
+ISSUER = {
+    "name": "Studio Nováková",
+    "address": "Dlouhá 1",
+    "city": "Praha",
+    "country": "Czechia",
+    "trade_licensing_office": "Praha 1",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "email": "billing@studio.test",
+    "phone": "+420123456789",
+    "bank": "Example Bank",
+    "iban": "CZ6508000000192000145399",
+    "swift": "GIBACZPX",
+}
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+LINE = {"description": "Design (phase 1)", "unit": "hour", "unit_price": 150000, "tax_rate": 21, "quantity": 3}
+
+
+def _document(lines: int = 1, **invoice) -> dict:
+    line = {
+        "description": "Design (phase 1)",
+        "unit": "hour",
+        "quantity": 3,
+        "unit_price": 150000,
+        "tax_rate": 21,
+        "subtotal": 450000,
+        "tax": 94500,
+        "total": 544500,
+    }
+    return {
+        "issuer": ISSUER,
+        "client": {
+            "name": "Acme Co",
+            "address": "123 Main St",
+            "city": "Prague",
+            "country": "Czechia",
+            "ico": None,
+            "dic": None,
+            "main_contact": "hello@acme.test",
+        },
+        "invoice": {
+            "number": "2026-000001",
+            "status": "issued",
+            "issue_date": "2026-03-01",
+            "due_date": "2026-03-15",
+            "notes": None,
+            "subtotal": 450000 * lines,
+            "tax_total": 94500 * lines,
+            "total": 544500 * lines,
+            **invoice,
+        },
+        "lines": [line] * lines,
+    }
+
+
+def _text(pdf: bytes) -> str:
+    streams = re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    return b"\n".join(zlib.decompress(stream) for stream in streams).decode("latin-1")
+
+
+def test_render_is_deterministic_with_a_valid_xref():
+    pdf = render_invoice_pdf(_document())
+    assert pdf == render_invoice_pdf(_document())
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref\n")
+    offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[xref:])
+    for number, offset in enumerate(offsets, start=1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+
+    text = _text(pdf)
+    assert "(Invoice 2026-000001)" in text
+    assert "(CZ6508000000192000145399)" in text
+    assert "(Design \\(phase 1\\))" in text
+    assert "(5 445.00)" in text
+    assert "(Studio Nov\xe1kov\xe1)" in text
+    assert b"/Differences [140 /Sacute" in pdf
+
+
+def test_render_keeps_czech_letters_and_paginates():
+    document = _document(lines=120, status="cancelled", notes="Řehoř Čech, ůdolí, Crème")
+    document["client"] = {**document["client"], "name": "Řehoř Čech"}
+    pdf = render_invoice_pdf(document)
+    text = _text(pdf)
+    assert "(CANCELLED)" in text
+    assert "(Řehoř Čech)" in text.encode("latin-1").decode("cp1250")
+    # Windows-1250 lacks è, so only it loses its accent.
+    assert "(\xd8eho\xf8 \xc8ech, \xf9dol\xed, Creme)" in text
+    assert b"/Count 3" in pdf
+    assert "(2026-000001  |  Page 3 of 3)" in text
+    assert money(123456789) == "1 234 567.89"
+
+
+def test_document_key_covers_printed_values():
+    base = document_key(_document())
+    assert document_key(_document()) == base
+    assert document_key(_document(status="cancelled")) != base
+    changed = _document()
+    changed["issuer"] = {**ISSUER, "iban": "CZ0000000000000000000000"}
+    assert document_key(changed) != base
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'pdf.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "pdf-cache"))
+    monkeypatch.setenv("PDF_RENDER_WORKERS", "1")
+    get_settings.cache_clear()
+    reset_metrics()
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def invoice(client):
+    client_id = client.post("/api/clients", json=CLIENT_PAYLOAD).json()["id"]
+    return client.post(
+        "/api/invoices", json={"client_id": client_id, "issue_date": "2026-03-01", "lines": [LINE]}
+    ).json()
+
+
+def test_pdf_download_renders_once_then_reads_cache(client, invoice, tmp_path):
+    url = f"/api/invoices/{invoice['id']}/pdf"
+    assert client.get(url).status_code == 409  # issuer profile missing
+    client.put("/api/users/me", json=ISSUER)
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.headers["content-disposition"] == 'attachment; filename="invoice-2026-000001.pdf"'
+    assert first.content.startswith(b"%PDF-")
+    assert len(list((tmp_path / "pdf-cache").rglob("*.pdf"))) == 1
+
+    second = client.get(url)
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    client.post(f"/api/invoices/{invoice['id']}/cancel")
+    cancelled = client.get(url)
+    assert cancelled.headers["etag"] != first.headers["etag"]
+    assert "(CANCELLED)" in _text(cancelled.content)
+    assert len(list((tmp_path / "pdf-cache").rglob("*.pdf"))) == 2
+
+    metrics = render_metrics()
+    assert 'invoice_pdf_cache_lookups_total{result="miss"} 2' in metrics
+    assert 'invoice_pdf_cache_lookups_total{result="hit"} 1' in metrics
+    assert "invoice_pdf_render_seconds_count 2" in metrics
+
+
+def test_pdf_of_missing_invoice_returns_404(client):
+    client.put("/api/users/me", json=ISSUER)
+    assert client.get("/api/invoices/missing/pdf").status_code == 404
+
+
+def test_pdf_follows_a_cancel_by_another_worker(client, invoice, tmp_path):
+    client.put("/api/users/me", json=ISSUER)
+    url = f"/api/invoices/{invoice['id']}"
+    assert client.get(url).json()["status"] == "issued"  # now cached here
+    issued_etag = client.get(f"{url}/pdf").headers["etag"]
+
+    other = sqlite3.connect(tmp_path / "pdf.db")  # another worker's connection
+    other.execute("UPDATE invoices SET status = 'cancelled' WHERE id = ?", (invoice["id"],))
+    other.commit()
+    other.close()
+
+    assert client.get(url).json()["status"] == "cancelled"
+    cancelled = client.get(f"{url}/pdf", headers={"If-None-Match": issued_etag})
+    assert cancelled.status_code == 200
+    assert "(CANCELLED)" in _text(cancelled.content)
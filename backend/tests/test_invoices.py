@@ -0,0 +1,189 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import create_app
+from app.modules.invoices.repository import line_amounts
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    db_path = tmp_path / "invoices.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    get_settings.cache_clear()
+
+    app = create_app()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def client_id(client):
+    return client.post("/api/clients", json=CLIENT_PAYLOAD).json()["id"]
+
+
+@pytest.fixture()
+def catalog_item(client):
+    return client.post(
+        "/api/catalog-items",
+        json={
+            "name": "Design work",
+            "description": "Product design services",
+            "unit": "hour",
+            "unit_price": 15000,
+            "tax_rate": 21,
+        },
+    ).json()
+
+
+def test_line_amounts_round_tax_half_up_in_integers():
+    assert line_amounts(3, 333, 21) == (999, 210, 1209)  # 209.79 -> 210
+    assert line_amounts(1, 50, 1) == (50, 1, 51)  # 0.5 -> 1
+    assert line_amounts(1, 49, 1) == (49, 0, 49)
+    assert line_amounts(2, 15000, None) == (30000, 0, 30000)
+    assert line_amounts(10**6, 10**9, 21) == (10**15, 21 * 10**13, 121 * 10**13)
+
+
+def test_create_snapshots_catalog_and_stores_totals(client, client_id, catalog_item):
+    response = client.post(
+        "/api/invoices",
+        json={
+            "client_id": client_id,
+            "issue_date": "2026-03-01",
+            "lines": [
+                {"catalog_item_id": catalog_item["id"], "quantity": 3},
+                {"catalog_item_id": catalog_item["id"], "quantity": 1, "unit_price": 333, "tax_rate": None},
+                {"description": "Travel", "unit": "trip", "unit_price": 1999, "tax_rate": 15, "quantity": 2},
+            ],
+        },
+    )
+    assert response.status_code == 201
+    invoice = response.json()
+    assert invoice["status"] == "issued"
+    assert (invoice["issue_date"], invoice["due_date"]) == ("2026-03-01", "2026-03-15")
+    assert [line["position"] for line in invoice["lines"]] == [1, 2, 3]
+
+    first, second, third = invoice["lines"]
+    assert (first["description"], first["unit"], first["unit_price"], first["tax_rate"]) == (
+        "Design work",
+        "hour",
+        15000,
+        21,
+    )
+    assert (first["subtotal"], first["tax"], first["total"]) == (45000, 9450, 54450)
+    assert (second["unit_price"], second["tax_rate"], second["tax"]) == (333, None, 0)
+    assert (third["subtotal"], third["tax"], third["total"]) == (3998, 600, 4598)
+    assert invoice["subtotal"] == 45000 + 333 + 3998
+    assert invoice["tax_total"] == 9450 + 600
+    assert invoice["total"] == invoice["subtotal"] + invoice["tax_total"]
+
+    # Later catalog changes do not touch issued lines.
+    client.put(
+        f"/api/catalog-items/{catalog_item['id']}",
+        json={**{k: catalog_item[k] for k in ("name", "description", "unit")}, "unit_price": 1, "tax_rate": 0},
+    )
+    fetched = client.get(f"/api/invoices/{invoice['id']}")
+    assert fetched.status_code == 200
+    assert fetched.json() == invoice
+
+    listed = client.get("/api/invoices").json()["items"]
+    assert listed == [{key: value for key, value in invoice.items() if key != "lines"}]
+
+
+def test_unknown_references_and_invalid_lines_are_rejected(client, client_id):
+    missing_client = client.post(
+        "/api/invoices",
+        json={"client_id": "missing", "lines": [{"description": "X", "unit": "pc", "unit_price": 1, "quantity": 1}]},
+    )
+    assert missing_client.status_code == 422
+    assert missing_client.json()["detail"] == "Client not found"
+
+    missing_item = client.post(
+        "/api/invoices",
+        json={"client_id": client_id, "lines": [{"catalog_item_id": "missing", "quantity": 1}]},
+    )
+    assert missing_item.status_code == 422
+    assert missing_item.json()["detail"] == "Catalog item not found: missing"
+
+    for lines in (
+        [],
+        [{"description": "X", "unit": "pc", "quantity": 1}],
+        [{"description": "X", "unit": "pc", "unit_price": 1, "quantity": 0}],
+        [{"description": "X", "unit": "pc", "unit_price": -1, "quantity": 1}],
+    ):
+        response = client.post("/api/invoices", json={"client_id": client_id, "lines": lines})
+        assert response.status_code == 422, lines
+
+    backwards = client.post(
+        "/api/invoices",
+        json={
+            "client_id": client_id,
+            "issue_date": "2026-03-10",
+            "due_date": "2026-03-01",
+            "lines": [{"description": "X", "unit": "pc", "unit_price": 1, "quantity": 1}],
+        },
+    )
+    assert backwards.status_code == 422
+    assert client.get("/api/invoices").json()["items"] == []
+
+
+def test_update_replaces_lines_and_cancel_freezes_invoice(client, client_id):
+    line = {"description": "Consulting", "unit": "hour", "unit_price": 1000, "tax_rate": 21, "quantity": 2}
+    created = client.post("/api/invoices", json={"client_id": client_id, "lines": [line, line]}).json()
+    url = f"/api/invoices/{created['id']}"
+    etag = client.get(url).headers["etag"]
+
+    update = {
+        "client_id": client_id,
+        "issue_date": created["issue_date"],
+        "due_date": created["due_date"],
+        "notes": "Revised",
+        "lines": [dict(line, quantity=5)],
+    }
+    updated = client.put(url, json=update)
+    assert updated.status_code == 200
+    assert len(updated.json()["lines"]) == 1
+    assert (updated.json()["subtotal"], updated.json()["tax_total"]) == (5000, 1050)
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    cancelled = client.post(f"{url}/cancel")
+    assert cancelled.status_code == 200
+    assert cancelled.json()["status"] == "cancelled"
+    assert cancelled.json()["cancelled_at"] is not None
+    assert cancelled.json()["total"] == updated.json()["total"]
+
+    assert client.post(f"{url}/cancel").status_code == 409
+    assert client.put(url, json=update).status_code == 409
+    assert client.put("/api/invoices/missing", json=update).status_code == 404
+    assert client.post("/api/invoices/missing/cancel").status_code == 404
+    assert client.get("/api/invoices/missing").status_code == 404
+
+
+def test_list_pages_and_filters_by_client(client, client_id):
+    other_id = client.post("/api/clients", json=dict(CLIENT_PAYLOAD, name="Other")).json()["id"]
+    line = {"description": "Work", "unit": "pc", "unit_price": 100, "quantity": 1}
+    for owner in (client_id, other_id, client_id):
+        assert client.post("/api/invoices", json={"client_id": owner, "lines": [line]}).status_code == 201
+
+    first = client.get("/api/invoices", params={"limit": 2}).json()
+    second = client.get("/api/invoices", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert len(first["items"]) == 2 and len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+    mine = client.get("/api/invoices", params={"client_id": client_id}).json()["items"]
+    assert len(mine) == 2
+    assert {invoice["client_id"] for invoice in mine} == {client_id}
+    assert "lines" not in mine[0]
+
+    listing = client.get("/api/invoices")
+    assert client.get("/api/invoices", headers={"If-None-Match": listing.headers["etag"]}).status_code == 304
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.metrics import DB_QUERY_DURATION, HTTP_REQUESTS, render_metrics, reset_metrics
+from app.main import create_app
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'metrics.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    get_settings.cache_clear()
+    reset_metrics()
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+def _samples(text: str) -> dict[str, float]:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    }
+
+
+def test_metrics_count_routes_by_template_and_time_queries(client):
+    created = client.post("/api/clients", json=CLIENT_PAYLOAD).json()
+    client.get(f"/api/clients/{created['id']}")
+    client.get("/api/clients/missing")
+    client.get("/not-a-route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+
+    assert samples['http_requests_total{method="POST",route="/api/clients",status="201"}'] == 1
+    assert samples['http_requests_total{method="GET",route="/api/clients/{client_id}",status="200"}'] == 1
+    assert samples['http_requests_total{method="GET",route="/api/clients/{client_id}",status="404"}'] == 1
+    assert samples['http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+    duration = 'http_request_duration_seconds_count{method="GET",route="/api/clients/{client_id}"}'
+    assert samples[duration] == 2
+    bucket = 'http_request_duration_seconds_bucket{method="GET",route="/api/clients/{client_id}",le="+Inf"}'
+    assert samples[bucket] == 2
+    assert samples['db_query_duration_seconds_count{query="clients.create"}'] == 1
+    # The created client is served from the entity cache; only the miss reaches SQLite.
+    assert samples['db_query_duration_seconds_count{query="clients.get"}'] == 1
+
+
+def test_metrics_merge_series_recorded_on_other_threads():
+    reset_metrics()
+
+    def record():
+        for _ in range(100):
+            HTTP_REQUESTS.inc(("GET", "/threads", "200"))
+            DB_QUERY_DURATION.observe(("threads",), 0.002)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = _samples(render_metrics())
+    assert samples['http_requests_total{method="GET",route="/threads",status="200"}'] == 400
+    assert samples['db_query_duration_seconds_bucket{query="threads",le="0.001"}'] == 0
+    assert samples['db_query_duration_seconds_bucket{query="threads",le="0.0025"}'] == 400
+    assert samples['db_query_duration_seconds_sum{query="threads"}'] == pytest.approx(0.8)
+    reset_metrics()
+
+
+def test_metrics_of_exited_threads_are_kept_without_their_shards():
+    reset_metrics()
+    shards = len(metrics._shards)
+
+    def record():
+        HTTP_REQUESTS.inc(("GET", "/exited", "200"))
+
+    for _ in range(20):
+        thread = threading.Thread(target=record)
+        thread.start()
+        thread.join()
+
+    assert len(metrics._shards) == shards
+    samples = _samples(render_metrics())
+    assert samples['http_requests_total{method="GET",route="/exited",status="200"}'] == 20
+    reset_metrics()
+
+
+def test_metrics_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'metrics.db'}")
+    monkeypatch.setenv("METRICS_ENABLED", "0")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as test_client:
+        assert test_client.get("/metrics").status_code == 404
@@ -0,0 +1,241 @@
+from datetime import date
+
+import pytest
+
+from app.core.database import ConnectionPool
+from app.modules.catalog_items import repository as catalog_items_repository
+from app.modules.catalog_items.schemas import CatalogItemCreate, CatalogItemUpdate
+from app.modules.clients import repository as clients_repository
+from app.modules.clients.schemas import ClientCreate, ClientUpdate
+from app.modules.invoices import repository as invoices_repository
+from app.modules.invoices.schemas import InvoiceCreate
+from app.modules.reports import repository as reports_repository
+from app.modules.users import repository as users_repository
+from app.modules.users.schemas import UserUpsert
+
+from tests.query_plan import assert_uses_index, captured_statements, query_plan
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+
+CATALOG_ITEM_PAYLOAD = {
+    "name": "Design work",
+    "description": "Product design services",
+    "unit": "hour",
+    "unit_price": 15000,
+    "tax_rate": 21,
+}
+
+USER_PAYLOAD = {
+    "name": "Studio",
+    "address": "Dlouha 1",
+    "city": "Praha",
+    "country": "Czechia",
+    "trade_licensing_office": "Praha 1",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "email": "billing@studio.test",
+    "phone": "+420123456789",
+    "bank": "Example Bank",
+    "iban": "CZ6508000000192000145399",
+    "swift": "GIBACZPX",
+}
+
+
+@pytest.fixture()
+def pool(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'plans.db'}"
+    pool = ConnectionPool(database_url, size=1, timeout=1.0)
+    monkeypatch.setattr("app.core.database._pools", {database_url: pool})
+    yield pool
+    pool.close()
+
+
+def test_client_hot_queries_use_indexes(pool):
+    url = pool.database_url
+    clients_repository.init_db(url)
+    clients_repository.create_client(url, ClientCreate(**CLIENT_PAYLOAD))
+    created = clients_repository.create_client(url, ClientCreate(**CLIENT_PAYLOAD))
+
+    with captured_statements(pool) as statements:
+        _, after = clients_repository.list_clients(url, limit=1)
+        clients_repository.list_clients(url, limit=10, after=after)
+        clients_repository.get_client(url, created["id"])
+        clients_repository.update_client(
+            url,
+            created["id"],
+            ClientUpdate(
+                **CLIENT_PAYLOAD,
+                additional_contact=None,
+                ico=None,
+                dic=None,
+                notes=None,
+                favourite=True,
+            ),
+        )
+        clients_repository.soft_delete_client(url, created["id"])
+
+    list_statements = [sql for sql in statements if "FROM clients" in sql and "LIMIT" in sql]
+    assert len(list_statements) == 2
+    with pool.connection() as conn:
+        for sql in list_statements:
+            assert_uses_index(conn, sql, "idx_clients_live_created_at")
+        for sql in statements:
+            if "WHERE id =" in sql:
+                assert_uses_index(conn, sql, "sqlite_autoindex_clients_1")
+
+
+def test_catalog_item_hot_queries_use_indexes(pool):
+    url = pool.database_url
+    catalog_items_repository.init_db(url)
+    catalog_items_repository.create_catalog_item(url, CatalogItemCreate(**CATALOG_ITEM_PAYLOAD))
+    created = catalog_items_repository.create_catalog_item(
+        url, CatalogItemCreate(**CATALOG_ITEM_PAYLOAD)
+    )
+
+    with captured_statements(pool) as statements:
+        _, after = catalog_items_repository.list_catalog_items(url, limit=1)
+        catalog_items_repository.list_catalog_items(url, limit=10, after=after)
+        catalog_items_repository.get_catalog_item(url, created["id"])
+        catalog_items_repository.update_catalog_item(
+            url, created["id"], CatalogItemUpdate(**CATALOG_ITEM_PAYLOAD)
+        )
+        catalog_items_repository.suggest_catalog_items(url, "Desi", limit=10)
+        catalog_items_repository.soft_delete_catalog_item(url, created["id"])
+        catalog_items_repository.upsert_catalog_items_by_key(
+            url, [(1, CatalogItemCreate(**CATALOG_ITEM_PAYLOAD))]
+        )
+
+    list_statements = [sql for sql in statements if "ORDER BY created_at" in sql and "LIMIT" in sql]
+    assert len(list_statements) == 2
+    with pool.connection() as conn:
+        for sql in list_statements:
+            assert_uses_index(conn, sql, "idx_catalog_items_live_created_at")
+        for sql in statements:
+            if "WHERE id =" in sql:
+                assert_uses_index(conn, sql, "sqlite_autoindex_catalog_items_1")
+            if "name LIKE" in sql:
+                assert_uses_index(conn, sql, "idx_catalog_items_live_name_nocase")
+            if "WITH keys" in sql:
+                assert_uses_index(
+                    conn, sql, "idx_catalog_items_live_name_unit", allowed_scans=("keys",)
+                )
+
+
+def test_invoice_hot_queries_use_indexes(pool):
+    url = pool.database_url
+    clients_repository.init_db(url)
+    catalog_items_repository.init_db(url)
+    invoices_repository.init_db(url)
+    client = clients_repository.create_client(url, ClientCreate(**CLIENT_PAYLOAD))
+    item = catalog_items_repository.create_catalog_item(url, CatalogItemCreate(**CATALOG_ITEM_PAYLOAD))
+    payload = InvoiceCreate(
+        client_id=client["id"],
+        lines=[{"catalog_item_id": item["id"], "quantity": 2}, {"catalog_item_id": item["id"], "quantity": 1}],
+    )
+    invoices_repository.create_invoice(url, payload)
+    created = invoices_repository.create_invoice(url, payload)
+
+    with captured_statements(pool) as statements:
+        _, after = invoices_repository.list_invoices(url, limit=1)
+        invoices_repository.list_invoices(url, limit=10, after=after)
+        invoices_repository.list_invoices(url, limit=10, after=after, client_id=client["id"])
+        invoices_repository._load_invoice(url, created["id"])
+        invoices_repository.cancel_invoice(url, created["id"])
+
+    list_statements = [sql for sql in statements if "FROM invoices" in sql and "LIMIT" in sql]
+    assert len(list_statements) == 3
+    with pool.connection() as conn:
+        assert_uses_index(conn, list_statements[0], "idx_invoices_created_at")
+        assert_uses_index(conn, list_statements[1], "idx_invoices_created_at")
+        assert_uses_index(conn, list_statements[2], "idx_invoices_client_created_at")
+        for sql in statements:
+            if "JOIN invoice_lines" in sql:
+                assert_uses_index(conn, sql, "PRIMARY KEY")
+            elif "WHERE id =" in sql:
+                assert_uses_index(conn, sql, "sqlite_autoindex_invoices_1")
+
+
+def test_invoice_export_reads_by_issue_date_index(pool):
+    url = pool.database_url
+    clients_repository.init_db(url)
+    catalog_items_repository.init_db(url)
+    users_repository.init_db(url)
+    invoices_repository.init_db(url)
+    users_repository.upsert_user(url, UserUpsert(**USER_PAYLOAD))
+    client = clients_repository.create_client(url, ClientCreate(**CLIENT_PAYLOAD))
+    line = {"description": "Work", "unit": "pc", "unit_price": 100, "quantity": 1}
+    for issue_date in ("2026-03-01", "2026-03-01", "2026-04-01"):
+        invoices_repository.create_invoice(
+            url, InvoiceCreate(client_id=client["id"], issue_date=issue_date, lines=[line])
+        )
+
+    with captured_statements(pool) as statements:
+        batches = invoices_repository.iter_invoice_documents(
+            url, issued_from=date(2026, 1, 1), issued_to=date(2026, 12, 31), batch_size=2
+        )
+        first = next(batches)
+        # Released between batches: the single connection is free for others.
+        assert pool.stats()["in_use"] == 0
+        numbers = [document["invoice"]["number"] for batch in (first, *batches) for document in batch]
+    assert numbers == ["2026-000001", "2026-000002", "2026-000003"]
+
+    exports = [sql for sql in statements if "ORDER BY issue_date" in sql]
+    lines = [sql for sql in statements if "FROM invoice_lines" in sql]
+    assert len(exports) == 2 and "(issue_date, number) >" in exports[1]
+    with pool.connection() as conn:
+        for sql in exports:
+            assert_uses_index(conn, sql, "idx_invoices_issue_date")
+        for sql in lines:
+            assert_uses_index(conn, sql, "PRIMARY KEY")
+
+
+def test_reports_read_only_the_revenue_summaries(pool):
+    url = pool.database_url
+    clients_repository.init_db(url)
+    catalog_items_repository.init_db(url)
+    invoices_repository.init_db(url)
+    client = clients_repository.create_client(url, ClientCreate(**CLIENT_PAYLOAD))
+    line = {"description": "Work", "unit": "pc", "unit_price": 100, "tax_rate": 21, "quantity": 1}
+    for issue_date in ("2026-01-15", "2026-02-15"):
+        invoices_repository.create_invoice(
+            url, InvoiceCreate(client_id=client["id"], issue_date=issue_date, lines=[line])
+        )
+
+    with captured_statements(pool) as statements:
+        reports_repository.revenue_by_month(url, "2026-01", "2026-12")
+        reports_repository.revenue_by_tax_rate(url, "2026-01", "2026-12")
+        _, after = reports_repository.revenue_by_client(url, limit=1)
+        reports_repository.revenue_by_client(url, limit=10, after=after)
+
+    assert not [sql for sql in statements if "invoices" in sql or "invoice_lines" in sql]
+    with pool.connection() as conn:
+        for sql in statements:
+            if "FROM revenue_by_client" in sql:
+                assert_uses_index(conn, sql, "idx_revenue_by_client_total")
+            elif "GROUP BY tax_rate" in sql:
+                # Grouping sorts the (month, tax rate) rows in range, a few per month.
+                plan = query_plan(conn, sql)
+                assert plan[0].startswith("SEARCH revenue_by_tax_rate USING PRIMARY KEY (month>?")
+                assert plan[1:] == ["USE TEMP B-TREE FOR GROUP BY"]
+            else:
+                assert_uses_index(conn, sql, "PRIMARY KEY")
+
+
+def test_list_query_without_index_is_flagged(pool):
+    url = pool.database_url
+    clients_repository.init_db(url)
+
+    with captured_statements(pool) as statements:
+        clients_repository.list_clients(url, limit=10)
+
+    with pool.connection() as conn:
+        conn.execute("DROP INDEX idx_clients_live_created_at")
+        with pytest.raises(AssertionError):
+            assert_uses_index(conn, statements[0], "idx_clients_live_created_at")
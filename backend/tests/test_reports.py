@@ -0,0 +1,228 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.database import connection
+from app.main import create_app
+from app.modules.invoices.repository import init_db
+from app.modules.invoices.revenue import REVENUE_TABLES, rebuild_revenue
+from app.modules.reports import rebuild
+
+
+def _client_payload(name: str) -> dict:
+    return {
+        "name": name,
+        "address": "123 Main St",
+        "city": "Prague",
+        "country": "Czechia",
+        "main_contact_method": "email",
+        "main_contact": "hello@acme.test",
+    }
+
+
+def _line(unit_price: int, tax_rate: int | None, quantity: int = 1) -> dict:
+    return {
+        "description": "Work",
+        "unit": "pc",
+        "unit_price": unit_price,
+        "tax_rate": tax_rate,
+        "quantity": quantity,
+    }
+
+
+@pytest.fixture()
+def database_url(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'reports.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    get_settings.cache_clear()
+    return database_url
+
+
+@pytest.fixture()
+def client(database_url):
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def clients(client):
+    return {
+        name: client.post("/api/clients", json=_client_payload(name)).json()["id"]
+        for name in ("Acme", "Globex")
+    }
+
+
+def _invoice(client, client_id: str, issue_date: str, lines: list[dict]) -> dict:
+    return client.post(
+        "/api/invoices", json={"client_id": client_id, "issue_date": issue_date, "lines": lines}
+    ).json()
+
+
+def test_reports_follow_create_update_and_cancel(client, clients, database_url):
+    acme, globex = clients["Acme"], clients["Globex"]
+    _invoice(client, acme, "2026-01-10", [_line(1000, 21), _line(500, None)])
+    moved = _invoice(client, acme, "2026-01-20", [_line(2000, 21)])
+    cancelled = _invoice(client, globex, "2026-02-01", [_line(9999, 12)])
+    _invoice(client, globex, "2026-02-15", [_line(300, 12, quantity=2)])
+
+    # Moved to Globex in March with different lines; the January amounts go.
+    client.put(
+        f"/api/invoices/{moved['id']}",
+        json={
+            "client_id": globex,
+            "issue_date": "2026-03-05",
+            "due_date": "2026-03-19",
+            "notes": None,
+            "lines": [_line(4000, 21), _line(100, None)],
+        },
+    )
+    client.post(f"/api/invoices/{cancelled['id']}/cancel")
+    # Rejected changes leave the summaries alone.
+    assert client.post(f"/api/invoices/{cancelled['id']}/cancel").status_code == 409
+    assert client.put(
+        f"/api/invoices/{cancelled['id']}",
+        json={
+            "client_id": acme,
+            "issue_date": "2026-02-01",
+            "due_date": "2026-02-15",
+            "notes": None,
+            "lines": [_line(1, None)],
+        },
+    ).status_code == 409
+
+    months = client.get("/api/reports/revenue/by-month").json()["items"]
+    assert months == [
+        {"month": "2026-01", "invoice_count": 1, "subtotal": 1500, "tax_total": 210, "total": 1710},
+        {"month": "2026-02", "invoice_count": 1, "subtotal": 600, "tax_total": 72, "total": 672},
+        {"month": "2026-03", "invoice_count": 1, "subtotal": 4100, "tax_total": 840, "total": 4940},
+    ]
+    march = client.get("/api/reports/revenue/by-month?from_month=2026-02&to_month=2026-02")
+    assert [item["month"] for item in march.json()["items"]] == ["2026-02"]
+
+    rates = client.get("/api/reports/revenue/by-tax-rate").json()["items"]
+    assert rates == [
+        {"tax_rate": None, "line_count": 2, "subtotal": 600, "tax_total": 0, "total": 600},
+        {"tax_rate": 12, "line_count": 1, "subtotal": 600, "tax_total": 72, "total": 672},
+        {"tax_rate": 21, "line_count": 2, "subtotal": 5000, "tax_total": 1050, "total": 6050},
+    ]
+    january = client.get("/api/reports/revenue/by-tax-rate?to_month=2026-01").json()["items"]
+    assert [(item["tax_rate"], item["total"]) for item in january] == [(None, 500), (21, 1210)]
+
+    top = client.get("/api/reports/revenue/top-clients").json()
+    assert top["total"] == 1710 + 672 + 4940
+    assert [(item["client_name"], item["invoice_count"], item["total"]) for item in top["items"]] == [
+        ("Globex", 2, 672 + 4940),
+        ("Acme", 1, 1710),
+    ]
+
+    assert rebuild_revenue(database_url, write=False) == []
+
+
+def test_cancelling_the_last_invoice_removes_the_rows(client, clients, database_url):
+    invoice = _invoice(client, clients["Acme"], "2026-04-01", [_line(100, 21)])
+    client.post(f"/api/invoices/{invoice['id']}/cancel")
+
+    with connection(database_url) as conn:
+        for table in REVENUE_TABLES:
+            assert conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] == 0
+    assert client.get("/api/reports/revenue/top-clients").json() == {"items": [], "total": 0}
+
+
+def test_revenue_by_client_pages_by_total(client, clients):
+    acme, globex = clients["Acme"], clients["Globex"]
+    third = client.post("/api/clients", json=_client_payload("Initech")).json()["id"]
+    for client_id, price in ((acme, 300), (globex, 100), (third, 200)):
+        _invoice(client, client_id, "2026-05-01", [_line(price, None)])
+    client.delete(f"/api/clients/{third}")  # deleted clients keep their revenue
+
+    first = client.get("/api/reports/revenue/by-client?limit=2").json()
+    assert [item["client_name"] for item in first["items"]] == ["Acme", "Initech"]
+    second = client.get(f"/api/reports/revenue/by-client?limit=2&cursor={first['next_cursor']}").json()
+    assert [item["client_name"] for item in second["items"]] == ["Globex"]
+    assert second["next_cursor"] is None
+
+    assert client.get("/api/reports/revenue/by-client?cursor=bogus").status_code == 400
+    assert client.get("/api/reports/revenue/by-month?from_month=2026-13").status_code == 422
+    assert (
+        client.get("/api/reports/revenue/by-month?from_month=2026-05&to_month=2026-04").status_code
+        == 422
+    )
+
+
+def test_reports_revalidate_on_invoice_changes(client, clients):
+    _invoice(client, clients["Acme"], "2026-06-01", [_line(100, 21)])
+    url = "/api/reports/revenue/by-month"
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    _invoice(client, clients["Acme"], "2026-06-02", [_line(100, 21)])
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["items"][0]["invoice_count"] == 2
+
+
+def test_rebuild_detects_and_repairs_drift(client, clients, database_url, capsys):
+    _invoice(client, clients["Acme"], "2026-07-01", [_line(100, 21)])
+    _invoice(client, clients["Globex"], "2026-08-01", [_line(200, None)])
+    with connection(database_url) as conn:
+        conn.execute("UPDATE revenue_by_month SET total = 0 WHERE month = '2026-07'")
+        conn.execute("DELETE FROM revenue_by_tax_rate WHERE month = '2026-08'")
+        conn.execute(
+            "INSERT INTO revenue_by_client VALUES ('ghost', 1, 5, 0, 5)"
+        )
+        conn.commit()
+
+    assert rebuild.main(["--check", "--database-url", database_url]) == 1
+    output = capsys.readouterr().out
+    assert "revenue_by_month ('2026-07',): stored (1, 100, 21, 0), expected (1, 100, 21, 121)" in output
+    assert "revenue_by_tax_rate ('2026-08', -1): stored None" in output
+    assert "revenue_by_client ('ghost',): stored (1, 5, 0, 5), expected None" in output
+
+    assert rebuild.main(["--database-url", database_url]) == 0
+    assert rebuild_revenue(database_url, write=False) == []
+    assert client.get("/api/reports/revenue/by-month").json()["items"][0]["total"] == 121
+
+
+def test_summaries_are_filled_from_existing_invoices(client, clients, database_url):
+    _invoice(client, clients["Acme"], "2026-09-01", [_line(100, 21), _line(50, None)])
+    with connection(database_url) as conn:
+        expected = {
+            table: conn.execute(f"SELECT * FROM {table}").fetchall() for table in REVENUE_TABLES
+        }
+        for table in REVENUE_TABLES:
+            conn.execute(f"DROP TABLE {table}")
+        conn.commit()
+
+    init_db(database_url)  # a database from before the summaries existed
+    with connection(database_url) as conn:
+        for table in REVENUE_TABLES:
+            rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+            assert [tuple(row) for row in rows] == [tuple(row) for row in expected[table]]
+            assert rows
+
+
+def test_failed_write_rolls_back_the_summaries(client, clients, database_url, monkeypatch):
+    invoice = _invoice(client, clients["Acme"], "2026-10-01", [_line(100, 21)])
+
+    def failing_insert(conn, rows):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr("app.modules.invoices.repository._insert_lines", failing_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        client.put(
+            f"/api/invoices/{invoice['id']}",
+            json={
+                "client_id": clients["Globex"],
+                "issue_date": "2026-11-01",
+                "due_date": "2026-11-15",
+                "notes": None,
+                "lines": [_line(999, None)],
+            },
+        )
+    assert rebuild_revenue(database_url, write=False) == []
+    months = client.get("/api/reports/revenue/by-month").json()["items"]
+    assert [(item["month"], item["total"]) for item in months] == [("2026-10", 121)]
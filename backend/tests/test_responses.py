@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.main import create_app
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+    "notes": "Priority account",
+}
+
+
+def _client(tmp_path, monkeypatch, fast: bool) -> TestClient:
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'responses.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    monkeypatch.setenv("FAST_RESPONSES", "1" if fast else "0")
+    get_settings.cache_clear()
+    return TestClient(create_app())
+
+
+@pytest.fixture()
+def fast_client(tmp_path, monkeypatch):
+    with _client(tmp_path, monkeypatch, fast=True) as client:
+        yield client
+
+
+def _responses(client: TestClient, client_id: str) -> dict:
+    return {
+        "list": client.get("/api/clients"),
+        "detail": client.get(f"/api/clients/{client_id}"),
+        "projected": client.get("/api/clients", params={"fields": "name"}),
+        "search": client.get("/api/clients/search", params={"q": "acme"}),
+        "catalog": client.get("/api/catalog-items"),
+        "openapi": client.get("/openapi.json"),
+    }
+
+
+def test_fast_responses_match_validated_responses(tmp_path, monkeypatch):
+    with _client(tmp_path, monkeypatch, fast=True) as client:
+        created = client.post("/api/clients", json=CLIENT_PAYLOAD)
+        assert created.status_code == 201
+        fast = _responses(client, created.json()["id"])
+    with _client(tmp_path, monkeypatch, fast=False) as client:
+        validated = _responses(client, created.json()["id"])
+
+    for name in ("list", "detail", "projected", "search", "catalog", "openapi"):
+        assert fast[name].json() == validated[name].json(), name
+    assert validated["search"].json()["items"][0]["name"] == "Acme Co"
+    for name in ("list", "detail", "projected"):
+        assert fast[name].headers["etag"] == validated[name].headers["etag"], name
+        assert fast[name].headers["cache-control"] == "no-cache"
+        assert fast[name].headers["content-type"] == "application/json"
+
+
+def test_fast_responses_keep_errors_and_revalidation(fast_client):
+    created = fast_client.post("/api/clients", json=CLIENT_PAYLOAD).json()
+    url = f"/api/clients/{created['id']}"
+    etag = fast_client.get(url).headers["etag"]
+
+    assert fast_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert fast_client.get("/api/clients/missing").status_code == 404
+    assert fast_client.get("/api/users/me").status_code == 404
+    assert fast_client.put("/api/users/me", json={"name": ""}).status_code == 422
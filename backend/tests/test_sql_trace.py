@@ -0,0 +1,95 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.database import ConnectionPool
+from app.core.sql_trace import SqlTracer
+from app.main import create_app
+
+CLIENT_PAYLOAD = {
+    "name": "Acme Co",
+    "address": "123 Main St",
+    "city": "Prague",
+    "country": "Czechia",
+    "main_contact_method": "email",
+    "main_contact": "hello@acme.test",
+}
+
+
+@pytest.fixture()
+def pool(tmp_path):
+    tracer = SqlTracer(threshold_ms=0, capacity=3)
+    pool = ConnectionPool(f"sqlite:///{tmp_path / 'trace.db'}", size=1, timeout=1.0, tracer=tracer)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany("INSERT INTO t (name) VALUES (?)", [("a",), ("b",), ("c",)])
+        conn.commit()
+    tracer.clear()
+    yield pool
+    pool.close()
+
+
+def test_statements_are_reported_with_rows_and_plan(pool, caplog):
+    caplog.set_level(logging.WARNING, logger="app.sql.slow")
+    with pool.connection() as conn:
+        # A cursor left half-read is reported when the next statement starts.
+        conn.execute("SELECT id FROM t ORDER BY name").fetchone()
+        rows = list(conn.execute("SELECT id FROM t WHERE id = ?", (2,)))
+        assert len(rows) == 1
+        conn.execute("UPDATE t SET name = 'x' WHERE id > ?", (1,))
+
+    queries = {entry["sql"]: entry for entry in pool.tracer.slowest()}
+    assert queries["SELECT id FROM t ORDER BY name"]["rows"] == 1
+    assert any("USE TEMP B-TREE FOR ORDER BY" in line for line in queries["SELECT id FROM t ORDER BY name"]["plan"])
+    assert queries["SELECT id FROM t WHERE id = ?"]["rows"] == 1
+    assert any("INTEGER PRIMARY KEY" in line for line in queries["SELECT id FROM t WHERE id = ?"]["plan"])
+    assert queries["UPDATE t SET name = 'x' WHERE id > ?"]["rows"] == 2
+
+    assert len(caplog.records) == 3
+    assert all(record.name == "app.sql.slow" for record in caplog.records)
+    assert "SCAN t" in caplog.records[0].getMessage()
+
+
+def test_buffer_keeps_only_the_slowest_statements(pool):
+    pool.tracer.capacity = 2
+    with pool.connection() as conn:
+        for _ in range(5):
+            conn.execute("SELECT id FROM t").fetchall()
+        conn.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 200000) SELECT count(*) FROM n").fetchone()
+
+    slowest = pool.tracer.slowest()
+    assert len(slowest) == 2
+    assert slowest[0]["sql"].startswith("WITH RECURSIVE")
+    assert slowest[0]["duration_ms"] >= slowest[1]["duration_ms"]
+
+
+def test_statements_under_threshold_are_not_kept(pool, caplog):
+    pool.tracer.threshold = 60.0
+    with pool.connection() as conn:
+        conn.execute("SELECT id FROM t").fetchall()
+    assert pool.tracer.slowest() == []
+    assert not [record for record in caplog.records if record.name == "app.sql.slow"]
+
+
+def test_debug_endpoint_lists_slow_queries(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'trace-app.db'}")
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    monkeypatch.setenv("SQL_TRACE_ENABLED", "1")
+    monkeypatch.setenv("SQL_SLOW_QUERY_MS", "0")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        assert client.post("/api/clients", json=CLIENT_PAYLOAD).status_code == 201
+        assert client.get("/api/clients").status_code == 200
+        body = client.get("/debug/sql/slow").json()
+
+    assert body["threshold_ms"] == 0
+    assert any("FROM clients" in entry["sql"] and entry["rows"] == 1 for entry in body["queries"])
+
+
+def test_debug_endpoint_is_off_by_default(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'trace-app.db'}")
+    get_settings.cache_clear()
+    with TestClient(create_app()) as client:
+        assert client.get("/debug/sql/slow").status_code == 404
@@ -0,0 +1,51 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from app.core import streaming
+
+
+async def _entries(files):
+    for name, path in files:
+        yield name, path
+
+
+def _archive(files) -> bytes:
+    async def body() -> bytes:
+        response = streaming.zip_response(_entries(files), "files.zip")
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(body())
+
+
+@pytest.fixture()
+def files(tmp_path):
+    paths = []
+    for index, content in enumerate([b"%PDF-1.4 first", b"", b"x" * 100_000]):
+        path = tmp_path / f"{index}.bin"
+        path.write_bytes(content)
+        paths.append((f"dir/{index}-č.pdf", path))
+    return paths
+
+
+def test_zip_response_builds_a_valid_stored_archive(files):
+    with zipfile.ZipFile(io.BytesIO(_archive(files))) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in files]
+        for name, path in files:
+            assert archive.read(name) == path.read_bytes()
+            assert archive.getinfo(name).compress_type == zipfile.ZIP_STORED
+
+
+def test_zip_response_switches_to_zip64_records(files, monkeypatch):
+    # Pretend the archive passed the 4 GiB offset and 65535 entry limits.
+    monkeypatch.setattr(streaming, "_ZIP64_LIMIT", 50)
+    monkeypatch.setattr(streaming, "_ZIP64_COUNT_LIMIT", 2)
+    data = _archive(files)
+    assert b"PK\x06\x06" in data and b"PK\x06\x07" in data
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        for name, path in files:
+            assert archive.read(name) == path.read_bytes()
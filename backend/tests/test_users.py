@@ -1,3 +1,5 @@
+import sqlite3
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -94,3 +96,56 @@ def test_required_fields_cannot_be_cleared(client, sample_payload, field, value)
 
     response = client.put("/api/users/me", json=bad_payload)
     assert response.status_code == 422
+
+
+def test_conditional_get_user_profile(client, sample_payload):
+    client.put("/api/users/me", json=sample_payload)
+    first = client.get("/api/users/me")
+    etag = first.headers["etag"]
+
+    assert client.get("/api/users/me", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/api/users/me", json=dict(sample_payload, bank="Other Bank"))
+    assert client.get("/api/users/me", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_profile_reads_are_served_from_cache(client, sample_payload):
+    def checkouts():
+        return client.get("/health/db").json()["pool"]["checkouts"]
+
+    client.put("/api/users/me", json=sample_payload)
+    before = checkouts()
+    for _ in range(3):
+        assert client.get("/api/users/me").json()["name"] == sample_payload["name"]
+    # Hits within the revalidation interval do not touch SQLite at all.
+    assert checkouts() == before
+
+    client.put("/api/users/me", json=dict(sample_payload, name="Write Through"))
+    assert client.get("/api/users/me").json()["name"] == "Write Through"
+
+    stats = client.get("/health/cache").json()["caches"]["users.profile"]
+    assert stats["hits"] >= 4
+
+
+def test_profile_cache_sees_updates_from_other_workers(
+    client, sample_payload, tmp_path, monkeypatch
+):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    client.put("/api/users/me", json=sample_payload)
+    etag = client.get("/api/users/me").headers["etag"]
+
+    # Another worker's connection to the same file.
+    other = sqlite3.connect(tmp_path / "users.db")
+    other.execute("UPDATE users SET iban = 'CZ0000000000000000000000'")
+    other.commit()
+    other.close()
+
+    # Seen once the revalidation interval has passed, not on every read.
+    now[0] += 0.5
+    assert client.get("/api/users/me", headers={"If-None-Match": etag}).status_code == 304
+    now[0] += get_settings().entity_cache_revalidate
+    changed = client.get("/api/users/me", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["iban"] == "CZ0000000000000000000000"
+    assert client.get("/health/cache").json()["caches"]["users.profile"]["stale"] == 1
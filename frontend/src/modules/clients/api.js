@@ -31,8 +31,21 @@ async function request(path, options = {}) {
   return response.json()
 }
 
+const LIST_PAGE_LIMIT = 500
+
 export async function listClients() {
-  return request('/api/clients')
+  const clients = []
+  let cursor = null
+  do {
+    const params = new URLSearchParams({ limit: String(LIST_PAGE_LIMIT) })
+    if (cursor) {
+      params.set('cursor', cursor)
+    }
+    const page = await request(`/api/clients?${params}`)
+    clients.push(...page.items)
+    cursor = page.next_cursor
+  } while (cursor)
+  return clients
 }
 
 export async function createClient(payload) {